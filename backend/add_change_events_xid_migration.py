@@ -0,0 +1,56 @@
+"""
+Migration script to order the change feed by writing transaction
+- Adds `xid` (BIGINT, defaulting to txid_current()) to change_events;
+  existing rows get 0, so they keep their id order ahead of new events
+- Replaces the (entity, id) index with (xid, id) and (entity, xid, id)
+- Creates the change_feed_watermark table (newest pruned feed position)
+Run this script: python add_change_events_xid_migration.py
+"""
+
+from sqlalchemy import text
+from app.core.database import engine
+from app.modules.changes.models import ChangeFeedWatermark
+
+def add_change_events_xid():
+    """Add change_events.xid, its indexes and the pruning watermark table"""
+    with engine.connect() as conn:
+        try:
+            column_exists = conn.execute(text("""
+                SELECT column_name
+                FROM information_schema.columns
+                WHERE table_name = 'change_events'
+                AND column_name = 'xid'
+            """)).fetchone() is not None
+
+            if not column_exists:
+                conn.execute(text("ALTER TABLE change_events ADD COLUMN xid BIGINT NOT NULL DEFAULT 0"))
+                conn.execute(text("ALTER TABLE change_events ALTER COLUMN xid SET DEFAULT txid_current()"))
+                print("✅ Column 'xid' added successfully to change_events table")
+            else:
+                print("ℹ️  Column 'xid' already exists in change_events table")
+
+            conn.execute(text("DROP INDEX IF EXISTS idx_change_events_entity_id"))
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS idx_change_events_xid_id
+                ON change_events (xid, id)
+            """))
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS idx_change_events_entity_xid_id
+                ON change_events (entity, xid, id)
+            """))
+            print("✅ Change feed indexes created")
+
+            ChangeFeedWatermark.__table__.create(bind=conn, checkfirst=True)
+            print("✅ Table 'change_feed_watermark' ready")
+
+            conn.commit()
+            print("✅ Migration completed successfully!")
+
+        except Exception as e:
+            conn.rollback()
+            print(f"❌ Error during migration: {e}")
+            raise
+
+if __name__ == "__main__":
+    print("Starting migration to add change_events.xid...")
+    add_change_events_xid()
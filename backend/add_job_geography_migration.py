@@ -0,0 +1,71 @@
+"""
+Migration script for SQL-side radius search on jobs
+- Adds a (latitude, longitude) index used for bounding-box prefiltering
+- If PostGIS is available, adds a generated `geog` geography column with a GiST index
+Run this script: python add_job_geography_migration.py
+"""
+
+from sqlalchemy import text
+from app.core.database import engine
+
+def add_job_geography():
+    """Create lat/lng index and (when possible) PostGIS geography column on jobs"""
+    with engine.connect() as conn:
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_jobs_lat_lng
+            ON jobs (latitude, longitude)
+        """))
+        conn.commit()
+        print("✅ Index 'idx_jobs_lat_lng' is present on jobs")
+        
+        # Check if PostGIS can be enabled on this server
+        postgis_available = conn.execute(text("""
+            SELECT 1 FROM pg_available_extensions WHERE name = 'postgis'
+        """)).fetchone() is not None
+        
+        if not postgis_available:
+            print("ℹ️  PostGIS is not installed; near-me search will use the bounding-box index")
+            print("Migration completed!")
+            return
+        
+        try:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS postgis"))
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            print(f"ℹ️  Could not enable PostGIS ({e}); near-me search will use the bounding-box index")
+            print("Migration completed!")
+            return
+        
+        # Check if column exists
+        column_exists = conn.execute(text("""
+            SELECT column_name 
+            FROM information_schema.columns 
+            WHERE table_name = 'jobs' 
+            AND column_name = 'geog'
+        """)).fetchone() is not None
+        
+        if not column_exists:
+            conn.execute(text("""
+                ALTER TABLE jobs
+                ADD COLUMN geog geography(Point, 4326)
+                GENERATED ALWAYS AS (
+                    CASE WHEN latitude IS NOT NULL AND longitude IS NOT NULL
+                    THEN ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography
+                    END
+                ) STORED
+            """))
+            print("✅ Column 'geog' added successfully to jobs table")
+        else:
+            print("ℹ️  Column 'geog' already exists in jobs table")
+        
+        conn.execute(text("""
+            CREATE INDEX IF NOT EXISTS idx_jobs_geog
+            ON jobs USING GIST (geog)
+        """))
+        conn.commit()
+        print("✅ GiST index 'idx_jobs_geog' is present on jobs")
+        print("Migration completed!")
+
+if __name__ == "__main__":
+    add_job_geography()
@@ -0,0 +1,55 @@
+"""
+Migration script to add slug columns to states, cities and areas
+- Adds an indexed `slug` column to each table
+- Backfills it with slugify(name) (new rows are kept in sync by the models)
+Run this script: python add_location_slugs_migration.py
+"""
+
+from slugify import slugify
+from sqlalchemy import text
+from app.core.database import engine
+
+LOCATION_TABLES = ("states", "cities", "areas")
+
+def add_location_slugs():
+    """Add and backfill slug columns on location tables"""
+    with engine.connect() as conn:
+        try:
+            for table in LOCATION_TABLES:
+                column_exists = conn.execute(text("""
+                    SELECT column_name 
+                    FROM information_schema.columns 
+                    WHERE table_name = :table 
+                    AND column_name = 'slug'
+                """), {"table": table}).fetchone() is not None
+                
+                if not column_exists:
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN slug VARCHAR"))
+                    print(f"✅ Column 'slug' added successfully to {table} table")
+                else:
+                    print(f"ℹ️  Column 'slug' already exists in {table} table")
+                
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_slug ON {table} (slug)"))
+                
+                # slugify is a Python library, so backfill from Python (location tables are small)
+                rows = conn.execute(text(f"SELECT id, name FROM {table}")).fetchall()
+                updates = [
+                    {"id": row_id, "slug": slugify(name)}
+                    for row_id, name in rows
+                    if name
+                ]
+                if updates:
+                    conn.execute(text(f"UPDATE {table} SET slug = :slug WHERE id = :id"), updates)
+                print(f"✅ Backfilled slugs for {len(updates)} rows in {table}")
+            
+            conn.commit()
+            print("✅ Migration completed successfully!")
+            
+        except Exception as e:
+            conn.rollback()
+            print(f"❌ Error during migration: {e}")
+            raise
+
+if __name__ == "__main__":
+    print("Starting migration to add location slug columns...")
+    add_location_slugs()
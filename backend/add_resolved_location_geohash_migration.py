@@ -0,0 +1,54 @@
+"""
+Migration script to key the reverse-geocode cache by geohash
+- Adds an indexed `geohash` column to resolved_locations
+- Backfills it from latitude/longitude at GEOCODE_GEOHASH_PRECISION
+Run this script: python add_resolved_location_geohash_migration.py
+"""
+
+from sqlalchemy import text
+from app.core.config import settings
+from app.core.database import engine
+from app.utils.geo_utils import encode_geohash
+
+def add_resolved_location_geohash():
+    """Add and backfill resolved_locations.geohash"""
+    with engine.connect() as conn:
+        try:
+            column_exists = conn.execute(text("""
+                SELECT column_name 
+                FROM information_schema.columns 
+                WHERE table_name = 'resolved_locations' 
+                AND column_name = 'geohash'
+            """)).fetchone() is not None
+            
+            if not column_exists:
+                conn.execute(text("ALTER TABLE resolved_locations ADD COLUMN geohash VARCHAR(12)"))
+                print("✅ Column 'geohash' added successfully to resolved_locations table")
+            else:
+                print("ℹ️  Column 'geohash' already exists in resolved_locations table")
+            
+            conn.execute(text("""
+                CREATE INDEX IF NOT EXISTS ix_resolved_locations_geohash
+                ON resolved_locations (geohash)
+            """))
+            
+            rows = conn.execute(text("SELECT id, latitude, longitude FROM resolved_locations")).fetchall()
+            updates = [
+                {"id": row_id, "geohash": encode_geohash(latitude, longitude, settings.GEOCODE_GEOHASH_PRECISION)}
+                for row_id, latitude, longitude in rows
+            ]
+            if updates:
+                conn.execute(text("UPDATE resolved_locations SET geohash = :geohash WHERE id = :id"), updates)
+            print(f"✅ Backfilled geohash for {len(updates)} cached locations")
+            
+            conn.commit()
+            print("✅ Migration completed successfully!")
+            
+        except Exception as e:
+            conn.rollback()
+            print(f"❌ Error during migration: {e}")
+            raise
+
+if __name__ == "__main__":
+    print("Starting migration to add resolved_locations.geohash...")
+    add_resolved_location_geohash()
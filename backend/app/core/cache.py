@@ -12,6 +12,7 @@ from app.core.config import settings
 # In-memory cache as fallback
 _memory_cache: dict = {}
 _cache_timestamps: dict = {}
+_cache_ttls: dict = {}  # Per-key TTLs for entries stored with set_cached
 
 # Redis client (lazy import)
 _redis_client = None
@@ -146,6 +147,58 @@ def cache_result(ttl: int = None, prefix: str = "cache"):
     return decorator
 
 
+def get_cached(key: str) -> Optional[Any]:
+    """Get a JSON-serializable value stored with set_cached (Redis first, then memory)"""
+    redis_client = get_redis_client()
+    if redis_client:
+        try:
+            cached = redis_client.get(key)
+            if cached:
+                return json.loads(cached)
+        except Exception:
+            pass  # Fall back to memory cache
+
+    if key in _memory_cache:
+        cache_ttl = _cache_ttls.get(key, settings.CACHE_TTL_SECONDS)
+        if _cache_timestamps.get(key, 0) + cache_ttl > __import__('time').time():
+            return _memory_cache[key]
+        # Expired, remove it
+        _memory_cache.pop(key, None)
+        _cache_timestamps.pop(key, None)
+        _cache_ttls.pop(key, None)
+    return None
+
+
+def set_cached(key: str, value: Any, ttl: int = None) -> None:
+    """Store a JSON-serializable value under an explicit key"""
+    cache_ttl = ttl or settings.CACHE_TTL_SECONDS
+    redis_client = get_redis_client()
+    if redis_client:
+        try:
+            redis_client.setex(key, cache_ttl, json.dumps(value))
+            return
+        except Exception:
+            pass
+
+    _memory_cache[key] = value
+    _cache_timestamps[key] = __import__('time').time()
+    _cache_ttls[key] = cache_ttl
+
+
+def delete_cached(*keys: str) -> None:
+    """Delete explicit keys (e.g. after the underlying row changed)"""
+    redis_client = get_redis_client()
+    if redis_client:
+        try:
+            redis_client.delete(*keys)
+        except Exception:
+            pass
+    for key in keys:
+        _memory_cache.pop(key, None)
+        _cache_timestamps.pop(key, None)
+        _cache_ttls.pop(key, None)
+
+
 def invalidate_cache(prefix: str, pattern: str = "*"):
     """Invalidate cache entries matching pattern"""
     redis_client = get_redis_client()
@@ -34,9 +34,19 @@ class Settings(BaseSettings):
     
     # Analytics
     ANALYTICS_ENABLED: bool = True
+    ANALYTICS_QUEUE_MAX_EVENTS: int = 10000  # Tracking rows buffered per process; beyond this they are dropped
+    ANALYTICS_FLUSH_INTERVAL_MS: int = 500  # How often queued tracking rows are bulk-inserted
+    ANALYTICS_FLUSH_MAX_EVENTS: int = 500  # Flush early once this many rows wait (also the INSERT batch size)
+    ANALYTICS_BATCH_MAX_EVENTS: int = 100  # Most events accepted in one /api/analytics/track-batch body
+    ANALYTICS_BATCH_MAX_BYTES: int = 65536  # Larger /api/analytics/track-batch bodies are rejected unread
+    GEOIP_DATABASE_PATH: Optional[str] = None  # GeoLite2-City .mmdb file for IP geolocation (requires maxminddb)
+    GEOIP_CACHE_SIZE: int = 10000  # Recent IP lookups kept in each process
     
     # SEO
     SITE_URL: str = "https://workspa.in"
+    SITEMAP_SHARD_BASE_URL: Optional[str] = None  # Public URL of sub-sitemaps (default: SITE_URL + "/sitemaps")
+    SITEMAP_DIR: str = "sitemaps"  # Pre-rendered, compressed sitemap artifacts
+    SITEMAP_REGENERATE_INTERVAL_SECONDS: int = 60  # How often changed sitemap shards are re-rendered
 
 # Frontend domains
     FRONTEND_URLS: list[str] = [
@@ -58,14 +68,37 @@ class Settings(BaseSettings):
     # Geocoding (OpenStreetMap Nominatim)
     NOMINATIM_BASE_URL: str = "https://nominatim.openstreetmap.org"
     NOMINATIM_USER_AGENT: str = "SPA-Job-Portal/1.0"  # Required by Nominatim
-    # Rate limiting commented out - can be uncommented later when needed
-    # NOMINATIM_RATE_LIMIT_SECONDS: int = 1  # Minimum seconds between requests
+    NOMINATIM_RATE_LIMIT_PER_SECOND: float = 1.0  # Nominatim usage policy: at most 1 request per second
+    NOMINATIM_BURST: int = 1  # Requests that may be sent back to back after an idle period (without Redis)
+    NOMINATIM_PROCESSES: int = 1  # Without Redis: processes that call Nominatim (workers + cron); each gets rate / N
+    NOMINATIM_MAX_CONNECTIONS: int = 2  # Pooled keep-alive connections to Nominatim
+    NOMINATIM_TIMEOUT_SECONDS: float = 10.0  # Per-request timeout
+    NOMINATIM_QUEUE_SIZE: int = 30  # Requests allowed to wait for a rate-limit slot; more get 503
+    NOMINATIM_QUEUE_TIMEOUT_SECONDS: float = 15.0  # Longest wait for a rate-limit slot
     GEOCODE_CACHE_HOURS: int = 24  # Cache resolved locations for 24 hours
+    GEOCODE_SEARCH_MISS_RETRY_HOURS: int = 720  # Batch geocoder re-sends addresses Nominatim could not place after this
+    GEOCODE_GEOHASH_PRECISION: int = 7  # Reverse-geocode cache cell (7 chars ~ 150 x 150 m)
+    GEOCODE_LRU_SIZE: int = 10000  # Resolved locations kept in each process
+    GEOCODE_LAST_USED_FLUSH_SECONDS: int = 60  # How often batched last_used updates are written
+    GEOCODE_LOCAL_ENABLED: bool = True  # Answer reverse geocodes from our own city/area centroids when confident
+    GEOCODE_LOCAL_MIN_POINTS: int = 5  # Spas/jobs a city or area needs before its centroid is trusted
+    GEOCODE_LOCAL_MARGIN_KM: float = 1.0  # Slack added to a centroid's radius
+    GEOCODE_BATCH_SIZE: int = 100  # Spas/jobs per batch (and per checkpoint) of the batch forward geocoder
+    GEOCODE_BATCH_MAX_SECONDS: int = 600  # Time budget of one batch geocoder run (it resumes next run)
     
     # Performance & Scalability Settings
     REDIS_URL: Optional[str] = None  # Redis connection URL for caching (e.g., redis://localhost:6379/0)
     REDIS_ENABLED: bool = False  # Enable Redis caching
     CACHE_TTL_SECONDS: int = 300  # Default cache TTL (5 minutes)
+    COUNTER_FLUSH_INTERVAL_SECONDS: int = 5  # How often buffered view/click counters are written to the DB
+    COUNTER_REPAIR_MIN_AGE_SECONDS: int = 600  # Drift repair ignores events newer than this (may still be buffered in workers)
+    TRENDING_HALF_LIFE_HOURS: float = 48  # Trending score weight of an event halves every N hours
+    TRENDING_WINDOW_DAYS: int = 14  # Events older than this are ignored by the trending score
+    FAST_JSON_RESPONSES: bool = False  # ORJSON default responses and single-pass serialization of job lists
+    CHANGE_FEED_RETENTION_DAYS: int = 30  # /api/changes events older than this are pruned
+    LANDING_CACHE_TTL_SECONDS: int = 3600  # Cached /api/landing payloads; without Redis, per worker (a write only clears its own worker)
+    LANDING_PREGENERATE_INTERVAL_SECONDS: int = 1800  # How often the app re-caches sitemap landing pages (keep below the TTL)
+    LANDING_JOBS_LIMIT: int = 20  # Jobs included in a landing page payload
     
     # Rate Limiting
     # COMMENTED OUT - Can be uncommented later when needed
@@ -0,0 +1,234 @@
+"""
+Write-behind counters for popularity fields
+Increments are buffered in Redis (HINCRBY) or in memory and flushed to
+PostgreSQL in batches with atomic `col = col + delta` updates
+"""
+
+import asyncio
+import threading
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import Integer, column, func, table, text, update, values
+from sqlalchemy.orm import Session
+
+from app.core.cache import get_redis_client
+from app.core.config import settings
+
+# Counter columns that may be buffered (table -> columns).
+# Only these names are ever used to build UPDATE statements.
+COUNTER_COLUMNS = {
+    "jobs": ("view_count", "apply_click_count", "message_count"),
+    "spas": ("booking_click_count",),
+}
+
+# Source-of-truth queries used for drift repair: (table, column) -> SELECT id, count
+# (only rows created before :cutoff, see repair_counter_drift)
+COUNTER_SOURCES = {
+    ("jobs", "view_count"): """
+        SELECT job_id, COUNT(*) FROM analytics_events
+        WHERE event_type = 'page_view' AND job_id IS NOT NULL AND created_at < :cutoff GROUP BY job_id
+    """,
+    ("jobs", "apply_click_count"): """
+        SELECT job_id, COUNT(*) FROM analytics_events
+        WHERE event_type = 'apply_click' AND job_id IS NOT NULL AND created_at < :cutoff GROUP BY job_id
+    """,
+    ("jobs", "message_count"): """
+        SELECT job_id, COUNT(*) FROM messages
+        WHERE job_id IS NOT NULL AND created_at < :cutoff GROUP BY job_id
+    """,
+    ("spas", "booking_click_count"): """
+        SELECT spa_id, COUNT(*) FROM analytics_events
+        WHERE event_type = 'spa_booking_click' AND spa_id IS NOT NULL AND created_at < :cutoff GROUP BY spa_id
+    """,
+}
+
+REDIS_KEY_PREFIX = "counters:pending"
+FLUSH_BATCH_SIZE = 1000
+
+# In-memory buffer (used when Redis is not available): (table, column) -> {row_id: delta}
+_pending: Dict[Tuple[str, str], Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+_pending_lock = threading.Lock()
+
+
+def _validate(table_name: str, column_name: str) -> None:
+    if column_name not in COUNTER_COLUMNS.get(table_name, ()):
+        raise ValueError(f"Unknown counter {table_name}.{column_name}")
+
+
+def _redis_key(table_name: str, column_name: str) -> str:
+    return f"{REDIS_KEY_PREFIX}:{table_name}:{column_name}"
+
+
+def increment(table_name: str, column_name: str, row_id: int, delta: int = 1) -> None:
+    """Buffer an increment for table.column on the given row"""
+    _validate(table_name, column_name)
+
+    redis_client = get_redis_client()
+    if redis_client:
+        try:
+            redis_client.hincrby(_redis_key(table_name, column_name), row_id, delta)
+            return
+        except Exception:
+            pass  # Fall back to memory buffer
+
+    with _pending_lock:
+        _pending[(table_name, column_name)][row_id] += delta
+
+
+def get_pending(table_name: str, column_name: str, row_ids: Iterable[int]) -> Dict[int, int]:
+    """Return buffered (not yet flushed) deltas for the given rows"""
+    _validate(table_name, column_name)
+    row_ids = list(row_ids)
+    result = {row_id: 0 for row_id in row_ids}
+    if not row_ids:
+        return result
+
+    redis_client = get_redis_client()
+    if redis_client:
+        try:
+            deltas = redis_client.hmget(_redis_key(table_name, column_name), row_ids)
+            for row_id, delta in zip(row_ids, deltas):
+                if delta:
+                    result[row_id] += int(delta)
+        except Exception:
+            pass
+
+    with _pending_lock:
+        buffered = _pending.get((table_name, column_name), {})
+        for row_id in row_ids:
+            result[row_id] += buffered.get(row_id, 0)
+    return result
+
+
+def get_counter_value(table_name: str, column_name: str, row_id: int, stored_value: int | None) -> int:
+    """Near-real-time counter value: stored DB value plus buffered increments"""
+    return (stored_value or 0) + get_pending(table_name, column_name, [row_id])[row_id]
+
+
+def _drain() -> Dict[Tuple[str, str], Dict[int, int]]:
+    """Atomically take all buffered deltas out of Redis and memory"""
+    drained: Dict[Tuple[str, str], Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    with _pending_lock:
+        for key, deltas in _pending.items():
+            for row_id, delta in deltas.items():
+                drained[key][row_id] += delta
+        _pending.clear()
+
+    redis_client = get_redis_client()
+    if redis_client:
+        for table_name, columns in COUNTER_COLUMNS.items():
+            for column_name in columns:
+                key = _redis_key(table_name, column_name)
+                # RENAME is atomic, so concurrent HINCRBYs land in a fresh hash
+                flushing_key = f"{key}:flushing:{uuid.uuid4().hex}"
+                try:
+                    redis_client.rename(key, flushing_key)
+                except Exception:
+                    continue  # Key does not exist (nothing buffered) or Redis error
+                try:
+                    for row_id, delta in redis_client.hgetall(flushing_key).items():
+                        drained[(table_name, column_name)][int(row_id)] += int(delta)
+                    redis_client.delete(flushing_key)
+                except Exception as e:
+                    print(f"Failed to drain counter buffer {flushing_key}: {e}")
+
+    return drained
+
+
+def _restore(table_name: str, column_name: str, deltas: Dict[int, int]) -> None:
+    """Put deltas back into the buffer after a failed flush"""
+    for row_id, delta in deltas.items():
+        increment(table_name, column_name, row_id, delta)
+
+
+def flush_counters(db: Session) -> int:
+    """
+    Write all buffered increments to the database.
+
+    Each (table, column) is written with one `UPDATE ... FROM (VALUES ...)`
+    statement per batch, so increments are applied atomically in SQL and
+    never lost to read-modify-write races. Returns the number of rows updated.
+    """
+    updated = 0
+    for (table_name, column_name), deltas in _drain().items():
+        deltas = {row_id: delta for row_id, delta in deltas.items() if delta}
+        if not deltas:
+            continue
+
+        target = table(table_name, column("id", Integer), column(column_name, Integer))
+        items = list(deltas.items())
+        try:
+            for start in range(0, len(items), FLUSH_BATCH_SIZE):
+                batch = values(
+                    column("row_id", Integer),
+                    column("delta", Integer),
+                    name="counter_deltas",
+                ).data(items[start:start + FLUSH_BATCH_SIZE])
+                stmt = (
+                    update(target)
+                    .where(target.c.id == batch.c.row_id)
+                    .values({column_name: func.coalesce(target.c[column_name], 0) + batch.c.delta})
+                )
+                updated += db.execute(stmt).rowcount
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            _restore(table_name, column_name, deltas)
+            print(f"Failed to flush counters for {table_name}.{column_name}: {e}")
+    return updated
+
+
+def repair_counter_drift(db: Session) -> int:
+    """
+    Raise stored counters that fell behind their source-of-truth rows
+    (analytics events, messages), e.g. after a worker died with a
+    non-empty in-memory buffer. Counters are never lowered, since
+    analytics history may be pruned.
+
+    Increments still buffered in web workers (each has its own memory
+    buffer unless Redis is used) are invisible here, while their source rows
+    are already committed; counting those rows would raise the counter now
+    and the worker's next flush would add the same increments again. So only
+    source rows older than COUNTER_REPAIR_MIN_AGE_SECONDS - long after any
+    live worker has flushed their increments - are counted. Returns the
+    number of rows repaired.
+    """
+    flush_counters(db)
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.COUNTER_REPAIR_MIN_AGE_SECONDS)
+    repaired = 0
+    for (table_name, column_name), source_sql in COUNTER_SOURCES.items():
+        _validate(table_name, column_name)
+        result = db.execute(text(f"""
+            UPDATE {table_name} AS t
+            SET {column_name} = src.total
+            FROM ({source_sql}) AS src(row_id, total)
+            WHERE t.id = src.row_id AND COALESCE(t.{column_name}, 0) < src.total
+        """), {"cutoff": cutoff})
+        repaired += result.rowcount
+    db.commit()
+    return repaired
+
+
+async def run_counter_flusher(interval_seconds: int = None):
+    """Background loop that flushes buffered counters every interval"""
+    from app.core.database import SessionLocal
+
+    interval = interval_seconds or settings.COUNTER_FLUSH_INTERVAL_SECONDS
+
+    def _flush():
+        db = SessionLocal()
+        try:
+            return flush_counters(db)
+        finally:
+            db.close()
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(_flush)
+        except Exception as e:
+            print(f"Counter flush failed: {e}")
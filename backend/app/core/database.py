@@ -75,6 +75,7 @@ def init_db():
     import app.modules.subscribe.models
     import app.modules.contact.models
     import app.modules.whatsaapLeads.models
+    import app.modules.changes.models
     
     Base.metadata.create_all(bind=engine)
 
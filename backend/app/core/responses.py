@@ -0,0 +1,58 @@
+"""
+Fast JSON responses (opt-in with FAST_JSON_RESPONSES=true)
+
+By default FastAPI validates a route's return value against its
+response_model, dumps it to Python primitives, and encodes that with the
+stdlib json module. In fast mode, hot list endpoints validate ORM rows once
+through a cached TypeAdapter and let pydantic-core encode the result
+straight to JSON bytes. The app's default response class becomes
+ORJSONResponse when orjson is installed.
+"""
+
+from functools import lru_cache
+from typing import Any
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+
+try:
+    import orjson  # noqa: F401
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def default_response_class():
+    """Response class for the FastAPI app"""
+    if settings.FAST_JSON_RESPONSES and ORJSON_AVAILABLE:
+        from fastapi.responses import ORJSONResponse
+        return ORJSONResponse
+    return JSONResponse
+
+
+@lru_cache(maxsize=None)
+def get_type_adapter(tp: Any) -> TypeAdapter:
+    """TypeAdapter per type, built once (building one compiles a validator and serializer)"""
+    return TypeAdapter(tp)
+
+
+def serialize(tp: Any, value: Any) -> bytes:
+    """Validate ORM objects/mappings once against tp and encode them to JSON bytes"""
+    adapter = get_type_adapter(tp)
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True), by_alias=True)
+
+
+def fast_json(tp: Any, value: Any, status_code: int = 200):
+    """
+    Return `value` as a pre-encoded JSON response when fast mode is on.
+
+    Returning a Response makes FastAPI skip its own response_model
+    validation, so each row is validated exactly once. Keep response_model
+    on the route (for docs); with fast mode off the value is returned as is.
+    """
+    if not settings.FAST_JSON_RESPONSES:
+        return value
+    return Response(content=serialize(tp, value), status_code=status_code, media_type="application/json")
@@ -3,14 +3,21 @@ Main FastAPI application entry point
 SPA Job Portal - Backend API
 """
 
+import asyncio
 import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 
-from app.core.database import init_db
+from app.core.database import init_db, SessionLocal
 from app.core.config import settings
+from app.core import counters
+from app.core.responses import default_response_class
+from app.modules.seo import artifacts
+from app.modules.locations import geocoding, nominatim
+from app.modules.analytics import ingest
+from app.modules.landing import services as landing
 
 from app.modules.users.routes import router as users_router
 from app.modules.locations.routes import router as locations_router
@@ -24,6 +31,8 @@ from app.modules.subscribe.routes import router as subscribe_router
 from app.modules.chatbot.routes import router as chatbot_router
 from app.modules.contact.routes import router as contact_router
 from app.modules.whatsaapLeads.routes import router as whatsaap_leads_router
+from app.modules.changes.routes import router as changes_router
+from app.modules.landing.routes import router as landing_router
 
 
 # -------------------------------------------------
@@ -35,6 +44,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/api/docs" if settings.LOG_LEVEL == "DEBUG" else None,
     redoc_url="/api/redoc" if settings.LOG_LEVEL == "DEBUG" else None,
+    default_response_class=default_response_class(),
 )
 
 
@@ -77,11 +87,35 @@ app.mount(
 
 
 # -------------------------------------------------
-# Startup Events
+# Startup / Shutdown Events
 # -------------------------------------------------
+_background_tasks: list = []
+
+
 @app.on_event("startup")
 async def startup_event():
     init_db()
+    _background_tasks.append(asyncio.create_task(counters.run_counter_flusher()))
+    _background_tasks.append(asyncio.create_task(artifacts.run_sitemap_regenerator()))
+    _background_tasks.append(asyncio.create_task(geocoding.run_last_used_flusher()))
+    _background_tasks.append(asyncio.create_task(ingest.run_analytics_flusher()))
+    _background_tasks.append(asyncio.create_task(landing.run_landing_pregenerator()))
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    for task in _background_tasks:
+        task.cancel()
+    await nominatim.close_client()
+    
+    # Flush buffered counters, analytics rows and geocode last_used so nothing is lost on restart
+    db = SessionLocal()
+    try:
+        counters.flush_counters(db)
+        ingest.flush_all(db)
+        geocoding.flush_last_used(db)
+    finally:
+        db.close()
 
 
 # -------------------------------------------------
@@ -99,6 +133,8 @@ app.include_router(subscribe_router)
 app.include_router(chatbot_router)
 app.include_router(contact_router)
 app.include_router(whatsaap_leads_router)
+app.include_router(changes_router)
+app.include_router(landing_router)
 
 
 # -------------------------------------------------
@@ -0,0 +1,275 @@
+"""
+Batched analytics ingestion
+
+Tracking calls only append a row to a bounded in-process queue and return;
+run_analytics_flusher() drains the queue every ANALYTICS_FLUSH_INTERVAL_MS
+(or as soon as ANALYTICS_FLUSH_MAX_EVENTS rows are waiting) and writes each
+table's rows with one multi-row INSERT per batch, instead of one transaction
+per event.
+
+Backpressure: when the queue holds ANALYTICS_QUEUE_MAX_EVENTS rows, new rows
+are rejected (record() returns False) and counted as dropped. When a batch
+INSERT fails because of its data (e.g. a job_id that no longer exists), the
+batch is retried row by row and only the offending rows are discarded
+(counted as rejected); when it fails because the database is unreachable,
+the batch goes back to the front of the queue while there is room.
+Outside the application (scripts, cron jobs) no flusher runs and rows are
+inserted directly. The shutdown handler calls flush_all().
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple, Type
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.modules.analytics.models import AnalyticsEvent, JobButtonClickAnalytics
+
+MODELS = (AnalyticsEvent, JobButtonClickAnalytics)
+
+_queue: Deque[Tuple[Type, Dict[str, Any]]] = deque()
+_lock = threading.Lock()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_wakeup: Optional[asyncio.Event] = None
+
+_stats = {
+    "enqueued": 0,
+    "inserted": 0,
+    "dropped": 0,  # Rejected because the queue was full
+    "requeued": 0,  # Rows put back after a failed flush
+    "rejected": 0,  # Rows the database refused (bad data); discarded
+    "failed_flushes": 0,
+    "max_queue_depth": 0,
+}
+_last_flush_at: Optional[float] = None
+
+
+def is_running() -> bool:
+    """Whether a flusher is draining the queue in this process"""
+    return _loop is not None
+
+
+def get_stats() -> Dict[str, Any]:
+    """Ingestion counters since start-up, plus the current queue depth"""
+    with _lock:
+        return {
+            **_stats,
+            "queue_depth": len(_queue),
+            "queue_capacity": settings.ANALYTICS_QUEUE_MAX_EVENTS,
+            "seconds_since_flush": round(time.monotonic() - _last_flush_at, 3) if _last_flush_at else None,
+        }
+
+
+def _wake() -> None:
+    loop, wakeup = _loop, _wakeup
+    if loop is not None and wakeup is not None:
+        try:
+            loop.call_soon_threadsafe(wakeup.set)
+        except RuntimeError:
+            pass  # Loop closed (shutdown)
+
+
+def _insert_rows(db: Session, rows: List[Tuple[Type, Dict[str, Any]]]) -> int:
+    """Multi-row INSERT per table, in one transaction"""
+    by_model: Dict[Type, List[Dict[str, Any]]] = {}
+    for model, row in rows:
+        by_model.setdefault(model, []).append(row)
+    for model, model_rows in by_model.items():
+        db.execute(insert(model), model_rows)
+    db.commit()
+    return len(rows)
+
+
+def record(model: Type, row: Dict[str, Any], db: Optional[Session] = None) -> bool:
+    """
+    Queue one AnalyticsEvent/JobButtonClickAnalytics row (column -> value).
+    Returns False if it was dropped because the queue is full.
+    """
+    if model not in MODELS:
+        raise ValueError(f"Not an analytics model: {model}")
+    row.setdefault("created_at", datetime.utcnow())
+
+    if not is_running():
+        # No flusher in this process: write through
+        from app.core.database import SessionLocal
+
+        session = db or SessionLocal()
+        try:
+            _insert_rows(session, [(model, row)])
+        finally:
+            if db is None:
+                session.close()
+        return True
+
+    with _lock:
+        if len(_queue) >= settings.ANALYTICS_QUEUE_MAX_EVENTS:
+            _stats["dropped"] += 1
+            return False
+        _queue.append((model, row))
+        _stats["enqueued"] += 1
+        depth = len(_queue)
+        _stats["max_queue_depth"] = max(_stats["max_queue_depth"], depth)
+    if depth >= settings.ANALYTICS_FLUSH_MAX_EVENTS:
+        _wake()
+    return True
+
+
+def record_many(rows: List[Tuple[Type, Dict[str, Any]]], db: Optional[Session] = None) -> int:
+    """
+    Queue several rows under one lock (or insert them in one transaction
+    when no flusher runs); returns how many were accepted. Rows beyond the
+    free queue capacity are dropped.
+    """
+    now = datetime.utcnow()
+    for model, row in rows:
+        if model not in MODELS:
+            raise ValueError(f"Not an analytics model: {model}")
+        row.setdefault("created_at", now)
+    if not rows:
+        return 0
+
+    if not is_running():
+        from app.core.database import SessionLocal
+
+        session = db or SessionLocal()
+        try:
+            return _insert_rows(session, rows)
+        finally:
+            if db is None:
+                session.close()
+
+    with _lock:
+        room = max(0, settings.ANALYTICS_QUEUE_MAX_EVENTS - len(_queue))
+        accepted = rows[:room]
+        _queue.extend(accepted)
+        _stats["enqueued"] += len(accepted)
+        _stats["dropped"] += len(rows) - len(accepted)
+        depth = len(_queue)
+        _stats["max_queue_depth"] = max(_stats["max_queue_depth"], depth)
+    if depth >= settings.ANALYTICS_FLUSH_MAX_EVENTS:
+        _wake()
+    return len(accepted)
+
+
+def _take(limit: int) -> List[Tuple[Type, Dict[str, Any]]]:
+    with _lock:
+        count = min(limit, len(_queue))
+        return [_queue.popleft() for _ in range(count)]
+
+
+def _requeue(rows: List[Tuple[Type, Dict[str, Any]]]) -> None:
+    """Put rows of a failed flush back at the front, as far as capacity allows"""
+    with _lock:
+        room = max(0, settings.ANALYTICS_QUEUE_MAX_EVENTS - len(_queue))
+        kept = rows[:room]
+        _queue.extendleft(reversed(kept))
+        _stats["requeued"] += len(kept)
+        _stats["dropped"] += len(rows) - len(kept)
+
+
+def _is_transient(error: Exception) -> bool:
+    """Connection/database availability problems, as opposed to a bad row"""
+    return isinstance(error, (OperationalError, InterfaceError)) or (
+        isinstance(error, DBAPIError) and error.connection_invalidated
+    )
+
+
+def _insert_each(db: Session, rows: List[Tuple[Type, Dict[str, Any]]]) -> int:
+    """
+    Insert rows one by one (a savepoint each) after their batch failed,
+    discarding the rows the database refuses; returns rows inserted.
+    Transient errors propagate.
+    """
+    inserted, rejected = 0, 0
+    for model, row in rows:
+        try:
+            with db.begin_nested():
+                db.execute(insert(model), [row])
+            inserted += 1
+        except Exception as e:
+            if _is_transient(e):
+                raise
+            rejected += 1
+            print(f"Analytics row rejected ({model.__tablename__}): {e}")
+    db.commit()
+    with _lock:
+        _stats["rejected"] += rejected
+    return inserted
+
+
+def flush_queue(db: Session, max_batches: Optional[int] = None) -> int:
+    """Insert queued rows in batches of ANALYTICS_FLUSH_MAX_EVENTS; returns rows inserted"""
+    global _last_flush_at
+    inserted, batches = 0, 0
+    while max_batches is None or batches < max_batches:
+        rows = _take(settings.ANALYTICS_FLUSH_MAX_EVENTS)
+        if not rows:
+            break
+        try:
+            try:
+                inserted += _insert_rows(db, rows)
+            except Exception as e:
+                db.rollback()
+                if _is_transient(e):
+                    raise
+                # A bad row fails the whole INSERT; keep the rest of the batch
+                inserted += _insert_each(db, rows)
+        except Exception as e:
+            db.rollback()
+            _requeue(rows)
+            with _lock:
+                _stats["failed_flushes"] += 1
+            print(f"Analytics flush failed ({len(rows)} rows re-queued): {e}")
+            break
+        batches += 1
+    with _lock:
+        _stats["inserted"] += inserted
+        _last_flush_at = time.monotonic()
+    return inserted
+
+
+def flush_all(db: Session) -> int:
+    """Insert everything still queued (application shutdown)"""
+    return flush_queue(db)
+
+
+async def run_analytics_flusher(interval_ms: int = None):
+    """Background loop that flushes queued analytics rows every interval or when the queue fills"""
+    from app.core.database import SessionLocal
+
+    global _loop, _wakeup
+    interval = (interval_ms or settings.ANALYTICS_FLUSH_INTERVAL_MS) / 1000
+    _wakeup = asyncio.Event()
+    _loop = asyncio.get_running_loop()
+
+    def _flush():
+        db = SessionLocal()
+        try:
+            # Bounded per pass so a backlog cannot starve the wake-up checks
+            return flush_queue(db, max_batches=10)
+        finally:
+            db.close()
+
+    try:
+        while True:
+            try:
+                await asyncio.wait_for(_wakeup.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+            _wakeup.clear()
+            try:
+                await asyncio.to_thread(_flush)
+            except Exception as e:
+                print(f"Analytics flush failed: {e}")
+            with _lock:
+                backlog = len(_queue) >= settings.ANALYTICS_FLUSH_MAX_EVENTS
+            if backlog:
+                _wakeup.set()  # Keep draining without waiting a full interval
+    finally:
+        _loop, _wakeup = None, None
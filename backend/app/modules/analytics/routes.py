@@ -2,11 +2,14 @@
 Analytics API routes
 """
 
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.database import get_db
-from app.modules.analytics import trackers, reports
+from app.modules.analytics import ingest, trackers, reports
+from app.modules.analytics.schemas import TrackBatchAdapter
 from app.modules.analytics.chatbot_reports import get_chatbot_usage
 from app.utils.ip_location import get_location_from_ip
 from app.utils.device_detection import detect_device_type
@@ -24,9 +27,8 @@ async def track_event(
     latitude: float | None = None,
     longitude: float | None = None,
     search_query: str | None = None,
-    db: Session = Depends(get_db),
 ):
-    """Track an analytics event"""
+    """Track an analytics event (queued; written in batches)"""
     client_ip = request.client.host if request.client else "unknown"
     user_agent = request.headers.get("user-agent", "unknown")
     
@@ -38,8 +40,8 @@ async def track_event(
             longitude = longitude or ip_location.get('longitude')
             city = city or ip_location.get('city')
 
-    trackers.track_event(
-        db=db,
+    queued = trackers.track_event(
+        db=None,
         event_type=event_type,
         job_id=job_id,
         spa_id=spa_id,
@@ -51,7 +53,80 @@ async def track_event(
         search_query=search_query
     )
 
-    return {"status": "tracked"}
+    return {"status": "tracked" if queued else "dropped"}
+
+
+@router.post("/track-batch")
+async def track_batch(request: Request):
+    """
+    Track several events and button clicks in one request.
+
+    Body: a JSON array of
+    - {"kind": "event", "event_type": "page_view" | "apply_click" | "job_search" | ..., job_id, spa_id, city, latitude, longitude, search_query}
+    - {"kind": "button_click", "button_type": "whatsapp" | "call" | "share" | "apply", job_id, user_id, city, latitude, longitude, share_platform}
+
+    The body is read whatever its Content-Type, so browsers can send it with
+    navigator.sendBeacon() as text/plain (no CORS preflight) when the page is hidden.
+    Bodies over ANALYTICS_BATCH_MAX_BYTES are rejected (413) before parsing.
+    """
+    too_large = HTTPException(
+        status_code=413,
+        detail=f"At most {settings.ANALYTICS_BATCH_MAX_BYTES} bytes per batch",
+    )
+    try:
+        if int(request.headers.get("content-length", 0)) > settings.ANALYTICS_BATCH_MAX_BYTES:
+            raise too_large
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Content-Length")
+
+    # Read at most the cap, also for chunked bodies without a Content-Length
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > settings.ANALYTICS_BATCH_MAX_BYTES:
+            raise too_large
+
+    try:
+        items = TrackBatchAdapter.validate_json(bytes(body))
+    except ValidationError as e:
+        # Without "input": it may be the raw (non-JSON) body
+        errors = [
+            {key: value for key, value in error.items() if key != "input"}
+            for error in e.errors(include_url=False, include_context=False)
+        ]
+        raise HTTPException(status_code=422, detail=errors)
+    if len(items) > settings.ANALYTICS_BATCH_MAX_EVENTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.ANALYTICS_BATCH_MAX_EVENTS} events per batch",
+        )
+
+    client_ip = request.client.host if request.client else "unknown"
+    user_agent = request.headers.get("user-agent", "unknown")
+
+    # One IP lookup for the whole batch, only if some event has no coordinates
+    location = None
+    if any(not item.latitude or not item.longitude for item in items):
+        location = get_location_from_ip(client_ip)
+
+    accepted = trackers.track_batch(
+        db=None,
+        items=items,
+        user_agent=user_agent,
+        ip_address=client_ip,
+        location=location,
+    )
+    return {"status": "tracked", "accepted": accepted, "dropped": len(items) - accepted}
+
+
+@router.get("/ingest-stats")
+def get_ingest_stats():
+    """
+    Analytics ingestion queue metrics for this worker: rows enqueued,
+    inserted, dropped (queue full), rejected by the database (bad data),
+    re-queued after failed flushes, and the current/maximum queue depth.
+    """
+    return ingest.get_stats()
 
 
 @router.get("/popular-locations")
@@ -183,7 +258,6 @@ async def track_button_click(
     latitude: float | None = None,
     longitude: float | None = None,
     share_platform: str | None = None,  # For share button
-    db: Session = Depends(get_db),
 ):
     """
     Track a button click (WhatsApp, Call, Share, or Apply).
@@ -201,9 +275,8 @@ async def track_button_click(
             longitude = longitude or ip_location.get('longitude')
             city = city or ip_location.get('city')
     
-    from app.modules.analytics import trackers
-    trackers.track_button_click(
-        db=db,
+    queued = trackers.track_button_click(
+        db=None,
         button_type=button_type,
         job_id=job_id,
         user_id=user_id,
@@ -215,7 +288,7 @@ async def track_button_click(
         share_platform=share_platform
     )
     
-    return {"status": "tracked"}
+    return {"status": "tracked" if queued else "dropped"}
 
 
 @router.get("/button-clicks")
@@ -0,0 +1,37 @@
+"""
+Analytics Pydantic schemas
+"""
+
+from typing import Annotated, List, Literal, Optional, Union
+
+from pydantic import BaseModel, Field, TypeAdapter
+
+
+class TrackedEvent(BaseModel):
+    """An analytics event (page_view, apply_click, job_search, ...)"""
+    kind: Literal["event"]
+    event_type: str = Field(..., min_length=1, max_length=50)
+    job_id: Optional[int] = None
+    spa_id: Optional[int] = None
+    city: Optional[str] = Field(None, max_length=100)
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    search_query: Optional[str] = Field(None, max_length=255)
+
+
+class TrackedButtonClick(BaseModel):
+    """A WhatsApp/Call/Share/Apply button click on a job"""
+    kind: Literal["button_click"]
+    button_type: Literal["whatsapp", "call", "share", "apply"]
+    job_id: int
+    user_id: Optional[int] = None
+    city: Optional[str] = Field(None, max_length=100)
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    share_platform: Optional[str] = Field(None, max_length=50)  # For share button
+
+
+TrackedItem = Annotated[Union[TrackedEvent, TrackedButtonClick], Field(discriminator="kind")]
+
+# Validates a whole /track-batch body (a JSON array of TrackedItem) in one pass
+TrackBatchAdapter = TypeAdapter(List[TrackedItem])
@@ -1,10 +1,14 @@
 """
 Analytics tracking utilities
+Rows are queued and bulk-inserted by app.modules.analytics.ingest
 """
 
 import hashlib
+from typing import Any, Dict, List, Optional, Union
 from sqlalchemy.orm import Session
+from app.modules.analytics import ingest
 from app.modules.analytics.models import AnalyticsEvent, JobButtonClickAnalytics
+from app.modules.analytics.schemas import TrackedButtonClick, TrackedEvent
 from app.utils.device_detection import detect_device_type
 
 
@@ -14,7 +18,7 @@ def hash_ip(ip: str) -> str:
 
 
 def track_event(
-    db: Session,
+    db: Optional[Session],
     event_type: str,
     job_id: int = None,
     spa_id: int = None,
@@ -26,12 +30,12 @@ def track_event(
     device_type: str = None,
     search_query: str = None
 ):
-    """Track an analytics event"""
+    """Queue an analytics event; returns False if it was dropped (queue full)"""
     # Auto-detect device type if not provided
     if not device_type and user_agent:
         device_type = detect_device_type(user_agent)
     
-    event = AnalyticsEvent(
+    return ingest.record(AnalyticsEvent, dict(
         event_type=event_type,
         job_id=job_id,
         spa_id=spa_id,
@@ -42,14 +46,11 @@ def track_event(
         ip_hash=hash_ip(ip_address) if ip_address else None,
         device_type=device_type,
         search_query=search_query
-    )
-    db.add(event)
-    db.commit()
-    return event
+    ), db)
 
 
 def track_button_click(
-    db: Session,
+    db: Optional[Session],
     button_type: str,  # 'whatsapp', 'call', 'share', 'apply'
     job_id: int,
     user_id: int = None,
@@ -61,12 +62,12 @@ def track_button_click(
     device_type: str = None,
     share_platform: str = None  # For share button: 'facebook', 'twitter', 'linkedin', 'whatsapp', 'email', 'native'
 ):
-    """Track a button click (WhatsApp, Call, Share, or Apply)"""
+    """Queue a button click (WhatsApp, Call, Share, or Apply); returns False if it was dropped"""
     # Auto-detect device type if not provided
     if not device_type and user_agent:
         device_type = detect_device_type(user_agent)
     
-    click_event = JobButtonClickAnalytics(
+    return ingest.record(JobButtonClickAnalytics, dict(
         button_type=button_type,
         job_id=job_id,
         user_id=user_id,
@@ -77,8 +78,35 @@ def track_button_click(
         ip_hash=hash_ip(ip_address) if ip_address else None,
         device_type=device_type,
         share_platform=share_platform
-    )
-    db.add(click_event)
-    db.commit()
-    return click_event
+    ), db)
 
+
+
+def track_batch(
+    db: Optional[Session],
+    items: List[Union[TrackedEvent, TrackedButtonClick]],
+    user_agent: str = None,
+    ip_address: str = None,
+    location: Optional[Dict[str, Any]] = None
+) -> int:
+    """
+    Queue a client-side batch of events and button clicks from one visitor.
+    Device type and IP hash are computed once for the whole batch; location
+    (from the client IP) fills in events sent without coordinates.
+    Returns how many were accepted.
+    """
+    device_type = detect_device_type(user_agent) if user_agent else None
+    ip_hash = hash_ip(ip_address) if ip_address else None
+    location = location or {}
+
+    rows = []
+    for item in items:
+        row = item.model_dump(exclude={"kind"})
+        if not row["latitude"] or not row["longitude"]:
+            row["latitude"] = row["latitude"] or location.get("latitude")
+            row["longitude"] = row["longitude"] or location.get("longitude")
+            row["city"] = row["city"] or location.get("city")
+        row.update(user_agent=user_agent, ip_hash=ip_hash, device_type=device_type)
+        model = JobButtonClickAnalytics if isinstance(item, TrackedButtonClick) else AnalyticsEvent
+        rows.append((model, row))
+    return ingest.record_many(rows, db)
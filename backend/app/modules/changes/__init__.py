@@ -0,0 +1,3 @@
+"""
+Change feed module: ordered job/spa change events for incremental consumers
+"""
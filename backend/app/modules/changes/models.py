@@ -0,0 +1,122 @@
+"""
+Change feed models
+
+Every committed insert, update, (de)activation and delete of a Job or Spa
+appends a row to change_events inside the same transaction (mapper events
+below), so the feed can never miss or invent a change. Core bulk writes
+bypass mapper events and must call record_changes() themselves.
+
+Each row also stores the id of the transaction that wrote it (xid). Ids are
+handed out at insert time, not at commit, so a transaction can commit an id
+lower than one a client has already read; the feed is therefore ordered by
+(xid, id) and only serves rows of transactions older than every transaction
+still in progress (see services.get_changes).
+"""
+
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String, event, inspect, insert, text
+
+from app.core.database import Base
+from app.modules.jobs.models import Job
+from app.modules.spas.models import Spa
+
+
+class ChangeAction:
+    CREATED = "created"
+    UPDATED = "updated"
+    DEACTIVATED = "deactivated"
+    ACTIVATED = "activated"
+    DELETED = "deleted"
+
+
+class ChangeEvent(Base):
+    __tablename__ = "change_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    entity = Column(String(10), nullable=False)  # "job" or "spa"
+    entity_id = Column(Integer, nullable=False)
+    action = Column(String(20), nullable=False)
+    slug = Column(String(300), nullable=True)
+    changed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    xid = Column(BigInteger, nullable=False, server_default=text("txid_current()"))  # Writing transaction
+
+    __table_args__ = (
+        Index('idx_change_events_xid_id', 'xid', 'id'),
+        Index('idx_change_events_entity_xid_id', 'entity', 'xid', 'id'),
+        Index('idx_change_events_changed_at', 'changed_at'),
+    )
+
+
+class ChangeFeedWatermark(Base):
+    """
+    Feed position (xid, event id) of the newest event pruned so far; cursors
+    before it may have missed pruned events (single row, id 1)
+    """
+    __tablename__ = "change_feed_watermark"
+
+    id = Column(Integer, primary_key=True, default=1)
+    xid = Column(BigInteger, nullable=False, default=0)
+    event_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+ENTITIES = {Job: "job", Spa: "spa"}
+
+
+def record_changes(connection, entity: str, rows: Iterable[tuple], action: str) -> None:
+    """Append change events for (entity_id, slug) rows in the caller's transaction"""
+    values = [
+        {"entity": entity, "entity_id": entity_id, "action": action, "slug": slug, "changed_at": datetime.utcnow()}
+        for entity_id, slug in rows
+    ]
+    if values:
+        connection.execute(insert(ChangeEvent), values)
+
+
+def _previous_is_active(target) -> Optional[bool]:
+    history = inspect(target).attrs.is_active.history
+    if history.deleted:
+        return history.deleted[0]
+    return target.is_active
+
+
+def _has_column_changes(mapper, target) -> bool:
+    state = inspect(target)
+    return any(state.attrs[attr.key].history.has_changes() for attr in mapper.column_attrs)
+
+
+def _track_previous_value(target, value, oldvalue, initiator):
+    """No-op; registered with active_history so expired old values get loaded on set."""
+
+
+event.listen(Spa.is_active, "set", _track_previous_value, active_history=True)
+
+
+def _record_insert(mapper, connection, target) -> None:
+    record_changes(connection, ENTITIES[mapper.class_], [(target.id, target.slug)], ChangeAction.CREATED)
+
+
+def _record_update(mapper, connection, target) -> None:
+    # after_update also fires for objects flushed without net changes
+    if not _has_column_changes(mapper, target):
+        return
+    was_active, is_active = _previous_is_active(target) is True, target.is_active is True
+    if was_active and not is_active:
+        action = ChangeAction.DEACTIVATED
+    elif is_active and not was_active:
+        action = ChangeAction.ACTIVATED
+    else:
+        action = ChangeAction.UPDATED
+    record_changes(connection, ENTITIES[mapper.class_], [(target.id, target.slug)], action)
+
+
+def _record_delete(mapper, connection, target) -> None:
+    record_changes(connection, ENTITIES[mapper.class_], [(target.id, target.slug)], ChangeAction.DELETED)
+
+
+for _model in ENTITIES:
+    event.listen(_model, "after_insert", _record_insert)
+    event.listen(_model, "after_update", _record_update)
+    event.listen(_model, "after_delete", _record_delete)
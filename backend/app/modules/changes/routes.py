@@ -0,0 +1,57 @@
+"""
+Change feed API routes
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.modules.changes import schemas, services
+
+router = APIRouter(prefix="/api/changes", tags=["changes"])
+
+
+@router.get("/", response_model=schemas.ChangeFeedResponse)
+def get_changes(
+    since: str = "0",
+    limit: int = 500,
+    entity: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Jobs and spas created, updated, (de)activated or deleted after the
+    `since` cursor. Start with since=0 and pass next_cursor back until
+    has_more is false. A change never appears before a cursor that has
+    already been returned, so following next_cursor misses nothing.
+    Returns 410 if events after the cursor have been pruned (retention
+    window); resync from the full listings and restart from since=0.
+    """
+    if limit < 1 or limit > 1000:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 1000")
+    if entity is not None and entity not in ("job", "spa"):
+        raise HTTPException(status_code=400, detail="entity must be 'job' or 'spa'")
+    try:
+        cursor = services.parse_cursor(since)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if services.is_cursor_expired(db, cursor):
+        raise HTTPException(status_code=410, detail="Cursor expired; resync and restart from since=0")
+
+    events, next_cursor, has_more = services.get_changes(db, since=cursor, limit=limit, entity=entity)
+    return {
+        "changes": [
+            {
+                "cursor": services.format_cursor((event.xid, event.id)),
+                "entity": event.entity,
+                "entity_id": event.entity_id,
+                "action": event.action,
+                "slug": event.slug,
+                "changed_at": event.changed_at,
+            }
+            for event in events
+        ],
+        "next_cursor": services.format_cursor(next_cursor),
+        "has_more": has_more,
+    }
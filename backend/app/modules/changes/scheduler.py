@@ -0,0 +1,26 @@
+"""
+Periodic maintenance tasks for the change feed
+This should be run as a separate process or cron job
+"""
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.modules.changes.services import prune_change_events
+
+
+def run_change_feed_pruning():
+    """Drop change events older than CHANGE_FEED_RETENTION_DAYS"""
+    db = SessionLocal()
+    try:
+        rows = prune_change_events(db, settings.CHANGE_FEED_RETENTION_DAYS)
+        print(f"Pruned {rows} change events")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    """
+    Run this script as a cron job or scheduled task:
+    - Daily: python -m app.modules.changes.scheduler
+    """
+    run_change_feed_pruning()
@@ -0,0 +1,23 @@
+"""
+Change feed schemas
+"""
+
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class ChangeEventResponse(BaseModel):
+    cursor: str
+    entity: str
+    entity_id: int
+    action: str
+    slug: Optional[str] = None
+    changed_at: datetime
+
+
+class ChangeFeedResponse(BaseModel):
+    changes: List[ChangeEventResponse]
+    next_cursor: str  # Pass as ?since= on the next call
+    has_more: bool
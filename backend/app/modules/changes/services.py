@@ -0,0 +1,89 @@
+"""
+Change feed business logic
+"""
+
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import Session
+
+from app.modules.changes import models
+
+# Feed position: (xid of the writing transaction, event id)
+Cursor = Tuple[int, int]
+
+
+def parse_cursor(value: str) -> Cursor:
+    """
+    "<xid>.<id>" as returned in next_cursor; a bare event id (cursors issued
+    before events carried their xid) is read as (0, id). Raises ValueError.
+    """
+    xid, _, event_id = value.rpartition(".")
+    cursor = (int(xid) if xid else 0, int(event_id))
+    if cursor[0] < 0 or cursor[1] < 0:
+        raise ValueError(value)
+    return cursor
+
+
+def format_cursor(cursor: Cursor) -> str:
+    return f"{cursor[0]}.{cursor[1]}"
+
+
+def get_changes(
+    db: Session, since: Cursor = (0, 0), limit: int = 500, entity: Optional[str] = None
+) -> Tuple[List[models.ChangeEvent], Cursor, bool]:
+    """
+    Change events after the `since` cursor, in (xid, id) order.
+    Returns (events, next cursor, has more).
+
+    Only events of transactions older than the oldest one still running are
+    returned: every transaction that could yet commit an event has a larger
+    xid, so nothing can later appear before a cursor already handed out.
+    (Events are held back for as long as that oldest transaction runs.)
+    """
+    horizon = func.txid_snapshot_xmin(func.txid_current_snapshot())
+    query = db.query(models.ChangeEvent).filter(
+        models.ChangeEvent.xid < horizon,
+        tuple_(models.ChangeEvent.xid, models.ChangeEvent.id) > tuple_(*since),
+    )
+    if entity:
+        query = query.filter(models.ChangeEvent.entity == entity)
+    events = query.order_by(models.ChangeEvent.xid, models.ChangeEvent.id).limit(limit + 1).all()
+
+    has_more = len(events) > limit
+    events = events[:limit]
+    next_cursor = (events[-1].xid, events[-1].id) if events else since
+    return events, next_cursor, has_more
+
+
+def is_cursor_expired(db: Session, since: Cursor) -> bool:
+    """
+    True if events after `since` have been pruned, so the client must
+    resync from a full listing.
+    """
+    if since == (0, 0):
+        return False
+    watermark = db.get(models.ChangeFeedWatermark, 1)
+    return watermark is not None and since < (watermark.xid, watermark.event_id)
+
+
+def prune_change_events(db: Session, retention_days: int) -> int:
+    """Delete change events older than the retention window and advance the pruning watermark"""
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    expired = db.query(models.ChangeEvent).filter(models.ChangeEvent.changed_at < cutoff)
+    newest = expired.with_entities(
+        models.ChangeEvent.xid, models.ChangeEvent.id
+    ).order_by(models.ChangeEvent.xid.desc(), models.ChangeEvent.id.desc()).first()
+    if newest is None:
+        return 0
+
+    watermark = db.get(models.ChangeFeedWatermark, 1)
+    if watermark is None:
+        watermark = models.ChangeFeedWatermark(id=1, xid=0, event_id=0)
+        db.add(watermark)
+    if tuple(newest) > (watermark.xid, watermark.event_id):
+        watermark.xid, watermark.event_id = newest
+    deleted = expired.delete(synchronize_session=False)
+    db.commit()
+    return deleted
@@ -187,6 +187,20 @@ async def chatbot_search(
             job_category=None,  # We'll filter by role name
         )
         
+        # Distance filter for "near me", computed for all candidate jobs at once
+        outside_radius = set()
+        if filters["near_me"] and latitude and longitude:
+            from app.utils.geo_utils import within_radius_mask
+            located_jobs = [job for job in all_jobs if job.latitude and job.longitude]
+            if located_jobs:
+                mask = within_radius_mask(
+                    latitude, longitude,
+                    [job.latitude for job in located_jobs],
+                    [job.longitude for job in located_jobs],
+                    radius_km=10,  # Within 10km
+                )
+                outside_radius = {job.id for job, inside in zip(located_jobs, mask) if not inside}
+        
         # Filter jobs based on extracted criteria
         filtered_jobs = []
         for job in all_jobs:
@@ -204,12 +218,8 @@ async def chatbot_search(
                         continue
             
             # Filter by "near me" using coordinates
-            if filters["near_me"] and latitude and longitude:
-                if job.latitude and job.longitude:
-                    from app.utils.geo_utils import calculate_distance
-                    distance = calculate_distance(latitude, longitude, job.latitude, job.longitude)
-                    if distance > 10:  # Within 10km
-                        continue
+            if job.id in outside_radius:
+                continue
             
             filtered_jobs.append(job)
             
@@ -239,8 +249,8 @@ async def chatbot_search(
     elif filters["intent"] == "spa_search":
         if filters["near_me"] and latitude and longitude:
             # Get SPAs near location
-            nearby_spas = spa_services.get_spas_near_location(db, latitude, longitude, radius_km=10)
-            formatted_spas = [format_spa_for_chatbot(spa) for spa in nearby_spas[:5]]
+            nearby_spas = spa_services.get_spas_near_location(db, latitude, longitude, radius_km=10, limit=5)
+            formatted_spas = [format_spa_for_chatbot(spa) for spa in nearby_spas]
         elif filters["city"]:
             # Get SPAs by city
             all_spas = spa_services.get_spas(db, skip=0, limit=50, is_active=True)
@@ -0,0 +1,184 @@
+"""
+Bulk job import (JSON or CSV)
+
+Rows are validated in one pass, spas/locations/taxonomy ids are resolved
+with one query per table, slugs are allocated in one batch and all valid
+rows are written with a single multi-row INSERT ... RETURNING.
+"""
+
+import csv
+import io
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.modules.changes.models import ChangeAction, record_changes
+from app.modules.jobs import models, schemas
+from app.modules.jobs.models import ROLLUP_KEY_FIELDS, assign_job_slugs
+from app.modules.jobs.seo import regenerate_job_schemas
+from app.modules.landing.services import invalidate_for_jobs
+from app.modules.locations.models import Country, State, City, Area
+from app.modules.seo.artifacts import mark_dirty, shard_name
+from app.modules.spas.models import Spa
+from app.utils.slug_allocator import is_slug_conflict
+
+MAX_BULK_ROWS = 1000
+
+_job_create_adapter = TypeAdapter(schemas.JobCreate)
+
+
+def parse_csv(text: str) -> List[Dict[str, Any]]:
+    """Parse CSV text with a header row of JobCreate field names; empty cells are omitted"""
+    reader = csv.DictReader(io.StringIO(text))
+    return [
+        {key.strip(): value for key, value in row.items() if key and value not in (None, "")}
+        for row in reader
+    ]
+
+
+def _format_validation_error(error: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(part) for part in item['loc']) or 'row'}: {item['msg']}"
+        for item in error.errors()
+    ]
+
+
+def _existing_ids(db: Session, model, ids) -> set:
+    ids = {value for value in ids if value is not None}
+    if not ids:
+        return set()
+    return {row[0] for row in db.execute(select(model.id).where(model.id.in_(ids)))}
+
+
+def _row_to_job_data(job: schemas.JobCreate) -> Dict[str, Any]:
+    """Mirror create_job's mapping of schema fields to model columns (schema_json is generated)"""
+    return job.model_dump(exclude_none=False, by_alias=False)
+
+
+def import_jobs(db: Session, rows: List[Dict[str, Any]], user) -> Tuple[List[int], List[Dict[str, Any]]]:
+    """
+    Validate and insert many jobs at once.
+
+    Invalid rows are skipped and reported; valid rows are inserted in one
+    transaction. Returns (created_job_ids, errors) where each error is
+    {"row": index, "errors": [messages]}.
+    """
+    from app.modules.users.models import UserRole
+
+    errors: Dict[int, List[str]] = {}
+    valid: List[Tuple[int, schemas.JobCreate]] = []
+
+    # 1. Schema validation (one pass, one cached adapter)
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors[index] = ["row: expected an object"]
+            continue
+        try:
+            valid.append((index, _job_create_adapter.validate_python(row)))
+        except ValidationError as e:
+            errors[index] = _format_validation_error(e)
+
+    # 2. Resolve referenced ids in batch (one query per table)
+    spa_ids = {job.spa_id for _, job in valid}
+    spas = {}
+    if spa_ids:
+        spas = {
+            spa_id: (latitude, longitude)
+            for spa_id, latitude, longitude in db.execute(
+                select(Spa.id, Spa.latitude, Spa.longitude).where(Spa.id.in_(spa_ids))
+            )
+        }
+    known = {
+        "country_id": _existing_ids(db, Country, [job.country_id for _, job in valid]),
+        "state_id": _existing_ids(db, State, [job.state_id for _, job in valid]),
+        "city_id": _existing_ids(db, City, [job.city_id for _, job in valid]),
+        "area_id": _existing_ids(db, Area, [job.area_id for _, job in valid]),
+        "job_type_id": _existing_ids(db, models.JobType, [job.job_type_id for _, job in valid]),
+        "job_category_id": _existing_ids(db, models.JobCategory, [job.job_category_id for _, job in valid]),
+    }
+
+    job_rows: List[Tuple[int, Dict[str, Any]]] = []
+    for index, job in valid:
+        row_errors = []
+        if job.spa_id not in spas:
+            row_errors.append("spa_id: SPA not found")
+        elif user.role == UserRole.RECRUITER and job.spa_id != user.managed_spa_id:
+            row_errors.append("spa_id: Recruiters can only post jobs on their own SPA")
+        for field, ids in known.items():
+            value = getattr(job, field)
+            if value is not None and value not in ids:
+                row_errors.append(f"{field}: {value} not found")
+        if row_errors:
+            errors[index] = row_errors
+            continue
+
+        job_data = _row_to_job_data(job)
+        # Auto-fill latitude/longitude from Spa if missing
+        if job_data.get("latitude") is None or job_data.get("longitude") is None:
+            job_data["latitude"], job_data["longitude"] = spas[job.spa_id]
+        job_data["created_by"] = user.id
+        job_data["updated_by"] = user.id
+        job_rows.append((index, job_data))
+
+    sorted_errors = [{"row": index, "errors": errors[index]} for index in sorted(errors)]
+    if not job_rows:
+        return [], sorted_errors
+
+    job_ids = _insert_jobs(db, [job_data for _, job_data in job_rows])
+    regenerate_job_schemas(db, models.Job.id.in_(job_ids))
+    # Core inserts skip the mapper events that queue sitemap shards and drop landing pages
+    mark_dirty(*{shard_name("jobs", job_id) for job_id in job_ids}, "locations", "category-location")
+    invalidate_for_jobs(job_data for _, job_data in job_rows)
+    return job_ids, sorted_errors
+
+
+def _insert_jobs(db: Session, job_rows: List[Dict[str, Any]], attempts: int = 3) -> List[int]:
+    """
+    Allocate slugs in one batch and insert all rows with one multi-row
+    INSERT ... RETURNING (executemany). Core inserts bypass the Job mapper
+    events, so job_count_rollup deltas and change feed events are applied
+    here.
+    """
+    connection = db.connection()
+    for attempt in range(attempts):
+        # Fresh copies each attempt: a slug left over from a conflicting
+        # attempt would make assign_job_slugs skip the row
+        targets = [models.Job(**{**job_data, "slug": None}) for job_data in job_rows]
+        assign_job_slugs(connection, targets)
+        attempt_rows = [
+            {**job_data, "slug": target.slug} for job_data, target in zip(job_rows, targets)
+        ]
+
+        try:
+            with db.begin_nested():
+                # sort_by_parameter_order: returned (id, slug) pairs follow attempt_rows
+                inserted = db.execute(
+                    insert(models.Job).returning(
+                        models.Job.id, models.Job.slug, sort_by_parameter_order=True
+                    ),
+                    attempt_rows,
+                ).all()
+                job_ids = [job_id for job_id, _ in inserted]
+
+                rollup_deltas = Counter(
+                    tuple(job_data.get(field) or 0 for field in ROLLUP_KEY_FIELDS)
+                    for job_data in attempt_rows
+                    if job_data.get("is_active", True) is not False
+                )
+                for key, delta in rollup_deltas.items():
+                    models._apply_rollup_delta(connection, key, delta)
+                record_changes(connection, "job", [tuple(row) for row in inserted], ChangeAction.CREATED)
+            db.commit()
+            for job_data, target in zip(job_rows, targets):
+                job_data["slug"] = target.slug
+            return job_ids
+        except IntegrityError as e:
+            # A concurrent insert took one of the slugs; allocate again
+            if attempt == attempts - 1 or not is_slug_conflict(e):
+                db.rollback()
+                raise
+    return []
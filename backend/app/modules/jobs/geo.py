@@ -2,11 +2,57 @@
 Geographic search utilities for jobs
 """
 
-from sqlalchemy import func
+import math
+from typing import List, Optional, Tuple
+from sqlalchemy import func, literal_column, text
 from sqlalchemy.orm import Session, joinedload
 from app.modules.jobs.models import Job
-from app.core.config import settings
-from app.utils.geo_utils import calculate_distance
+from app.modules.locations.snapshot import with_locations
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LAT = 111.045
+
+# Whether jobs.geog (PostGIS geography column) exists; detected once per process
+_has_geography_column: Optional[bool] = None
+
+
+def has_geography_column(db: Session) -> bool:
+    """
+    Check whether the PostGIS `jobs.geog` column is available
+    (created by add_job_geography_migration.py).
+    """
+    global _has_geography_column
+    if _has_geography_column is None:
+        try:
+            _has_geography_column = db.execute(text("""
+                SELECT 1 FROM information_schema.columns
+                WHERE table_name = 'jobs' AND column_name = 'geog'
+            """)).first() is not None
+        except Exception:
+            db.rollback()
+            _has_geography_column = False
+    return _has_geography_column
+
+
+def _bounding_box(latitude: float, longitude: float, radius_km: float):
+    """Return (min_lat, max_lat, min_lng, max_lng) enclosing the search circle"""
+    lat_delta = radius_km / KM_PER_DEGREE_LAT
+    # Avoid division by ~0 near the poles
+    cos_lat = max(math.cos(math.radians(latitude)), 0.01)
+    lng_delta = radius_km / (KM_PER_DEGREE_LAT * cos_lat)
+    return latitude - lat_delta, latitude + lat_delta, longitude - lng_delta, longitude + lng_delta
+
+
+def _haversine_sql(latitude: float, longitude: float):
+    """SQL expression for haversine distance (km) from the given point to each job"""
+    dlat = func.radians(Job.latitude - latitude)
+    dlng = func.radians(Job.longitude - longitude)
+    a = (
+        func.power(func.sin(dlat * 0.5), 2) +
+        math.cos(math.radians(latitude)) * func.cos(func.radians(Job.latitude)) *
+        func.power(func.sin(dlng * 0.5), 2)
+    )
+    return 2 * EARTH_RADIUS_KM * func.asin(func.sqrt(func.least(a, 1.0)))
 
 
 def get_jobs_near_location(
@@ -14,41 +60,55 @@ def get_jobs_near_location(
     latitude: float,
     longitude: float,
     radius_km: float = 10,
-    limit: int = 50
-):
+    limit: int = 50,
+    skip: int = 0,
+) -> Tuple[List[Job], int]:
     """
-    Get jobs near a location using PostgreSQL.
-    Uses PostGIS ST_DWithin for optimal performance (when PostGIS is enabled),
-    otherwise filters by distance in Python.
+    Get active jobs within radius_km of a location, nearest first.
+
+    Uses PostGIS ST_DWithin on the `jobs.geog` GiST index when available,
+    otherwise a bounding-box prefilter on the (latitude, longitude) index
+    followed by an exact haversine filter, both evaluated in PostgreSQL.
+    Each returned job has a transient `distance_km` attribute.
+    Returns (jobs, total_matching).
     """
-    # Eagerly load relationships for better performance
-    query_options = [
-        joinedload(Job.city),
-        joinedload(Job.area),
-        joinedload(Job.state),
-        joinedload(Job.country),
-        joinedload(Job.spa),
-        joinedload(Job.job_type),
-        joinedload(Job.job_category),
-    ]
+    if has_geography_column(db):
+        geog = literal_column("jobs.geog")
+        point = func.geography(func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), 4326))
+        distance_km = func.ST_Distance(geog, point) / 1000.0
+        conditions = [func.ST_DWithin(geog, point, radius_km * 1000.0)]
+    else:
+        min_lat, max_lat, min_lng, max_lng = _bounding_box(latitude, longitude, radius_km)
+        distance_km = _haversine_sql(latitude, longitude)
+        conditions = [
+            Job.latitude.between(min_lat, max_lat),
+            Job.longitude.between(min_lng, max_lng),
+            distance_km <= radius_km,
+        ]
     
-    # TODO: Implement PostGIS query when PostGIS extension is enabled
-    # For now, get all active jobs with coordinates and filter by distance in Python
-    jobs = db.query(Job).options(*query_options).filter(
+    conditions = [
         Job.is_active == True,
         Job.latitude.isnot(None),
-        Job.longitude.isnot(None)
-    ).limit(limit * 2).all()  # Get more to filter by distance
+        Job.longitude.isnot(None),
+        *conditions,
+    ]
     
-    # Filter by distance
-    nearby_jobs = []
-    for job in jobs:
-        if job.latitude and job.longitude:
-            distance = calculate_distance(latitude, longitude, job.latitude, job.longitude)
-            if distance <= radius_km:
-                nearby_jobs.append(job)
-                if len(nearby_jobs) >= limit:
-                    break
+    total = db.query(func.count(Job.id)).filter(*conditions).scalar() or 0
+    if total == 0:
+        return [], 0
     
-    return nearby_jobs
-
+    # Eagerly load relationships for better performance (locations come from the snapshot)
+    rows = db.query(Job, distance_km.label("distance_km")).options(
+        joinedload(Job.spa),
+        joinedload(Job.job_type),
+        joinedload(Job.job_category),
+    ).filter(*conditions).order_by(
+        distance_km, Job.id
+    ).offset(skip).limit(limit).all()
+    
+    jobs = []
+    for job, distance in rows:
+        job.distance_km = round(float(distance), 3)
+        jobs.append(job)
+    
+    return with_locations(db, jobs), total
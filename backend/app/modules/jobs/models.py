@@ -2,13 +2,14 @@
 Job models
 """
 
-from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey, event, select
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey, Index, event, select, inspect
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import relationship
 from datetime import datetime
-from slugify import slugify
 
 from app.core.database import Base
 from app.utils.seo_utils import generate_unique_slug
+from app.utils.slug_allocator import allocate_slug, allocate_slugs, slug_bases_for
 
 
 class JobType(Base):
@@ -118,6 +119,11 @@ class Job(Base):
     job_category = relationship("JobCategory")
     messages = relationship("Message", back_populates="job")
 
+    # Composite index for bounding-box prefiltering in near-me search
+    __table_args__ = (
+        Index('idx_jobs_lat_lng', 'latitude', 'longitude'),
+    )
+
 
 @event.listens_for(JobType, "before_insert")
 def generate_jobtype_slug(mapper, connection, target: JobType) -> None:
@@ -139,6 +145,34 @@ def generate_jobcategory_slug(mapper, connection, target: JobCategory) -> None:
         target.slug = generate_unique_slug(target.name)
 
 
+def _job_slug_bases(connection, targets) -> list:
+    """Slug bases (title.state-city-area-address) for Job targets"""
+    from app.modules.spas.models import Spa
+
+    # Get address from related SPA if available (one query for all targets)
+    spa_ids = {target.spa_id for target in targets if target.spa_id}
+    addresses = {}
+    if spa_ids:
+        addresses = dict(connection.execute(select(Spa.id, Spa.address).where(Spa.id.in_(spa_ids))).all())
+
+    return slug_bases_for(
+        connection,
+        targets,
+        "title",
+        [addresses.get(target.spa_id) for target in targets],
+    )
+
+
+def assign_job_slugs(connection, targets) -> None:
+    """Allocate slugs for many new Job objects at once (used by bulk imports)"""
+    targets = [target for target in targets if not target.slug and target.title]
+    if not targets:
+        return
+    slugs = allocate_slugs(connection, Job, _job_slug_bases(connection, targets))
+    for target, slug in zip(targets, slugs):
+        target.slug = slug
+
+
 @event.listens_for(Job, "before_insert")
 def generate_job_slug(mapper, connection, target: Job) -> None:
     """
@@ -147,68 +181,7 @@ def generate_job_slug(mapper, connection, target: Job) -> None:
     Format: title.state-city-area-address
     """
     if not target.slug and target.title:
-        from app.modules.locations.models import State, City, Area
-        
-        parts = [target.title]
-        
-        # Add location parts if available
-        location_parts = []
-        
-        # Get state name
-        if target.state_id:
-            try:
-                result = connection.execute(select(State.name).where(State.id == target.state_id)).scalar_one_or_none()
-                if result:
-                    location_parts.append(result)
-            except Exception:
-                pass  # Skip if state not found
-        
-        # Get city name
-        if target.city_id:
-            try:
-                result = connection.execute(select(City.name).where(City.id == target.city_id)).scalar_one_or_none()
-                if result:
-                    location_parts.append(result)
-            except Exception:
-                pass  # Skip if city not found
-        
-        # Get area name
-        if target.area_id:
-            try:
-                result = connection.execute(select(Area.name).where(Area.id == target.area_id)).scalar_one_or_none()
-                if result:
-                    location_parts.append(result)
-            except Exception:
-                pass  # Skip if area not found
-        
-        # Get address from related SPA if available
-        if target.spa_id:
-            try:
-                from app.modules.spas.models import Spa
-                result = connection.execute(select(Spa.address).where(Spa.id == target.spa_id)).scalar_one_or_none()
-                if result:
-                    address_words = result.split()[:3]  # First 3 words
-                    location_parts.append(' '.join(address_words))
-            except Exception:
-                pass  # Skip if spa not found
-        
-        # Join location parts with hyphens
-        if location_parts:
-            location_str = '-'.join(location_parts)
-            parts.append(location_str)
-        
-        base_slug = slugify('.'.join(parts))
-        slug = base_slug
-        index = 2
-        
-        # Ensure uniqueness
-        while connection.execute(
-            select(Job.id).where(Job.slug == slug)
-        ).scalar() is not None:
-            slug = f"{base_slug}-{index}"
-            index += 1
-        
-        target.slug = slug
+        target.slug = allocate_slug(connection, Job, _job_slug_bases(connection, [target])[0])
 
 
 @event.listens_for(Job, "before_update")
@@ -219,68 +192,153 @@ def protect_job_slug_on_update(mapper, connection, target: Job) -> None:
     Format: title.state-city-area-address
     """
     if not target.slug and target.title:
-        from app.modules.locations.models import State, City, Area
-        
-        parts = [target.title]
-        
-        # Add location parts if available
-        location_parts = []
-        
-        # Get state name
-        if target.state_id:
-            try:
-                result = connection.execute(select(State.name).where(State.id == target.state_id)).scalar_one_or_none()
-                if result:
-                    location_parts.append(result)
-            except Exception:
-                pass  # Skip if state not found
-        
-        # Get city name
-        if target.city_id:
-            try:
-                result = connection.execute(select(City.name).where(City.id == target.city_id)).scalar_one_or_none()
-                if result:
-                    location_parts.append(result)
-            except Exception:
-                pass  # Skip if city not found
-        
-        # Get area name
-        if target.area_id:
-            try:
-                result = connection.execute(select(Area.name).where(Area.id == target.area_id)).scalar_one_or_none()
-                if result:
-                    location_parts.append(result)
-            except Exception:
-                pass  # Skip if area not found
-        
-        # Get address from related SPA if available
-        if target.spa_id:
-            try:
-                from app.modules.spas.models import Spa
-                result = connection.execute(select(Spa.address).where(Spa.id == target.spa_id)).scalar_one_or_none()
-                if result:
-                    address_words = result.split()[:3]  # First 3 words
-                    location_parts.append(' '.join(address_words))
-            except Exception:
-                pass  # Skip if spa not found
-        
-        # Join location parts with hyphens
-        if location_parts:
-            location_str = '-'.join(location_parts)
-            parts.append(location_str)
-        
-        base_slug = slugify('.'.join(parts))
-        slug = base_slug
-        index = 2
-        
-        # Ensure uniqueness
-        while connection.execute(
-            select(Job.id).where(Job.slug == slug, Job.id != target.id)
-        ).scalar() is not None:
-            slug = f"{base_slug}-{index}"
-            index += 1
-        
-        target.slug = slug
+        target.slug = allocate_slug(
+            connection, Job, _job_slug_bases(connection, [target])[0], exclude_id=target.id
+        )
+
+
+class JobCountRollup(Base):
+    """
+    Active job counts per (country, state, city, area, category, type).
+
+    Kept in sync incrementally by the Job mapper events below and rebuilt
+    periodically by app.modules.jobs.scheduler. Missing optional keys are
+    stored as 0 so the composite primary key never contains NULLs.
+    """
+    __tablename__ = "job_count_rollup"
+
+    country_id = Column(Integer, primary_key=True, default=0)
+    state_id = Column(Integer, primary_key=True, default=0)
+    city_id = Column(Integer, primary_key=True, default=0)
+    area_id = Column(Integer, primary_key=True, default=0)
+    job_category_id = Column(Integer, primary_key=True, default=0)
+    job_type_id = Column(Integer, primary_key=True, default=0)
+    job_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index('idx_job_count_rollup_city', 'city_id'),
+        Index('idx_job_count_rollup_area', 'area_id'),
+        Index('idx_job_count_rollup_category', 'job_category_id'),
+    )
+
+
+ROLLUP_KEY_FIELDS = ("country_id", "state_id", "city_id", "area_id", "job_category_id", "job_type_id")
+
+
+def _rollup_key(values: dict) -> tuple:
+    """Build a rollup key, mapping missing ids to the 0 sentinel."""
+    return tuple(values.get(field) or 0 for field in ROLLUP_KEY_FIELDS)
+
+
+def _apply_rollup_delta(connection, key: tuple, delta: int) -> None:
+    """Upsert a +/- delta into job_count_rollup for a single key."""
+    stmt = pg_insert(JobCountRollup).values(**dict(zip(ROLLUP_KEY_FIELDS, key)), job_count=delta)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(ROLLUP_KEY_FIELDS),
+        set_={"job_count": JobCountRollup.job_count + delta},
+    )
+    connection.execute(stmt)
+
+
+def _current_values(target: Job) -> dict:
+    return {field: getattr(target, field) for field in ROLLUP_KEY_FIELDS + ("is_active",)}
+
+
+def _previous_values(target: Job) -> dict:
+    """Values as they were before the pending flush (from attribute history)."""
+    state = inspect(target)
+    values = {}
+    for field in ROLLUP_KEY_FIELDS + ("is_active",):
+        history = state.attrs[field].history
+        if history.deleted:
+            values[field] = history.deleted[0]
+        else:
+            values[field] = getattr(target, field)
+    return values
+
+
+def _track_previous_value(target, value, oldvalue, initiator):
+    """No-op; registered with active_history so expired old values get loaded on set."""
+
+
+for _field in ROLLUP_KEY_FIELDS + ("is_active",):
+    event.listen(getattr(Job, _field), "set", _track_previous_value, active_history=True)
+
+
+@event.listens_for(Job, "after_insert")
+def rollup_job_insert(mapper, connection, target: Job) -> None:
+    """Count a newly inserted active job."""
+    if target.is_active is True:
+        _apply_rollup_delta(connection, _rollup_key(_current_values(target)), 1)
+
+
+@event.listens_for(Job, "after_update")
+def rollup_job_update(mapper, connection, target: Job) -> None:
+    """
+    Move a job between rollup keys when its location/taxonomy changes,
+    and add/remove it when it is (re)activated or soft-deleted.
+    """
+    old = _previous_values(target)
+    new = _current_values(target)
+    old_key, new_key = _rollup_key(old), _rollup_key(new)
+    old_active, new_active = old["is_active"] is True, new["is_active"] is True
+
+    if old_key == new_key and old_active == new_active:
+        return
+    if old_active:
+        _apply_rollup_delta(connection, old_key, -1)
+    if new_active:
+        _apply_rollup_delta(connection, new_key, 1)
+
+
+@event.listens_for(Job, "after_delete")
+def rollup_job_delete(mapper, connection, target: Job) -> None:
+    """Uncount a permanently deleted active job."""
+    old = _previous_values(target)
+    if old["is_active"] is True:
+        _apply_rollup_delta(connection, _rollup_key(old), -1)
+
+
+class JobTrending(Base):
+    """
+    Time-decayed trending score per active job.
+
+    Rebuilt periodically by app.modules.jobs.scheduler from analytics
+    events, button clicks and messages. city_id/job_category_id are copied
+    from the job so scoped top-K reads use a single index.
+    """
+    __tablename__ = "job_trending"
+
+    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True)
+    score = Column(Float, nullable=False, default=0)
+    city_id = Column(Integer, nullable=True)
+    job_category_id = Column(Integer, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('idx_job_trending_score', 'score'),
+        Index('idx_job_trending_city_score', 'city_id', 'score'),
+        Index('idx_job_trending_category_score', 'job_category_id', 'score'),
+    )
+
+
+class JobSimilar(Base):
+    """
+    Precomputed content-based neighbours of a job (top-N per job).
+
+    Built by app.modules.jobs.similarity; read by /api/jobs/{id}/similar.
+    """
+    __tablename__ = "job_similar"
+
+    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True)
+    similar_job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True)
+    score = Column(Float, nullable=False)
+    computed_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('idx_job_similar_job_score', 'job_id', 'score'),
+    )
+
 
 class JobApplication(Base):
     __tablename__ = "job_applications"
@@ -0,0 +1,186 @@
+"""
+Job detail page bundle
+
+Everything the job page renders, in one payload: compact job fields with the
+stored JSON-LD, a spa summary, similar jobs and location breadcrumbs with job
+counts. Each part is cached on its own key, so editing a spa does not evict
+every job and vice versa; only the live view count is read per request.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session, joinedload
+
+from app.core import counters
+from app.core.cache import delete_cached, get_cached, set_cached
+from app.modules.jobs import models, services
+from app.modules.spas.models import Spa
+
+CACHE_PREFIX = "job_page"
+PART_TTL_SECONDS = 300
+SIMILAR_JOBS_LIMIT = 6
+
+JOB_FIELDS = (
+    "id", "slug", "title", "description", "requirements", "responsibilities", "benefits",
+    "job_timing", "key_skills", "Industry_type", "Employee_type", "required_gender",
+    "job_opening_count", "salary_min", "salary_max", "salary_currency",
+    "experience_years_min", "experience_years_max", "hr_contact_name", "hr_contact_email",
+    "hr_contact_phone", "postalCode", "latitude", "longitude", "is_active", "is_featured",
+    "spa_id", "country_id", "state_id", "city_id", "area_id",
+    "meta_title", "meta_description", "canonical_url", "schema_json",
+)
+
+SPA_FIELDS = (
+    "id", "name", "slug", "logo_image", "address", "phone", "website", "opening_hours",
+    "closing_hours", "booking_url_website", "rating", "reviews", "is_verified", "latitude", "longitude",
+)
+
+
+def job_part_key(slug: str) -> str:
+    return f"{CACHE_PREFIX}:job:{slug}"
+
+
+def spa_part_key(spa_id: int) -> str:
+    return f"{CACHE_PREFIX}:spa:{spa_id}"
+
+
+def similar_part_key(job_id: int) -> str:
+    return f"{CACHE_PREFIX}:similar:{job_id}"
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _named(obj, *extra: str) -> Optional[Dict[str, Any]]:
+    if obj is None:
+        return None
+    return {"id": obj.id, "name": obj.name, **{field: getattr(obj, field) for field in extra}}
+
+
+def _cached_part(key: str, loader):
+    value = get_cached(key)
+    if value is None:
+        value = loader()
+        if value is not None:
+            set_cached(key, value, PART_TTL_SECONDS)
+    return value
+
+
+def _load_job(db: Session, slug: str) -> Optional[Dict[str, Any]]:
+    from app.modules.jobs.seo import render_job_schema_json
+
+    job = db.query(models.Job).options(
+        joinedload(models.Job.spa),
+        joinedload(models.Job.city),
+        joinedload(models.Job.state),
+        joinedload(models.Job.country),
+        joinedload(models.Job.area),
+        joinedload(models.Job.job_type),
+        joinedload(models.Job.job_category),
+    ).filter(models.Job.slug == slug).first()
+    if not job:
+        return None
+
+    part = {field: getattr(job, field) for field in JOB_FIELDS}
+    part["schema_json"] = job.schema_json or render_job_schema_json(job)
+    part.update({
+        "created_at": _iso(job.created_at),
+        "updated_at": _iso(job.updated_at),
+        "expires_at": _iso(job.expires_at),
+        "country": _named(job.country),
+        "state": _named(job.state),
+        "city": _named(job.city),
+        "area": _named(job.area),
+        "job_type": _named(job.job_type, "slug"),
+        "job_category": _named(job.job_category, "slug"),
+    })
+    return part
+
+
+def _load_spa(db: Session, spa_id: int) -> Optional[Dict[str, Any]]:
+    spa = db.query(Spa).options(joinedload(Spa.city)).filter(Spa.id == spa_id).first()
+    if not spa:
+        return None
+    part = {field: getattr(spa, field) for field in SPA_FIELDS}
+    part["city_name"] = spa.city.name if spa.city else None
+    return part
+
+
+def _load_similar(db: Session, job_id: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": job.id,
+            "slug": job.slug,
+            "title": job.title,
+            "spa_name": job.spa.name if job.spa else None,
+            "city_name": job.city.name if job.city else None,
+            "salary_min": job.salary_min,
+            "salary_max": job.salary_max,
+            "salary_currency": job.salary_currency,
+            "Employee_type": job.Employee_type,
+            "created_at": _iso(job.created_at),
+        }
+        for job in services.get_similar_jobs(db, job_id, limit=SIMILAR_JOBS_LIMIT)
+    ]
+
+
+def _load_breadcrumbs(db: Session, job: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Country > state > city > area, each with its active job count (from job_count_rollup)"""
+    breadcrumbs = []
+    filters = {}
+    for level in ("country", "state", "city", "area"):
+        location = job.get(level)
+        if not location:
+            break
+        filters[f"{level}_id"] = location["id"]
+        breadcrumbs.append({
+            "type": level,
+            "id": location["id"],
+            "name": location["name"],
+            "job_count": services.get_job_count(db, **filters),
+        })
+    return breadcrumbs
+
+
+def get_job_page(db: Session, slug: str) -> Optional[Dict[str, Any]]:
+    """Assemble the job page bundle; returns None if the job does not exist"""
+    job = _cached_part(job_part_key(slug), lambda: _load_job(db, slug))
+    if job is None:
+        return None
+
+    location_key = f"{CACHE_PREFIX}:breadcrumbs:" + ":".join(
+        str(job.get(f"{level}_id") or 0) for level in ("country", "state", "city", "area")
+    )
+    spa = _cached_part(spa_part_key(job["spa_id"]), lambda: _load_spa(db, job["spa_id"])) if job["spa_id"] else None
+    similar = _cached_part(similar_part_key(job["id"]), lambda: _load_similar(db, job["id"]))
+    breadcrumbs = _cached_part(location_key, lambda: _load_breadcrumbs(db, job))
+
+    # Counters change on every view, so they are never cached
+    stored = db.query(models.Job.view_count, models.Job.apply_click_count).filter(models.Job.id == job["id"]).first()
+    view_count = counters.get_counter_value("jobs", "view_count", job["id"], stored.view_count if stored else 0)
+    apply_click_count = counters.get_counter_value(
+        "jobs", "apply_click_count", job["id"], stored.apply_click_count if stored else 0
+    )
+
+    return {
+        "job": {**job, "view_count": view_count, "apply_click_count": apply_click_count},
+        "spa": spa,
+        "similar_jobs": similar,
+        "breadcrumbs": breadcrumbs,
+    }
+
+
+def invalidate_job_page(*slugs: Optional[str], job_id: Optional[int] = None) -> None:
+    """Drop cached job parts after a job was updated or deleted"""
+    keys = [job_part_key(slug) for slug in slugs if slug]
+    if job_id is not None:
+        keys.append(similar_part_key(job_id))
+    if keys:
+        delete_cached(*keys)
+
+
+def invalidate_spa_part(spa_id: int) -> None:
+    """Drop the cached spa summary after a spa was updated"""
+    delete_cached(spa_part_key(spa_id))
@@ -3,13 +3,13 @@ Job API routes
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Request
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from typing import List
 from app.core.database import get_db
-from app.modules.jobs import schemas, services
+from app.core.responses import fast_json
+from app.modules.jobs import bulk, schemas, services
 from app.modules.jobs.models import Job, JobCategory, JobType
-from app.modules.locations.models import City, State, Area
 from app.modules.users.routes import get_current_user, require_role
 from app.modules.users.models import User, UserRole
 from app.modules.subscribe.notification_service import send_notifications_for_jobs
@@ -316,7 +316,7 @@ def get_jobs(
     
     Note: Caching is handled at the service layer for better performance.
     """
-    return services.get_jobs(
+    jobs = services.get_jobs(
         db=db,
         skip=skip,
         limit=limit,
@@ -329,6 +329,7 @@ def get_jobs(
         job_category=job_category,
         is_featured=is_featured,
     )
+    return fast_json(list[schemas.JobResponse], jobs)
 
 
 @router.get("/count")
@@ -344,29 +345,17 @@ def get_job_count(
     """
     Get count of active jobs with optional filters.
     Useful for displaying job counts in search results and location pages.
+    Served from the job_count_rollup table instead of counting jobs.
     """
-    query = db.query(Job).filter(Job.is_active == True)
-    
-    if country_id:
-        query = query.filter(Job.country_id == country_id)
-    if state_id:
-        query = query.filter(Job.state_id == state_id)
-    if city_id:
-        query = query.filter(Job.city_id == city_id)
-    if area_id:
-        query = query.filter(Job.area_id == area_id)
-    if job_type:
-        if isinstance(job_type, str):
-            query = query.join(JobType).filter(JobType.name == job_type)
-        else:
-            query = query.filter(Job.job_type_id == job_type)
-    if job_category:
-        if isinstance(job_category, str):
-            query = query.join(JobCategory).filter(JobCategory.name == job_category)
-        else:
-            query = query.filter(Job.job_category_id == job_category)
-    
-    count = query.count()
+    count = services.get_job_count(
+        db,
+        country_id=country_id,
+        state_id=state_id,
+        city_id=city_id,
+        area_id=area_id,
+        job_type=job_type,
+        job_category=job_category,
+    )
     return {"count": count}
 
 
@@ -383,31 +372,18 @@ def get_job_counts_by_location(
     """
     from slugify import slugify
     
-    query = db.query(
-        City.id,
-        City.name,
-        func.count(Job.id).label('job_count')
-    ).join(
-        Job, City.id == Job.city_id
-    ).filter(
-        Job.is_active == True
+    results = services.get_job_counts_by_city_with_names(
+        db, job_category=job_category, job_type=job_type
     )
     
-    if job_category:
-        query = query.join(JobCategory).filter(JobCategory.name == job_category)
-    if job_type:
-        query = query.join(JobType).filter(JobType.name == job_type)
-    
-    results = query.group_by(City.id, City.name).all()
-    
     return [
         {
             "city_id": city_id,
             "city_name": city_name,
-            "city_slug": slugify(city_name),  # Generate slug from city name
+            "city_slug": city_slug or slugify(city_name),  # Stored slug (computed if not backfilled yet)
             "job_count": job_count
         }
-        for city_id, city_name, job_count in results
+        for city_id, city_name, city_slug, job_count in results
     ]
 
 
@@ -422,23 +398,154 @@ def get_job_by_id(job_id: int, db: Session = Depends(get_db)):
 
 @router.get("/slug/{slug}", response_model=schemas.JobResponse)
 def get_job_by_slug(slug: str, db: Session = Depends(get_db)):
-    """Get job by slug"""
+    """
+    Get job by slug.
+    schema_json carries the stored JSON-LD JobPosting verbatim.
+    """
     job = services.get_job_by_slug(db, slug)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    return job
+    response = schemas.JobResponse.model_validate(job)
+    if not response.seo_schema_json:
+        # Not generated yet (run app.modules.jobs.seo); relationships are already loaded
+        from app.modules.jobs.seo import render_job_schema_json
+        response.seo_schema_json = render_job_schema_json(job)
+    return response
+
+
+@router.get("/slug/{slug}/page")
+def get_job_page(
+    slug: str,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    track_view: bool = True,
+    db: Session = Depends(get_db)
+):
+    """
+    Everything the job detail page needs in one call: job (with JSON-LD in
+    schema_json), spa summary, similar jobs and location breadcrumbs with counts.
+
+    Unless track_view=false, the page view is counted here (no separate
+    track-view call needed); the analytics event is recorded after the response.
+    """
+    from types import SimpleNamespace
+    from app.core import counters
+    from app.modules.jobs.page import get_job_page as build_job_page
+
+    page = build_job_page(db, slug)
+    if not page:
+        raise HTTPException(status_code=404, detail="Job not found")
 
+    if track_view:
+        job, spa = page["job"], page["spa"] or {}
+        counters.increment("jobs", "view_count", job["id"])
+        page["job"]["view_count"] += 1
+
+        info = SimpleNamespace(
+            city_name=(job["city"] or {}).get("name"),
+            latitude=job["latitude"],
+            longitude=job["longitude"],
+            spa_latitude=spa.get("latitude"),
+            spa_longitude=spa.get("longitude"),
+            spa_city_name=spa.get("city_name"),
+        )
+        client_ip = request.client.host if request.client else "unknown"
+        user_agent = request.headers.get("user-agent", "unknown")
+        background_tasks.add_task(_record_page_view, job["id"], job["spa_id"], info, client_ip, user_agent)
+
+    return fast_json(dict, page)
+
+
+def _record_page_view(job_id: int, spa_id: int, info, client_ip: str, user_agent: str):
+    """Queue the page_view analytics event (runs after the response is sent)"""
+    from app.modules.analytics import trackers
+
+    try:
+        city, latitude, longitude = _resolve_tracking_location(info, client_ip)
+        trackers.track_event(
+            db=None,
+            event_type="page_view",
+            job_id=job_id,
+            spa_id=spa_id,
+            city=city,
+            latitude=latitude,
+            longitude=longitude,
+            user_agent=user_agent,
+            ip_address=client_ip,
+        )
+    except Exception as e:
+        # Analytics should not affect main behavior
+        import logging
+        logging.error(f"Failed to track page view analytics: {e}")
+
+
+@router.get("/{job_id}/similar", response_model=List[schemas.JobResponse])
+def get_similar_jobs(job_id: int, limit: int = 6, db: Session = Depends(get_db)):
+    """
+    Get jobs similar to this one (title, skills, category, employment type, location).
+    Neighbours are precomputed by the jobs scheduler.
+    """
+    if limit < 1 or limit > 20:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 20")
+    jobs = services.get_similar_jobs(db, job_id, limit=limit)
+    if not jobs and not db.query(Job.id).filter(Job.id == job_id).first():
+        raise HTTPException(status_code=404, detail="Job not found")
+    return fast_json(List[schemas.JobResponse], jobs)
 
-@router.get("/near-me")
+
+@router.get("/near-me", response_model=schemas.JobNearbyPage)
 def get_jobs_near_me(
     latitude: float,
     longitude: float,
     radius_km: float = 10,
+    skip: int = 0,
+    limit: int = 50,
     db: Session = Depends(get_db)
 ):
-    """Get jobs near a location."""
+    """
+    Get jobs near a location, nearest first.
+    Each job includes its distance from the given point in km.
+    """
     from app.modules.jobs.geo import get_jobs_near_location
-    return get_jobs_near_location(db, latitude, longitude, radius_km)
+    
+    if radius_km < 0 or radius_km > 1000:
+        raise HTTPException(status_code=400, detail="radius_km must be between 0 and 1000")
+    if skip < 0 or limit < 1 or limit > 100:
+        raise HTTPException(status_code=400, detail="skip must be >= 0 and limit between 1 and 100")
+    
+    jobs, total = get_jobs_near_location(db, latitude, longitude, radius_km, limit=limit, skip=skip)
+    return fast_json(schemas.JobNearbyPage, {"items": jobs, "total": total, "skip": skip, "limit": limit})
+
+
+def _resolve_tracking_location(info, client_ip: str):
+    """
+    Get location for analytics from the job's tracking info
+    (prefer job's own location, then spa, then IP).
+    Returns (city, latitude, longitude).
+    """
+    from app.utils.ip_location import get_location_from_ip
+    
+    city = info.city_name
+    latitude = info.latitude
+    longitude = info.longitude
+    
+    # Fallback to spa location
+    if not latitude or not longitude:
+        if info.spa_latitude and info.spa_longitude:
+            latitude = info.spa_latitude
+            longitude = info.spa_longitude
+    if not city:
+        city = info.spa_city_name
+    
+    # Try IP-based location if still not available
+    if not latitude or not longitude:
+        ip_location = get_location_from_ip(client_ip)
+        if ip_location:
+            latitude = latitude or ip_location.get('latitude')
+            longitude = longitude or ip_location.get('longitude')
+            city = city or ip_location.get('city')
+    
+    return city, latitude, longitude
 
 
 @router.post("/{job_id}/track-view")
@@ -451,63 +558,31 @@ def track_job_view(
     Increment view_count for a job and track as analytics event.
 
     Frontend can call this when a job detail page is viewed.
+    The increment is buffered and flushed to the DB in batches.
     """
-    # Load job with relationships for analytics tracking
-    from sqlalchemy.orm import joinedload
-    job = db.query(Job).options(
-        joinedload(Job.city),
-        joinedload(Job.spa).joinedload("city")
-    ).filter(Job.id == job_id).first()
+    from app.core import counters
     
-    if not job:
+    info = services.get_job_tracking_info(db, job_id)
+    if not info:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    # Increment view count
-    job.view_count = (job.view_count or 0) + 1
-    db.commit()
-    db.refresh(job)
+    # Buffer view count increment (flushed in batches by the counter flusher)
+    counters.increment("jobs", "view_count", job_id)
+    view_count = counters.get_counter_value("jobs", "view_count", job_id, info.view_count)
     
     # Also track as analytics event
     try:
         from app.modules.analytics import trackers
-        from app.utils.ip_location import get_location_from_ip
         
         client_ip = request.client.host if request.client else "unknown"
         user_agent = request.headers.get("user-agent", "unknown")
-        
-        # Get location from job (prefer job's own location, then spa, then IP)
-        city = None
-        latitude = None
-        longitude = None
-        
-        # Try job's own location first
-        if job.city:
-            city = job.city.name if hasattr(job.city, 'name') else None
-        if job.latitude and job.longitude:
-            latitude = job.latitude
-            longitude = job.longitude
-        
-        # Fallback to spa location
-        if (not latitude or not longitude) and job.spa:
-            if job.spa.latitude and job.spa.longitude:
-                latitude = job.spa.latitude
-                longitude = job.spa.longitude
-            if not city and job.spa.city:
-                city = job.spa.city.name if hasattr(job.spa.city, 'name') else None
-        
-        # Try IP-based location if still not available
-        if not latitude or not longitude:
-            ip_location = get_location_from_ip(client_ip)
-            if ip_location:
-                latitude = latitude or ip_location.get('latitude')
-                longitude = longitude or ip_location.get('longitude')
-                city = city or ip_location.get('city')
+        city, latitude, longitude = _resolve_tracking_location(info, client_ip)
         
         trackers.track_event(
             db=db,
             event_type="page_view",
             job_id=job_id,
-            spa_id=job.spa_id,
+            spa_id=info.spa_id,
             city=city,
             latitude=latitude,
             longitude=longitude,
@@ -520,7 +595,7 @@ def track_job_view(
         logging.error(f"Failed to track page view analytics: {e}")
         pass
     
-    return {"status": "ok", "view_count": job.view_count}
+    return {"status": "ok", "view_count": view_count}
 
 
 @router.post("/{job_id}/track-apply-click")
@@ -533,63 +608,31 @@ def track_job_apply_click(
     Increment apply_click_count for a job and track as analytics event.
 
     Frontend can call this when user clicks apply button.
+    The increment is buffered and flushed to the DB in batches.
     """
-    # Load job with relationships for analytics tracking
-    from sqlalchemy.orm import joinedload
-    job = db.query(Job).options(
-        joinedload(Job.city),
-        joinedload(Job.spa).joinedload("city")
-    ).filter(Job.id == job_id).first()
+    from app.core import counters
     
-    if not job:
+    info = services.get_job_tracking_info(db, job_id)
+    if not info:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    # Increment apply click count
-    job.apply_click_count = (job.apply_click_count or 0) + 1
-    db.commit()
-    db.refresh(job)
+    # Buffer apply click count increment
+    counters.increment("jobs", "apply_click_count", job_id)
+    apply_click_count = counters.get_counter_value("jobs", "apply_click_count", job_id, info.apply_click_count)
     
     # Also track as analytics event
     try:
         from app.modules.analytics import trackers
-        from app.utils.ip_location import get_location_from_ip
         
         client_ip = request.client.host if request.client else "unknown"
         user_agent = request.headers.get("user-agent", "unknown")
-        
-        # Get location from job (prefer job's own location, then spa, then IP)
-        city = None
-        latitude = None
-        longitude = None
-        
-        # Try job's own location first
-        if job.city:
-            city = job.city.name if hasattr(job.city, 'name') else None
-        if job.latitude and job.longitude:
-            latitude = job.latitude
-            longitude = job.longitude
-        
-        # Fallback to spa location
-        if (not latitude or not longitude) and job.spa:
-            if job.spa.latitude and job.spa.longitude:
-                latitude = job.spa.latitude
-                longitude = job.spa.longitude
-            if not city and job.spa.city:
-                city = job.spa.city.name if hasattr(job.spa.city, 'name') else None
-        
-        # Try IP-based location if still not available
-        if not latitude or not longitude:
-            ip_location = get_location_from_ip(client_ip)
-            if ip_location:
-                latitude = latitude or ip_location.get('latitude')
-                longitude = longitude or ip_location.get('longitude')
-                city = city or ip_location.get('city')
+        city, latitude, longitude = _resolve_tracking_location(info, client_ip)
         
         trackers.track_event(
             db=db,
             event_type="apply_click",
             job_id=job_id,
-            spa_id=job.spa_id,
+            spa_id=info.spa_id,
             city=city,
             latitude=latitude,
             longitude=longitude,
@@ -629,24 +672,24 @@ def track_job_apply_click(
         logging.error(f"Failed to track apply click analytics: {e}")
         pass
     
-    return {"status": "ok", "apply_click_count": job.apply_click_count}
+    return {"status": "ok", "apply_click_count": apply_click_count}
 
 
-@router.get("/popular")
+@router.get("/popular", response_model=List[schemas.JobResponse])
 def get_popular_jobs(
     limit: int = 10,
+    city_id: int | None = None,
+    job_category_id: int | None = None,
     db: Session = Depends(get_db)
 ):
     """
-    Get popular jobs sorted by view_count.
+    Get trending jobs ranked by time-decayed views, apply clicks and messages.
+    Optionally scoped to a city and/or job category.
     """
-    jobs = db.query(Job).filter(
-        Job.is_active == True
-    ).order_by(
-        Job.view_count.desc()
-    ).limit(limit).all()
-    
-    return [schemas.JobResponse.model_validate(job) for job in jobs]
+    if limit < 1 or limit > 100:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 100")
+    jobs = services.get_popular_jobs(db, limit=limit, city_id=city_id, job_category_id=job_category_id)
+    return fast_json(List[schemas.JobResponse], jobs)
 
 
 @router.post("/", response_model=schemas.JobResponse, status_code=status.HTTP_201_CREATED)
@@ -685,6 +728,72 @@ def create_job(
     return created_job
 
 
+@router.post("/bulk", response_model=schemas.BulkJobImportResponse)
+async def bulk_create_jobs(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role([UserRole.ADMIN, UserRole.MANAGER, UserRole.RECRUITER]))
+):
+    """
+    Create many job postings at once.
+
+    Accepts a JSON array of jobs (or {"jobs": [...]}), a text/csv body, or a
+    multipart upload with a CSV "file" field. CSV headers use the same field
+    names as the single-job create endpoint.
+    Invalid rows are skipped and reported by row index; valid rows are created.
+    Subscribers get one instant notification for the whole batch.
+    """
+    content_type = request.headers.get("content-type", "")
+    try:
+        if content_type.startswith("multipart/form-data"):
+            form = await request.form()
+            upload = form.get("file")
+            if upload is None or not hasattr(upload, "read"):
+                raise HTTPException(status_code=400, detail="Missing CSV file field 'file'")
+            rows = bulk.parse_csv((await upload.read()).decode("utf-8-sig"))
+        elif "csv" in content_type:
+            rows = bulk.parse_csv((await request.body()).decode("utf-8-sig"))
+        else:
+            payload = await request.json()
+            rows = payload.get("jobs") if isinstance(payload, dict) else payload
+            if not isinstance(rows, list):
+                raise HTTPException(status_code=400, detail="Expected a JSON array of jobs")
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Could not parse request body")
+
+    if not rows:
+        raise HTTPException(status_code=400, detail="No jobs provided")
+    if len(rows) > bulk.MAX_BULK_ROWS:
+        raise HTTPException(status_code=400, detail=f"At most {bulk.MAX_BULK_ROWS} jobs per request")
+
+    job_ids, errors = await run_in_threadpool(bulk.import_jobs, db, rows, current_user)
+
+    # One coalesced instant notification for the whole batch (in background)
+    if job_ids:
+        from app.core.database import SessionLocal
+        def send_notifications():
+            db_bg = SessionLocal()
+            try:
+                import asyncio
+                asyncio.run(send_notifications_for_jobs(
+                    db_bg,
+                    job_ids,
+                    SubscriptionFrequency.INSTANT
+                ))
+            finally:
+                db_bg.close()
+
+        background_tasks.add_task(send_notifications)
+
+    return {
+        "created": len(job_ids),
+        "failed": len(errors),
+        "job_ids": job_ids,
+        "errors": errors,
+    }
+
+
 @router.put("/{job_id}", response_model=schemas.JobResponse)
 def update_job(
     job_id: int,
@@ -0,0 +1,73 @@
+"""
+Periodic maintenance tasks for jobs
+This should be run as a separate process or cron job
+"""
+
+from app.core.database import SessionLocal
+from app.core.counters import repair_counter_drift
+from app.modules.jobs.seo import refresh_rolling_job_schemas
+from app.modules.jobs.similarity import refresh_changed_similar_jobs
+from app.modules.jobs.services import reconcile_job_count_rollup, refresh_trending_scores
+
+
+def run_job_count_reconciliation():
+    """Rebuild the job_count_rollup table from the jobs table"""
+    db = SessionLocal()
+    try:
+        rows = reconcile_job_count_rollup(db)
+        print(f"Reconciled job_count_rollup: {rows} rows")
+    finally:
+        db.close()
+
+
+def run_counter_drift_repair():
+    """Raise job/spa popularity counters that fell behind analytics events"""
+    db = SessionLocal()
+    try:
+        rows = repair_counter_drift(db)
+        print(f"Repaired counter drift on {rows} rows")
+    finally:
+        db.close()
+
+
+def run_trending_refresh():
+    """Recompute time-decayed trending scores for /api/jobs/popular"""
+    db = SessionLocal()
+    try:
+        rows = refresh_trending_scores(db)
+        print(f"Refreshed trending scores for {rows} jobs")
+    finally:
+        db.close()
+
+
+def run_similar_jobs_refresh():
+    """Recompute similar-job neighbours for new/changed jobs"""
+    db = SessionLocal()
+    try:
+        rows = refresh_changed_similar_jobs(db)
+        print(f"Refreshed similar jobs for {rows} jobs")
+    finally:
+        db.close()
+
+
+def run_rolling_schema_refresh():
+    """Move validThrough of jobs without expires_at forward (JSON-LD)"""
+    db = SessionLocal()
+    try:
+        rows = refresh_rolling_job_schemas(db)
+        print(f"Refreshed JSON-LD validThrough for {rows} jobs")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    """
+    Run this script as a cron job or scheduled task:
+    - Hourly (and once after first deploy): python -m app.modules.jobs.scheduler
+    - Nightly full similar-jobs rebuild: python -m app.modules.jobs.similarity
+    """
+    run_job_count_reconciliation()
+    run_counter_drift_repair()
+    run_trending_refresh()
+    run_similar_jobs_refresh()
+    run_rolling_schema_refresh()
@@ -47,7 +47,6 @@ class JobBase(BaseModel):
     longitude: Optional[float] = None
     meta_title: Optional[str] = None
     meta_description: Optional[str] = None
-    seo_schema_json: Optional[str] = Field(None, description="JSON-LD schema for SEO", alias="schema_json", serialization_alias="schema_json")
     canonical_url: Optional[str] = None
 
 
@@ -141,7 +140,6 @@ class JobUpdate(BaseModel):
     expires_at: Optional[datetime] = None
     meta_title: Optional[str] = None
     meta_description: Optional[str] = None
-    seo_schema_json: Optional[str] = Field(None, description="JSON-LD schema for SEO", alias="schema_json", serialization_alias="schema_json")
     canonical_url: Optional[str] = None
 
 
@@ -156,6 +154,8 @@ class JobResponse(JobBase):
     created_at: datetime
     updated_at: datetime
     expires_at: Optional[datetime] = None
+    # JSON-LD JobPosting, generated from the job on every write (not accepted as input)
+    seo_schema_json: Optional[str] = Field(None, description="JSON-LD schema for SEO", alias="schema_json", serialization_alias="schema_json")
     # Nested relationships
     city: Optional[CityResponse] = None
     area: Optional[AreaResponse] = None
@@ -169,3 +169,26 @@ class JobResponse(JobBase):
     class Config:
         from_attributes = True
 
+
+
+class JobNearbyResponse(JobResponse):
+    distance_km: float
+
+
+class JobNearbyPage(BaseModel):
+    items: list[JobNearbyResponse]
+    total: int
+    skip: int
+    limit: int
+
+
+class BulkJobRowError(BaseModel):
+    row: int
+    errors: list[str]
+
+
+class BulkJobImportResponse(BaseModel):
+    created: int
+    failed: int
+    job_ids: list[int]
+    errors: list[BulkJobRowError]
@@ -1,14 +1,34 @@
 """
 SEO utilities for jobs
+
+JSON-LD is rendered when a job (or its spa, location or category) is
+written and stored in Job.schema_json, so pages serve it verbatim.
+Jobs without expires_at get a rolling validThrough (today + SCHEMA_VALID_DAYS),
+which refresh_rolling_job_schemas() moves forward daily (jobs scheduler).
+Regenerate for all jobs: python -m app.modules.jobs.seo
 """
 
 import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import bindparam, or_, update
+from sqlalchemy.orm import Session, joinedload
+
 from app.modules.jobs.models import Job
 
+REGENERATE_BATCH_SIZE = 500
+SCHEMA_VALID_DAYS = 90  # validThrough of jobs without expires_at, counted from the render day
+
+
+def rolling_valid_through() -> datetime:
+    """validThrough for open-ended jobs; the same for every render on one (UTC) day"""
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    return today + timedelta(days=SCHEMA_VALID_DAYS)
+
 
 def generate_job_schema(job: Job) -> dict:
-    """Generate JSON-LD schema for a job"""
-    from datetime import datetime, timedelta
+    """Generate JSON-LD schema for a job (spa, city, state, country and job_category should be loaded)"""
+    posted_at = job.created_at or datetime.utcnow()
     
     # Build hiring organization
     hiring_org = {
@@ -33,8 +53,8 @@ def generate_job_schema(job: Job) -> dict:
         "@type": "JobPosting",
         "title": job.title,
         "description": job.description or "",
-        "datePosted": job.created_at.isoformat() if job.created_at else datetime.utcnow().isoformat(),
-        "validThrough": (job.expires_at.isoformat() if job.expires_at else (datetime.utcnow() + timedelta(days=90)).isoformat()),
+        "datePosted": posted_at.isoformat(),
+        "validThrough": (job.expires_at or rolling_valid_through()).isoformat(),
         "employmentType": job.Employee_type or "FULL_TIME",
         "hiringOrganization": hiring_org,
         "jobLocation": {
@@ -70,3 +90,75 @@ def generate_job_schema(job: Job) -> dict:
     
     return schema
 
+
+
+def render_job_schema_json(job: Job) -> str:
+    """Serialized JSON-LD as stored in Job.schema_json"""
+    return json.dumps(generate_job_schema(job), ensure_ascii=False, separators=(",", ":"))
+
+
+def regenerate_job_schemas(db: Session, *criteria) -> int:
+    """
+    Re-render and store schema_json for all jobs matching the given filter
+    criteria (all jobs if none), in id-ordered batches.
+
+    Relationships are eager-loaded per batch, and the column is written with
+    one executemany UPDATE per batch that leaves updated_at untouched.
+    Returns the number of jobs written.
+    """
+    jobs_table = Job.__table__
+    stmt = (
+        update(jobs_table)
+        .where(jobs_table.c.id == bindparam("job_id"))
+        .values(schema_json=bindparam("rendered"), updated_at=jobs_table.c.updated_at)
+    )
+
+    written = 0
+    last_id = 0
+    while True:
+        batch = (
+            db.query(Job)
+            .options(
+                joinedload(Job.spa),
+                joinedload(Job.city),
+                joinedload(Job.state),
+                joinedload(Job.country),
+                joinedload(Job.job_category),
+            )
+            .filter(Job.id > last_id, *criteria)
+            .order_by(Job.id)
+            .limit(REGENERATE_BATCH_SIZE)
+            .all()
+        )
+        if not batch:
+            break
+        params = [{"job_id": job.id, "rendered": render_job_schema_json(job)} for job in batch]
+        db.execute(stmt, params)
+        db.commit()
+        written += len(batch)
+        last_id = batch[-1].id
+    return written
+
+
+def refresh_rolling_job_schemas(db: Session) -> int:
+    """
+    Re-render jobs without expires_at whose stored validThrough is not today's
+    rolling date, so open-ended jobs never look expired. Rewrites each job
+    at most once a day; returns the number of jobs written.
+    """
+    current = f'"validThrough":"{rolling_valid_through().isoformat()}"'
+    return regenerate_job_schemas(
+        db,
+        Job.expires_at.is_(None),
+        or_(Job.schema_json.is_(None), ~Job.schema_json.contains(current, autoescape=True)),
+    )
+
+
+if __name__ == "__main__":
+    from app.core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        print(f"Regenerated JSON-LD for {regenerate_job_schemas(db)} jobs")
+    finally:
+        db.close()
@@ -7,22 +7,22 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 
 from app.modules.jobs import models, schemas
+from app.modules.jobs.seo import regenerate_job_schemas
+from app.modules.locations.snapshot import with_locations
 from app.modules.spas.models import Spa
+from app.utils.slug_allocator import add_with_slug_retry
 
 
 def get_job_by_slug(db: Session, slug: str):
-    """Get job by slug"""
+    """Get job by slug (read-only view; locations come from the location snapshot)"""
     from sqlalchemy.orm import joinedload
-    return db.query(models.Job).options(
-        joinedload(models.Job.city),
-        joinedload(models.Job.area),
-        joinedload(models.Job.state),
-        joinedload(models.Job.country),
+    job = db.query(models.Job).options(
         joinedload(models.Job.spa),
         joinedload(models.Job.job_type),
         joinedload(models.Job.job_category),
         joinedload(models.Job.created_by_user),
     ).filter(models.Job.slug == slug).first()
+    return with_locations(db, [job])[0] if job else None
 
 
 def get_job_by_id(db: Session, job_id: int):
@@ -90,20 +90,16 @@ def get_jobs(
     if is_featured is not None:
         query = query.filter(models.Job.is_featured == is_featured)
 
-    # Eagerly load relationships for better performance
+    # Eagerly load relationships for better performance (locations come from the snapshot)
     from sqlalchemy.orm import joinedload
     query = query.options(
-        joinedload(models.Job.city),
-        joinedload(models.Job.area),
-        joinedload(models.Job.state),
-        joinedload(models.Job.country),
         joinedload(models.Job.spa),
         joinedload(models.Job.job_type),
         joinedload(models.Job.job_category),
         joinedload(models.Job.created_by_user),
     )
 
-    return query.offset(skip).limit(limit).all()
+    return with_locations(db, query.offset(skip).limit(limit).all())
 
 
 def get_recruiter_jobs(db: Session, user_id: int, skip: int = 0, limit: int = 100):
@@ -142,8 +138,7 @@ def create_job(db: Session, job: schemas.JobCreate, user_id: int, user_role: str
     """
     from app.modules.users.models import User, UserRole
     
-    # Get dict using by_alias=False to get internal field names (seo_schema_json)
-    # We'll map it to schema_json for the model
+    # Get dict using by_alias=False to get internal field names
     job_dict = job.model_dump(exclude_none=False, by_alias=False)
     
     # Filter out callable values and ensure only valid types are included
@@ -185,19 +180,17 @@ def create_job(db: Session, job: schemas.JobCreate, user_id: int, user_role: str
     job_data["created_by"] = user_id
     job_data["updated_by"] = user_id
     
-    # Map seo_schema_json (from schema) to schema_json (model field)
-    if "seo_schema_json" in job_data:
-        job_data["schema_json"] = job_data.pop("seo_schema_json")
-    
-    # Ensure schema_json and other optional fields are properly handled (remove any callable values)
-    fields_to_check = ["schema_json", "canonical_url", "meta_title", "meta_description"]
+    # Ensure optional SEO fields are properly handled (remove any callable values)
+    # schema_json is not accepted as input; regenerate_job_schemas() writes it below
+    fields_to_check = ["canonical_url", "meta_title", "meta_description"]
     for field in fields_to_check:
         if field in job_data and (job_data[field] is None or callable(job_data[field]) or not isinstance(job_data[field], (str, type(None)))):
             job_data[field] = None
 
     db_job = models.Job(**job_data)
-    db.add(db_job)
+    add_with_slug_retry(db, db_job)
     db.commit()
+    regenerate_job_schemas(db, models.Job.id == db_job.id)
     db.refresh(db_job)
     return db_job
 
@@ -216,6 +209,7 @@ def update_job(db: Session, job_id: int, job_update: schemas.JobUpdate, user_id:
         return None
     
     update_data = job_update.model_dump(exclude_unset=True, by_alias=False)
+    old_slug = job.slug
     
     # Get the current SPA to check permissions
     current_spa = db.query(Spa).filter(Spa.id == job.spa_id).first()
@@ -245,16 +239,16 @@ def update_job(db: Session, job_id: int, job_update: schemas.JobUpdate, user_id:
             update_data["latitude"] = spa.latitude
             update_data["longitude"] = spa.longitude
     
-    # Map seo_schema_json (from schema) to schema_json (model field)
-    if "seo_schema_json" in update_data:
-        update_data["schema_json"] = update_data.pop("seo_schema_json")
-    
     for field, value in update_data.items():
         setattr(job, field, value)
     
     job.updated_by = user_id
     db.commit()
+    regenerate_job_schemas(db, models.Job.id == job.id)
     db.refresh(job)
+
+    from app.modules.jobs.page import invalidate_job_page
+    invalidate_job_page(old_slug, job.slug, job_id=job.id)
     return job
 
 
@@ -275,66 +269,304 @@ def delete_job(db: Session, job_id: int, permanent: bool = False):
         # Soft delete - for non-admin users
         job.is_active = False
     
+    slug = job.slug
     db.commit()
+
+    from app.modules.jobs.page import invalidate_job_page
+    invalidate_job_page(slug, job_id=job_id)
     return True
 
 
-def increment_job_view(db: Session, job_id: int) -> models.Job | None:
-    """Increase view_count when a job detail page is viewed."""
-    job = db.query(models.Job).filter(models.Job.id == job_id).first()
-    if not job:
+def _increment_job_counter(db: Session, job_id: int, column_name: str) -> int | None:
+    """
+    Buffer a +1 for one of the job popularity counters.
+    Returns the near-real-time value, or None if the job does not exist.
+    """
+    from app.core import counters
+
+    stored = db.query(getattr(models.Job, column_name)).filter(models.Job.id == job_id).first()
+    if stored is None:
         return None
-    job.view_count = (job.view_count or 0) + 1
-    db.commit()
-    db.refresh(job)
-    return job
+    counters.increment("jobs", column_name, job_id)
+    return counters.get_counter_value("jobs", column_name, job_id, stored[0])
 
 
-def increment_job_apply_click(db: Session, job_id: int) -> models.Job | None:
+def increment_job_view(db: Session, job_id: int) -> int | None:
+    """Increase view_count when a job detail page is viewed."""
+    return _increment_job_counter(db, job_id, "view_count")
+
+
+def increment_job_apply_click(db: Session, job_id: int) -> int | None:
     """Increase apply_click_count when the apply button is clicked."""
-    job = db.query(models.Job).filter(models.Job.id == job_id).first()
-    if not job:
-        return None
-    job.apply_click_count = (job.apply_click_count or 0) + 1
-    db.commit()
-    db.refresh(job)
-    return job
+    return _increment_job_counter(db, job_id, "apply_click_count")
 
 
-def increment_job_message_count(db: Session, job_id: int) -> models.Job | None:
+def increment_job_message_count(db: Session, job_id: int) -> int | None:
     """Increase message_count when a message is sent about this job."""
-    job = db.query(models.Job).filter(models.Job.id == job_id).first()
-    if not job:
-        return None
-    job.message_count = (job.message_count or 0) + 1
-    db.commit()
-    db.refresh(job)
-    return job
+    return _increment_job_counter(db, job_id, "message_count")
 
 
-def get_popular_jobs(db: Session, limit: int = 10):
+def get_job_tracking_info(db: Session, job_id: int):
+    """
+    Load only what view/apply tracking needs in a single query:
+    counters, spa_id, and the job's (or its spa's) city name and coordinates.
+    Returns None if the job does not exist.
     """
-    Return popular jobs ordered by view_count (and then apply_click_count).
+    from sqlalchemy.orm import aliased
+    from app.modules.locations.models import City
+
+    JobCity = aliased(City)
+    SpaCity = aliased(City)
+    return (
+        db.query(
+            models.Job.id,
+            models.Job.spa_id,
+            models.Job.view_count,
+            models.Job.apply_click_count,
+            models.Job.latitude,
+            models.Job.longitude,
+            JobCity.name.label("city_name"),
+            Spa.latitude.label("spa_latitude"),
+            Spa.longitude.label("spa_longitude"),
+            SpaCity.name.label("spa_city_name"),
+        )
+        .outerjoin(JobCity, JobCity.id == models.Job.city_id)
+        .outerjoin(Spa, Spa.id == models.Job.spa_id)
+        .outerjoin(SpaCity, SpaCity.id == Spa.city_id)
+        .filter(models.Job.id == job_id)
+        .first()
+    )
+
+
+# Trending score weight per interaction. Apply clicks are counted from
+# analytics_events only; the 'apply' button click logs the same action.
+TRENDING_WEIGHTS = {
+    "page_view": 1.0,
+    "apply_click": 5.0,
+    "contact_click": 4.0,  # whatsapp / call buttons
+    "share": 2.0,
+    "message": 5.0,
+}
+
 
-    This is fast and works even without hitting the analytics_events table.
+def refresh_trending_scores(db: Session) -> int:
+    """
+    Rebuild job_trending from recent interactions.
+
+    score = sum(weight * 0.5 ** (age_hours / TRENDING_HALF_LIFE_HOURS)) over
+    page views, apply clicks, contact/share button clicks and messages from
+    the last TRENDING_WINDOW_DAYS, for active jobs only. The table is
+    replaced in one transaction, so readers never see a partial ranking.
+    Returns the number of jobs scored.
+    """
+    from datetime import timedelta
+    from sqlalchemy import text
+    from app.core.config import settings
+
+    now = datetime.utcnow()
+    params = {
+        "now": now,
+        "since": now - timedelta(days=settings.TRENDING_WINDOW_DAYS),
+        "half_life": float(settings.TRENDING_HALF_LIFE_HOURS),
+        **{f"w_{name}": weight for name, weight in TRENDING_WEIGHTS.items()},
+    }
+    try:
+        db.execute(text("DELETE FROM job_trending"))
+        result = db.execute(text("""
+            WITH events AS (
+                SELECT job_id,
+                       CASE event_type WHEN 'apply_click' THEN :w_apply_click ELSE :w_page_view END AS weight,
+                       created_at
+                FROM analytics_events
+                WHERE job_id IS NOT NULL
+                  AND event_type IN ('page_view', 'apply_click')
+                  AND created_at >= :since
+                UNION ALL
+                SELECT job_id,
+                       CASE button_type WHEN 'share' THEN :w_share ELSE :w_contact_click END,
+                       created_at
+                FROM job_button_click_analytics
+                WHERE button_type IN ('whatsapp', 'call', 'share')
+                  AND created_at >= :since
+                UNION ALL
+                SELECT job_id, :w_message, created_at
+                FROM messages
+                WHERE job_id IS NOT NULL AND created_at >= :since
+            )
+            INSERT INTO job_trending (job_id, score, city_id, job_category_id, updated_at)
+            SELECT j.id,
+                   SUM(e.weight * POWER(0.5, EXTRACT(EPOCH FROM (:now - e.created_at)) / 3600.0 / :half_life)),
+                   j.city_id,
+                   j.job_category_id,
+                   :now
+            FROM events e
+            JOIN jobs j ON j.id = e.job_id
+            WHERE j.is_active = TRUE
+            GROUP BY j.id, j.city_id, j.job_category_id
+        """), params)
+        db.commit()
+        return result.rowcount
+    except Exception:
+        db.rollback()
+        raise
+
+
+def get_popular_jobs(
+    db: Session,
+    limit: int = 10,
+    city_id: int | None = None,
+    job_category_id: int | None = None,
+):
+    """
+    Return trending jobs, highest time-decayed score first.
+
+    Reads the top-K rows of job_trending (optionally scoped to a city and/or
+    category). If fewer than `limit` jobs have recent activity (e.g. before
+    the first refresh), the rest is filled by lifetime view_count.
     """
     from sqlalchemy.orm import joinedload
-    return (
+
+    def base_query():
+        query = db.query(models.Job).options(
+            joinedload(models.Job.spa),
+            joinedload(models.Job.job_type),
+            joinedload(models.Job.job_category),
+        ).filter(models.Job.is_active == True)
+        if city_id is not None:
+            query = query.filter(models.Job.city_id == city_id)
+        if job_category_id is not None:
+            query = query.filter(models.Job.job_category_id == job_category_id)
+        return query
+
+    Trending = models.JobTrending
+    top_ids = db.query(Trending.job_id)
+    if city_id is not None:
+        top_ids = top_ids.filter(Trending.city_id == city_id)
+    if job_category_id is not None:
+        top_ids = top_ids.filter(Trending.job_category_id == job_category_id)
+    top_ids = [row[0] for row in top_ids.order_by(Trending.score.desc(), Trending.job_id).limit(limit)]
+
+    jobs = []
+    if top_ids:
+        by_id = {job.id: job for job in base_query().filter(models.Job.id.in_(top_ids)).all()}
+        jobs = [by_id[job_id] for job_id in top_ids if job_id in by_id]
+
+    if len(jobs) < limit:
+        query = base_query()
+        if jobs:
+            query = query.filter(models.Job.id.notin_([job.id for job in jobs]))
+        jobs += query.order_by(
+            models.Job.view_count.desc(), models.Job.apply_click_count.desc(), models.Job.id
+        ).limit(limit - len(jobs)).all()
+
+    return with_locations(db, jobs)
+
+
+def get_similar_jobs(db: Session, job_id: int, limit: int = 10):
+    """Return precomputed similar jobs (see app.modules.jobs.similarity), most similar first"""
+    from sqlalchemy.orm import joinedload
+
+    Similar = models.JobSimilar
+    jobs = (
         db.query(models.Job)
+        .join(Similar, Similar.similar_job_id == models.Job.id)
         .options(
-            joinedload(models.Job.city),
-            joinedload(models.Job.area),
-            joinedload(models.Job.state),
-            joinedload(models.Job.country),
             joinedload(models.Job.spa),
             joinedload(models.Job.job_type),
             joinedload(models.Job.job_category),
         )
-        .filter(models.Job.is_active == True)
-        .order_by(models.Job.view_count.desc(), models.Job.apply_click_count.desc())
+        .filter(Similar.job_id == job_id, models.Job.is_active == True)
+        .order_by(Similar.score.desc(), models.Job.id)
         .limit(limit)
         .all()
     )
+    return with_locations(db, jobs)
+
+
+def _rollup_query(db: Session, *columns):
+    """Base query over job_count_rollup, skipping empty buckets."""
+    Rollup = models.JobCountRollup
+    return db.query(*columns).select_from(Rollup).filter(Rollup.job_count > 0)
+
+
+def _apply_rollup_filters(
+    query,
+    country_id: int | None = None,
+    state_id: int | None = None,
+    city_id: int | None = None,
+    area_id: int | None = None,
+    job_type: str | None = None,
+    job_category: str | None = None,
+):
+    """Apply the same location/taxonomy filters as get_jobs to a rollup query."""
+    Rollup = models.JobCountRollup
+    if country_id:
+        query = query.filter(Rollup.country_id == country_id)
+    if state_id:
+        query = query.filter(Rollup.state_id == state_id)
+    if city_id:
+        query = query.filter(Rollup.city_id == city_id)
+    if area_id:
+        query = query.filter(Rollup.area_id == area_id)
+    if job_type:
+        query = query.join(models.JobType, models.JobType.id == Rollup.job_type_id).filter(
+            models.JobType.name == job_type
+        )
+    if job_category:
+        query = query.join(models.JobCategory, models.JobCategory.id == Rollup.job_category_id).filter(
+            models.JobCategory.name == job_category
+        )
+    return query
+
+
+def get_job_count(
+    db: Session,
+    country_id: int | None = None,
+    state_id: int | None = None,
+    city_id: int | None = None,
+    area_id: int | None = None,
+    job_type: str | None = None,
+    job_category: str | None = None,
+) -> int:
+    """Return the number of active jobs matching the filters (read from the rollup)."""
+    query = _rollup_query(db, func.coalesce(func.sum(models.JobCountRollup.job_count), 0))
+    query = _apply_rollup_filters(
+        query,
+        country_id=country_id,
+        state_id=state_id,
+        city_id=city_id,
+        area_id=area_id,
+        job_type=job_type,
+        job_category=job_category,
+    )
+    return int(query.scalar() or 0)
+
+
+def get_job_counts_by_city_with_names(
+    db: Session,
+    job_category: str | None = None,
+    job_type: str | None = None,
+):
+    """Return (city_id, city_name, city_slug, job_count) rows for cities with active jobs."""
+    from app.modules.locations.models import City
+
+    Rollup = models.JobCountRollup
+    job_count = func.sum(Rollup.job_count)
+    query = _rollup_query(db, City.id, City.name, City.slug, job_count.label("job_count")).join(
+        City, City.id == Rollup.city_id
+    )
+    query = _apply_rollup_filters(query, job_type=job_type, job_category=job_category)
+    return query.group_by(City.id, City.name, City.slug).having(job_count > 0).all()
+
+
+def _get_job_counts_grouped_by(db: Session, column):
+    job_count = func.sum(models.JobCountRollup.job_count)
+    return (
+        _rollup_query(db, column, job_count.label("job_count"))
+        .group_by(column)
+        .having(job_count > 0)
+        .all()
+    )
 
 
 def get_job_counts_by_state(db: Session):
@@ -342,35 +574,50 @@ def get_job_counts_by_state(db: Session):
     Return total job counts grouped by state_id.
     Frontend can join with locations API to show state names + counts.
     """
-    results = (
-        db.query(models.Job.state_id, func.count(models.Job.id).label("job_count"))
-        .filter(models.Job.is_active == True)
-        .group_by(models.Job.state_id)
-        .all()
-    )
-    return [{"state_id": state_id, "job_count": count} for state_id, count in results]
+    results = _get_job_counts_grouped_by(db, models.JobCountRollup.state_id)
+    return [{"state_id": state_id or None, "job_count": count} for state_id, count in results]
 
 
 def get_job_counts_by_city(db: Session):
     """Return total job counts grouped by city_id."""
-    results = (
-        db.query(models.Job.city_id, func.count(models.Job.id).label("job_count"))
-        .filter(models.Job.is_active == True)
-        .group_by(models.Job.city_id)
-        .all()
-    )
-    return [{"city_id": city_id, "job_count": count} for city_id, count in results]
+    results = _get_job_counts_grouped_by(db, models.JobCountRollup.city_id)
+    return [{"city_id": city_id or None, "job_count": count} for city_id, count in results]
 
 
 def get_job_counts_by_area(db: Session):
     """Return total job counts grouped by area_id."""
-    results = (
-        db.query(models.Job.area_id, func.count(models.Job.id).label("job_count"))
-        .filter(models.Job.is_active == True)
-        .group_by(models.Job.area_id)
-        .all()
-    )
-    return [{"area_id": area_id, "job_count": count} for area_id, count in results]
+    results = _get_job_counts_grouped_by(db, models.JobCountRollup.area_id)
+    return [{"area_id": area_id or None, "job_count": count} for area_id, count in results]
+
+
+def reconcile_job_count_rollup(db: Session) -> int:
+    """
+    Rebuild job_count_rollup from the jobs table.
+
+    Repairs drift from writes that bypass the ORM events (bulk query
+    updates/deletes, manual SQL). The table lock blocks concurrent event
+    upserts until the rebuild commits, so no increments are lost.
+    Returns the number of rollup rows written.
+    """
+    from sqlalchemy import text
+
+    keys = ", ".join(models.ROLLUP_KEY_FIELDS)
+    coalesced = ", ".join(f"COALESCE({field}, 0)" for field in models.ROLLUP_KEY_FIELDS)
+    try:
+        db.execute(text("LOCK TABLE job_count_rollup IN SHARE ROW EXCLUSIVE MODE"))
+        db.execute(text("DELETE FROM job_count_rollup"))
+        result = db.execute(text(f"""
+            INSERT INTO job_count_rollup ({keys}, job_count)
+            SELECT {coalesced}, COUNT(*)
+            FROM jobs
+            WHERE is_active = TRUE
+            GROUP BY {coalesced}
+        """))
+        db.commit()
+        return result.rowcount
+    except Exception:
+        db.rollback()
+        raise
 
 
 # JobType Services
@@ -450,6 +697,8 @@ def update_job_category(db: Session, job_category_id: int, job_category_update:
         setattr(db_job_category, field, value)
     
     db.commit()
+    if "name" in update_data:
+        regenerate_job_schemas(db, models.Job.job_category_id == job_category_id)
     db.refresh(db_job_category)
     return db_job_category
 
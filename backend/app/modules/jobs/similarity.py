@@ -0,0 +1,216 @@
+"""
+Content-based "similar jobs" index
+
+Each active job is a TF-IDF vector over terms from its title and key skills,
+plus its category, employment type and location. Vectors are held as
+CSR/CSC NumPy arrays, neighbours are scored with sparse dot products through
+the inverted (term -> jobs) index, and the top-N per job are persisted to
+job_similar so the API only reads precomputed rows.
+
+Full rebuild:  python -m app.modules.jobs.similarity
+"""
+
+import re
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import delete, func, insert, or_
+from sqlalchemy.orm import Session
+
+from app.modules.jobs import models
+
+TOP_N = 10
+INSERT_BATCH_SIZE = 5000
+
+# Relative weight of each field's features
+FIELD_WEIGHTS = {
+    "title": 1.0,
+    "skill": 1.5,
+    "category": 2.0,
+    "employee_type": 0.5,
+    "city": 1.0,
+    "state": 0.5,
+}
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {"a", "an", "and", "at", "for", "in", "of", "or", "the", "to", "with"}
+
+
+def _words(text: Optional[str]) -> List[str]:
+    return [word for word in _WORD_RE.findall((text or "").lower()) if len(word) > 1 and word not in _STOPWORDS]
+
+
+def job_features(
+    title: Optional[str],
+    key_skills: Optional[str],
+    job_category_id: Optional[int],
+    employee_type: Optional[str],
+    city_id: Optional[int],
+    state_id: Optional[int],
+) -> Dict[str, float]:
+    """Weighted term frequencies for one job (title and skill words share one term space)"""
+    features: Dict[str, float] = {}
+    for word in _words(title):
+        features[f"term:{word}"] = features.get(f"term:{word}", 0.0) + FIELD_WEIGHTS["title"]
+    for word in _words(key_skills):
+        features[f"term:{word}"] = features.get(f"term:{word}", 0.0) + FIELD_WEIGHTS["skill"]
+    if job_category_id:
+        features[f"category:{job_category_id}"] = FIELD_WEIGHTS["category"]
+    if employee_type:
+        features[f"employee_type:{employee_type.strip().lower()}"] = FIELD_WEIGHTS["employee_type"]
+    if city_id:
+        features[f"city:{city_id}"] = FIELD_WEIGHTS["city"]
+    if state_id:
+        features[f"state:{state_id}"] = FIELD_WEIGHTS["state"]
+    return features
+
+
+class SimilarityIndex:
+    """L2-normalised TF-IDF job vectors in CSR (job -> terms) and CSC (term -> jobs) form"""
+
+    def __init__(self, job_ids: List[int], job_features_list: List[Dict[str, float]]):
+        self.job_ids = np.asarray(job_ids, dtype=np.int64)
+        self.row_of = {job_id: row for row, job_id in enumerate(job_ids)}
+
+        vocabulary: Dict[str, int] = {}
+        rows, cols, values = [], [], []
+        for row, features in enumerate(job_features_list):
+            for term, weight in features.items():
+                rows.append(row)
+                cols.append(vocabulary.setdefault(term, len(vocabulary)))
+                values.append(weight)
+
+        n_jobs, n_terms = len(job_ids), len(vocabulary)
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+
+        # TF-IDF (smoothed idf), then L2-normalise each job vector
+        document_frequency = np.bincount(cols, minlength=n_terms)
+        idf = np.log((1 + n_jobs) / (1 + document_frequency)) + 1
+        values = values * idf[cols]
+        norms = np.sqrt(np.bincount(rows, weights=values ** 2, minlength=n_jobs))
+        values = values / np.where(norms > 0, norms, 1)[rows]
+
+        # Entries were appended row by row, so they are already in CSR order
+        self.indptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=n_jobs))))
+        self.indices = cols
+        self.data = values
+
+        order = np.argsort(cols, kind="stable")
+        self.col_indptr = np.concatenate(([0], np.cumsum(document_frequency)))
+        self.col_rows = rows[order]
+        self.col_data = values[order]
+
+    def __len__(self) -> int:
+        return len(self.job_ids)
+
+    def neighbours(self, job_id: int, top_n: int = TOP_N) -> List[Tuple[int, float]]:
+        """Return [(job_id, cosine similarity)] of the top_n most similar jobs"""
+        row = self.row_of.get(job_id)
+        if row is None:
+            return []
+
+        terms = self.indices[self.indptr[row]:self.indptr[row + 1]]
+        if len(terms) == 0:
+            return []
+        weights = self.data[self.indptr[row]:self.indptr[row + 1]]
+        starts, ends = self.col_indptr[terms], self.col_indptr[terms + 1]
+
+        # Sparse dot product: gather every posting of this job's terms and sum per job
+        postings = np.concatenate([np.arange(start, end) for start, end in zip(starts, ends)])
+        products = self.col_data[postings] * np.repeat(weights, ends - starts)
+        scores = np.bincount(self.col_rows[postings], weights=products, minlength=len(self))
+        scores[row] = 0
+
+        k = min(top_n, int(np.count_nonzero(scores > 0)))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.lexsort((self.job_ids[top], -scores[top]))]
+        return [(int(self.job_ids[i]), float(scores[i])) for i in top]
+
+
+def load_index(db: Session) -> SimilarityIndex:
+    """Build the index from all active jobs (column-only query)"""
+    Job = models.Job
+    rows = db.query(
+        Job.id, Job.title, Job.key_skills, Job.job_category_id, Job.Employee_type, Job.city_id, Job.state_id,
+    ).filter(Job.is_active == True).order_by(Job.id).all()
+    return SimilarityIndex(
+        [row[0] for row in rows],
+        [job_features(*row[1:]) for row in rows],
+    )
+
+
+def rebuild_similar_jobs(db: Session, job_ids: Optional[Iterable[int]] = None, top_n: int = TOP_N) -> int:
+    """
+    Recompute and persist neighbours.
+
+    With job_ids=None every row of job_similar is replaced; otherwise only the
+    given jobs' neighbour lists are (inactive ones are just cleared).
+    Returns the number of jobs whose neighbours were written.
+    """
+    # Before loading: jobs written while the index is read are picked up next refresh
+    computed_at = datetime.utcnow()
+    index = load_index(db)
+    Similar = models.JobSimilar
+
+    if job_ids is None:
+        targets = [int(job_id) for job_id in index.job_ids]
+        clear = delete(Similar)
+    else:
+        job_ids = list(set(job_ids))
+        targets = [job_id for job_id in job_ids if job_id in index.row_of]
+        clear = delete(Similar).where(Similar.job_id.in_(job_ids))
+
+    try:
+        db.execute(clear)
+        batch = []
+        for job_id in targets:
+            batch.extend(
+                {"job_id": job_id, "similar_job_id": similar_id, "score": score, "computed_at": computed_at}
+                for similar_id, score in index.neighbours(job_id, top_n)
+            )
+            if len(batch) >= INSERT_BATCH_SIZE:
+                db.execute(insert(Similar), batch)
+                batch = []
+        if batch:
+            db.execute(insert(Similar), batch)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return len(targets)
+
+
+def refresh_changed_similar_jobs(db: Session) -> int:
+    """
+    Incremental refresh: recompute neighbours only for jobs created or
+    updated since the last build (full rebuild if nothing was built yet).
+    Existing lists pick up new jobs at the next full rebuild.
+    """
+    Job = models.Job
+    last_built = db.query(func.max(models.JobSimilar.computed_at)).scalar()
+    if last_built is None:
+        return rebuild_similar_jobs(db)
+
+    changed = [
+        row[0] for row in db.query(Job.id).filter(
+            or_(Job.created_at > last_built, Job.updated_at > last_built)
+        )
+    ]
+    if not changed:
+        return 0
+    return rebuild_similar_jobs(db, changed)
+
+
+if __name__ == "__main__":
+    from app.core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        print(f"Rebuilt similar jobs for {rebuild_similar_jobs(db)} jobs")
+    finally:
+        db.close()
@@ -0,0 +1,3 @@
+"""
+SEO landing page module: cached page payloads for location/category pages
+"""
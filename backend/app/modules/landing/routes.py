@@ -0,0 +1,32 @@
+"""
+SEO landing page API routes
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.core.responses import fast_json
+from app.modules.landing import services
+
+router = APIRouter(prefix="/api/landing", tags=["landing"])
+
+
+@router.get("/{kind}/{path:path}")
+def get_landing_page(kind: str, path: str, db: Session = Depends(get_db)):
+    """
+    Complete data for a location/category landing page in one cached call:
+    resolved location (and category), top jobs, total job count, nearby
+    areas and facet counts.
+
+    kind:
+    - location: /spa-jobs-in paths, e.g. andheri-west-mumbai-maharashtra or andheri-west/mumbai/maharashtra
+    - city: /cities paths, e.g. mumbai or mumbai/andheri-west
+    - category: {category}/{location}, e.g. therapist/mumbai
+    """
+    if kind not in services.KINDS:
+        raise HTTPException(status_code=404, detail="Unknown landing page kind")
+    page = services.get_landing_page(db, kind, path)
+    if page is None:
+        raise HTTPException(status_code=404, detail="Landing page not found")
+    return fast_json(dict, page)
@@ -0,0 +1,33 @@
+"""
+Periodic landing page pre-generation
+The application already does this in the background (run_landing_pregenerator);
+this script is for refreshing the shared Redis cache from outside it.
+"""
+
+from app.core.cache import get_redis_client
+from app.core.database import SessionLocal
+from app.modules.landing.services import pregenerate_landing_pages
+
+
+def run_landing_pregeneration():
+    """Cache the payload of every landing page listed in the sitemap"""
+    if get_redis_client() is None:
+        # The payloads would only land in this process's memory cache
+        print("Redis is not enabled: skipping landing page pre-generation "
+              "(the application pre-generates its own cache)")
+        return
+    db = SessionLocal()
+    try:
+        pages = pregenerate_landing_pages(db)
+        print(f"Pre-generated {pages} landing pages")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    """
+    Only useful with REDIS_ENABLED. Run as a cron job or scheduled task, more
+    often than LANDING_CACHE_TTL_SECONDS (default hourly TTL -> every 30-60 minutes):
+    python -m app.modules.landing.scheduler
+    """
+    run_landing_pregeneration()
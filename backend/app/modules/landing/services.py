@@ -0,0 +1,355 @@
+"""
+SEO landing page payloads
+
+Everything a location or category+location landing page renders, in one
+payload: resolved location, top jobs, totals, nearby areas and facet counts.
+
+Payloads are cached per scope (category, state, city, area), so every URL
+form of the same page (/spa-jobs-in-andheri-mumbai, /spa-jobs-in/andheri/
+mumbai/maharashtra, ...) shares one entry. Job writes drop the scopes the
+job belongs to (before and after the write); counts on neighbouring pages
+(nearby areas) catch up within LANDING_CACHE_TTL_SECONDS.
+run_landing_pregenerator() refills the cache for every landing URL listed in
+the sitemap every LANDING_PREGENERATE_INTERVAL_SECONDS.
+
+The cache is shared by all workers only with REDIS_ENABLED. Without Redis
+each worker has its own in-memory cache: a job write drops the pages of the
+worker that handled it, other workers keep serving their copy until its TTL
+(or their next pre-generation pass) runs out.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session, joinedload, object_session
+
+from app.core.cache import delete_cached, get_cached, get_redis_client, set_cached
+from app.core.config import settings
+from app.modules.jobs.models import Job, JobCategory, JobCountRollup, JobType
+from app.modules.locations import resolver
+from app.modules.locations.models import Area, City
+from app.modules.locations.snapshot import get_snapshot
+
+CACHE_PREFIX = "landing"
+NEARBY_AREAS_LIMIT = 10
+
+# Landing page kinds and how their path is read
+#   location: spa-jobs-in path, e.g. andheri-west-mumbai or andheri-west/mumbai/maharashtra
+#   city: /cities/{city}[/{area}] path, e.g. mumbai/andheri-west
+#   category: {category}[/{location path}], e.g. therapist/mumbai
+KINDS = ("location", "city", "category")
+
+SCOPE_FIELDS = ("state_id", "city_id", "area_id", "job_category_id")
+
+
+@dataclass(frozen=True)
+class LandingScope:
+    job_category_id: int = 0
+    state_id: int = 0
+    city_id: int = 0
+    area_id: int = 0
+
+    @property
+    def cache_key(self) -> str:
+        return f"{CACHE_PREFIX}:{self.job_category_id}:{self.state_id}:{self.city_id}:{self.area_id}"
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _part(entry) -> Optional[Dict[str, Any]]:
+    return {"id": entry.id, "name": entry.name, "slug": entry.slug} if entry else None
+
+
+# ---------------------------------------------------------------------------
+# Path resolution
+# ---------------------------------------------------------------------------
+
+def _get_category(db: Session, slug: str) -> Optional[JobCategory]:
+    # Sitemap URLs use hyphens where stored slugs may use underscores
+    return db.query(JobCategory).filter(
+        JobCategory.slug.in_([slug, slug.replace("-", "_")])
+    ).order_by(JobCategory.id).first()
+
+
+def resolve_landing(db: Session, kind: str, path: str) -> Optional[Tuple[LandingScope, Dict[str, Any]]]:
+    """Map a landing path to its cache scope and resolved entities, or None if unknown"""
+    segments = [segment for segment in path.strip("/").lower().split("/") if segment]
+    category = None
+    if kind == "category":
+        if not segments:
+            return None
+        category = _get_category(db, segments[0])
+        if category is None:
+            return None
+        segments = segments[1:]
+    elif kind == "city":
+        segments = list(reversed(segments))  # city/area -> area/city (most specific first)
+
+    location = {"area": None, "city": None, "state": None}
+    if segments:
+        location = resolver.resolve_path(db, "/".join(segments))
+        if location is None:
+            return None
+    elif category is None:
+        return None
+
+    scope = LandingScope(
+        job_category_id=category.id if category else 0,
+        state_id=location["state"].id if location["state"] else 0,
+        city_id=location["city"].id if location["city"] else 0,
+        area_id=location["area"].id if location["area"] else 0,
+    )
+    resolved = {
+        "location": {kind_: _part(entry) for kind_, entry in location.items()},
+        "category": {"id": category.id, "name": category.name, "slug": category.slug} if category else None,
+    }
+    return scope, resolved
+
+
+# ---------------------------------------------------------------------------
+# Payload
+# ---------------------------------------------------------------------------
+
+def _rollup_filters(scope: LandingScope, exclude: Iterable[str] = ()) -> list:
+    conditions = [JobCountRollup.job_count > 0]
+    for field in SCOPE_FIELDS:
+        value = getattr(scope, field)
+        if value and field not in exclude:
+            conditions.append(getattr(JobCountRollup, field) == value)
+    return conditions
+
+
+def _facet(db: Session, scope: LandingScope, model, column) -> List[Dict[str, Any]]:
+    job_count = func.sum(JobCountRollup.job_count)
+    rows = db.query(model.id, model.name, model.slug, job_count).select_from(JobCountRollup).join(
+        model, model.id == column
+    ).filter(*_rollup_filters(scope)).group_by(
+        model.id, model.name, model.slug
+    ).having(job_count > 0).order_by(job_count.desc(), model.id).all()
+    return [{"id": row_id, "name": name, "slug": slug, "job_count": int(count)} for row_id, name, slug, count in rows]
+
+
+def _nearby_areas(db: Session, scope: LandingScope) -> List[Dict[str, Any]]:
+    """Other areas of the same city that have jobs (in the same category, if any)"""
+    if not scope.city_id:
+        return []
+    job_count = func.sum(JobCountRollup.job_count)
+    rows = db.query(Area.id, Area.name, Area.slug, job_count).select_from(JobCountRollup).join(
+        Area, Area.id == JobCountRollup.area_id
+    ).filter(
+        *_rollup_filters(scope, exclude=("area_id",)),
+        JobCountRollup.area_id != scope.area_id,
+    ).group_by(Area.id, Area.name, Area.slug).having(job_count > 0).order_by(
+        job_count.desc(), Area.id
+    ).limit(NEARBY_AREAS_LIMIT).all()
+    return [{"id": row_id, "name": name, "slug": slug, "job_count": int(count)} for row_id, name, slug, count in rows]
+
+
+def _top_jobs(db: Session, scope: LandingScope) -> List[Dict[str, Any]]:
+    query = db.query(Job).options(joinedload(Job.spa)).filter(Job.is_active == True)
+    for field in SCOPE_FIELDS:
+        value = getattr(scope, field)
+        if value:
+            query = query.filter(getattr(Job, field) == value)
+    jobs = query.order_by(Job.is_featured.desc(), Job.created_at.desc(), Job.id.desc()).limit(
+        settings.LANDING_JOBS_LIMIT
+    ).all()
+
+    snapshot = get_snapshot(db)
+    results = []
+    for job in jobs:
+        city = snapshot.cities.get(job.city_id)
+        area = snapshot.areas.get(job.area_id) if job.area_id else None
+        results.append({
+            "id": job.id,
+            "slug": job.slug,
+            "title": job.title,
+            "spa_name": job.spa.name if job.spa else None,
+            "spa_logo_image": job.spa.logo_image if job.spa else None,
+            "city_name": city.name if city else None,
+            "area_name": area.name if area else None,
+            "salary_min": job.salary_min,
+            "salary_max": job.salary_max,
+            "salary_currency": job.salary_currency,
+            "Employee_type": job.Employee_type,
+            "is_featured": job.is_featured,
+            "created_at": _iso(job.created_at),
+        })
+    return results
+
+
+def build_landing_payload(db: Session, scope: LandingScope) -> Dict[str, Any]:
+    total = db.query(func.coalesce(func.sum(JobCountRollup.job_count), 0)).filter(*_rollup_filters(scope)).scalar()
+    return {
+        "total_jobs": int(total or 0),
+        "jobs": _top_jobs(db, scope),
+        "nearby_areas": _nearby_areas(db, scope),
+        "facets": {
+            "job_categories": _facet(db, scope, JobCategory, JobCountRollup.job_category_id),
+            "job_types": _facet(db, scope, JobType, JobCountRollup.job_type_id),
+        },
+        "generated_at": _iso(datetime.utcnow()),
+    }
+
+
+def get_landing_page(db: Session, kind: str, path: str) -> Optional[Dict[str, Any]]:
+    """Complete landing page data, or None if the path does not resolve"""
+    resolved = resolve_landing(db, kind, path)
+    if resolved is None:
+        return None
+    scope, entities = resolved
+
+    payload = get_cached(scope.cache_key)
+    if payload is None:
+        payload = build_landing_payload(db, scope)
+        set_cached(scope.cache_key, payload, settings.LANDING_CACHE_TTL_SECONDS)
+    return {"kind": kind, "path": path, **entities, **payload}
+
+
+# ---------------------------------------------------------------------------
+# Invalidation
+# ---------------------------------------------------------------------------
+
+def scopes_for(values: Dict[str, Any]) -> Set[LandingScope]:
+    """Every landing scope a job with these ids appears in"""
+    state_id, city_id, area_id = values.get("state_id") or 0, values.get("city_id") or 0, values.get("area_id") or 0
+    category_id = values.get("job_category_id") or 0
+    scopes = set()
+    if category_id:
+        scopes.add(LandingScope(category_id, 0, 0, 0))  # /category/{category} without a location
+    for category_id in {0, category_id}:
+        scopes.add(LandingScope(category_id, state_id, 0, 0))
+        scopes.add(LandingScope(category_id, state_id, city_id, 0))
+        if area_id:
+            scopes.add(LandingScope(category_id, state_id, city_id, area_id))
+    return scopes
+
+
+def invalidate_scopes(scopes: Iterable[LandingScope]) -> None:
+    """Drop cached pages (in every worker with Redis; only in this one without)"""
+    keys = [scope.cache_key for scope in scopes]
+    if keys:
+        delete_cached(*keys)
+
+
+def invalidate_for_jobs(rows: Iterable[Dict[str, Any]]) -> None:
+    """Drop landing pages for jobs written with Core statements (e.g. bulk import)"""
+    scopes = set()
+    for values in rows:
+        scopes |= scopes_for(values)
+    invalidate_scopes(scopes)
+
+
+def _previous(target: Job) -> Dict[str, Any]:
+    state = inspect(target)
+    values = {}
+    for field in SCOPE_FIELDS:
+        history = state.attrs[field].history
+        values[field] = history.deleted[0] if history.deleted else getattr(target, field)
+    return values
+
+
+def _job_changed(mapper, connection, target: Job) -> None:
+    # Drop after commit, or a concurrent request could re-cache pre-commit data
+    session = object_session(target)
+    if session is None:
+        return
+    current = {field: getattr(target, field) for field in SCOPE_FIELDS}
+    session.info.setdefault("landing_scopes", set()).update(scopes_for(current) | scopes_for(_previous(target)))
+
+
+for _event_name in ("after_insert", "after_update", "after_delete"):
+    event.listen(Job, _event_name, _job_changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session) -> None:
+    scopes = session.info.pop("landing_scopes", None)
+    if scopes:
+        invalidate_scopes(scopes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session) -> None:
+    session.info.pop("landing_scopes", None)
+
+
+# ---------------------------------------------------------------------------
+# Pre-generation
+# ---------------------------------------------------------------------------
+
+def sitemap_scopes(db: Session) -> Set[LandingScope]:
+    """Scopes of the landing URLs the sitemap lists (see app.modules.seo.sitemap)"""
+    scopes = set()
+
+    # /cities/{city} for every city
+    for city_id, state_id in db.query(City.id, City.state_id):
+        scopes.add(LandingScope(0, state_id, city_id, 0))
+
+    # /cities/{city}/{area} and /spa-jobs-in-... for areas and cities with jobs
+    rows = db.query(JobCountRollup.state_id, JobCountRollup.city_id, JobCountRollup.area_id).filter(
+        JobCountRollup.job_count > 0, JobCountRollup.city_id != 0
+    ).distinct()
+    for state_id, city_id, area_id in rows:
+        scopes.add(LandingScope(0, state_id, city_id, 0))
+        if area_id:
+            scopes.add(LandingScope(0, state_id, city_id, area_id))
+
+    # /jobs/category/{category}/location/{city} (same selection as the sitemap)
+    job_count = func.sum(JobCountRollup.job_count)
+    category_cities = db.query(JobCountRollup.job_category_id, City.id, City.state_id).join(
+        City, City.id == JobCountRollup.city_id
+    ).filter(JobCountRollup.job_category_id != 0).group_by(
+        JobCountRollup.job_category_id, City.id, City.state_id
+    ).having(job_count >= 5).limit(100)
+    for category_id, city_id, state_id in category_cities:
+        scopes.add(LandingScope(category_id, state_id, city_id, 0))
+    return scopes
+
+
+def pregenerate_landing_pages(db: Session) -> int:
+    """Build and cache the payload of every sitemap landing page; returns the number built"""
+    scopes = sitemap_scopes(db)
+    for scope in scopes:
+        set_cached(scope.cache_key, build_landing_payload(db, scope), settings.LANDING_CACHE_TTL_SECONDS)
+    return len(scopes)
+
+
+PREGENERATE_LOCK_KEY = "landing:pregenerate:lock"
+
+
+async def run_landing_pregenerator(interval_seconds: int = None):
+    """
+    Background loop that pre-generates the sitemap landing pages at start-up
+    and then every interval. With Redis one worker per interval does the work
+    for all of them; without Redis every worker warms its own cache.
+    """
+    from app.core.database import SessionLocal
+
+    interval = interval_seconds or settings.LANDING_PREGENERATE_INTERVAL_SECONDS
+
+    def _pregenerate():
+        redis_client = get_redis_client()
+        if redis_client:
+            try:
+                if not redis_client.set(PREGENERATE_LOCK_KEY, "1", nx=True, ex=interval):
+                    return 0  # Another worker ran this interval
+            except Exception:
+                pass  # Redis error: pre-generate anyway
+        db = SessionLocal()
+        try:
+            return pregenerate_landing_pages(db)
+        finally:
+            db.close()
+
+    while True:
+        try:
+            await asyncio.to_thread(_pregenerate)
+        except Exception as e:
+            print(f"Landing page pre-generation failed: {e}")
+        await asyncio.sleep(interval)
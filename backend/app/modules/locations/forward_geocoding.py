@@ -0,0 +1,307 @@
+"""
+Batch forward geocoding for spas and jobs without coordinates
+
+Spas created without latitude/longitude (and the jobs that copied their
+missing coordinates) never show up in near-me search. run_batch_geocoding()
+fills them in, in id order and GEOCODE_BATCH_SIZE rows at a time:
+1. jobs take their spa's coordinates where the spa has them (one UPDATE)
+2. remaining spas, then jobs, go through the provider chain:
+   area centroid (local_geocoder) -> Nominatim /search on the address ->
+   city centroid
+Each batch is written back with one executemany UPDATE (spas also fill in
+their jobs) together with a checkpoint of the last id handled, so a run
+that stops (time budget, Nominatim busy, crash) resumes where it left off.
+Being Core statements, the write-backs record their change feed events
+themselves and drop the cached job page parts of what they updated. That
+reaches the application workers only through Redis; without it (the cron
+job has its own memory cache) workers show the new coordinates once their
+cached parts expire (PART_TTL_SECONDS).
+A pass that reaches the last id starts over from the beginning next run,
+retrying rows nothing could place. Nominatim results, misses included, are
+stored in geocode_searches, so a retried address is only re-sent to
+Nominatim GEOCODE_SEARCH_MISS_RETRY_HOURS after its last miss.
+"""
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+
+from app.core.cache import get_redis_client
+from app.core.config import settings
+from app.modules.changes.models import ChangeAction, record_changes
+from app.modules.jobs.models import Job
+from app.modules.locations import nominatim
+from app.modules.locations.local_geocoder import local_geocoder
+from app.modules.locations.models import GeocodeCheckpoint, GeocodeSearch
+from app.modules.locations.snapshot import get_snapshot
+from app.modules.spas.models import Spa
+
+ENTITIES = {"spas": Spa, "jobs": Job}
+
+
+@dataclass(frozen=True)
+class AddressQuery:
+    """What we know about where a spa or job is"""
+    address: Optional[str] = None
+    postal_code: Optional[str] = None
+    area_id: Optional[int] = None
+    city_id: Optional[int] = None
+    state_id: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class GeocodeResult:
+    latitude: float
+    longitude: float
+    source: str
+
+
+class GeocodeProvider(ABC):
+    """One way of turning an AddressQuery into coordinates"""
+    name = "provider"
+
+    @abstractmethod
+    async def geocode(self, db: Session, query: AddressQuery) -> Optional[GeocodeResult]:
+        """Coordinates for the query, or None if this provider cannot place it"""
+
+
+class CentroidProvider(GeocodeProvider):
+    """Centroid of the spas/jobs already placed in the same area (or city)"""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.name = f"{kind}_centroid"
+
+    async def geocode(self, db: Session, query: AddressQuery) -> Optional[GeocodeResult]:
+        location_id = query.area_id if self.kind == "area" else query.city_id
+        if not location_id:
+            return None
+        if local_geocoder.needs_rebuild():
+            await asyncio.to_thread(local_geocoder.ensure_built, db)
+        centroid = local_geocoder.centroid(db, self.kind, location_id)
+        if centroid is None:
+            return None
+        return GeocodeResult(centroid.latitude, centroid.longitude, self.name)
+
+
+class NominatimSearchProvider(GeocodeProvider):
+    """Nominatim /search on the full address (cached, coalesced and rate-limited)"""
+    name = "nominatim"
+
+    def _text(self, db: Session, query: AddressQuery) -> Optional[str]:
+        snapshot = get_snapshot(db)
+        area = snapshot.areas.get(query.area_id) if query.area_id else None
+        city = snapshot.cities.get(query.city_id) if query.city_id else None
+        state = snapshot.states.get(query.state_id) if query.state_id else (city.state if city else None)
+        if not (query.address or area or city):
+            return None  # A state or country alone is no use for near-me search
+        parts = [
+            query.address,
+            area.name if area else None,
+            city.name if city else None,
+            state.name if state else None,
+            query.postal_code,
+            state.country.name if state and state.country else None,
+        ]
+        return ", ".join(part.strip() for part in parts if part and part.strip())
+
+    async def geocode(self, db: Session, query: AddressQuery) -> Optional[GeocodeResult]:
+        text = self._text(db, query)
+        if not text:
+            return None
+
+        key = text.lower()
+        stored = db.get(GeocodeSearch, key)
+        retry_after = datetime.utcnow() - timedelta(hours=settings.GEOCODE_SEARCH_MISS_RETRY_HOURS)
+        if stored is None or (stored.latitude is None and stored.searched_at < retry_after):
+            async def fetch():
+                results = await nominatim.get_json("/search", {"q": text, "format": "json", "limit": 1})
+                return (float(results[0]["lat"]), float(results[0]["lon"])) if results else (None, None)
+
+            try:
+                latitude, longitude = await nominatim.coalesced(f"search:{key}", fetch)
+            except nominatim.NominatimBusy:
+                raise
+            except Exception as e:
+                print(f"Error forward geocoding '{text}': {e}")
+                return None  # Not stored: retried next pass
+            # Misses are stored too (committed with the batch), so they are not re-sent every pass
+            stored = stored or GeocodeSearch(query=key)
+            stored.latitude, stored.longitude = latitude, longitude
+            stored.searched_at = datetime.utcnow()
+            db.add(stored)
+
+        if stored.latitude is None:
+            return None
+        return GeocodeResult(stored.latitude, stored.longitude, self.name)
+
+
+DEFAULT_PROVIDERS: List[GeocodeProvider] = [
+    CentroidProvider("area"),
+    NominatimSearchProvider(),
+    CentroidProvider("city"),
+]
+
+
+async def geocode_address(
+    db: Session, query: AddressQuery, providers: Optional[List[GeocodeProvider]] = None
+) -> Optional[GeocodeResult]:
+    """First result of the provider chain, or None if none could place the address"""
+    for provider in providers or DEFAULT_PROVIDERS:
+        result = await provider.geocode(db, query)
+        if result is not None:
+            return result
+    return None
+
+
+def _invalidate_pages(changed: Dict[str, List[Tuple[int, Optional[str]]]]) -> None:
+    """
+    Drop cached job page parts showing the old (missing) coordinates; call
+    after commit. Only with Redis: without it the page caches live in the
+    application workers' memory, which this (cron) process cannot reach.
+    """
+    from app.modules.jobs.page import invalidate_job_page, invalidate_spa_part
+
+    if get_redis_client() is None:
+        return
+
+    job_slugs = [slug for _, slug in changed.get("job", ())]
+    if job_slugs:
+        invalidate_job_page(*job_slugs)
+    for spa_id, _ in changed.get("spa", ()):
+        invalidate_spa_part(spa_id)
+
+
+def _fill_jobs_from_spas(db: Session, spa_ids: Optional[List[int]] = None) -> List[Tuple[int, Optional[str]]]:
+    """
+    Give jobs without coordinates their spa's coordinates (only jobs of
+    spa_ids if given) and record change events; returns (job id, slug) rows
+    """
+    stmt = update(Job).where(
+        Job.spa_id == Spa.id,
+        Job.latitude.is_(None),
+        Spa.latitude.isnot(None),
+        Spa.longitude.isnot(None),
+    )
+    if spa_ids is not None:
+        stmt = stmt.where(Spa.id.in_(spa_ids))
+    rows = [
+        tuple(row) for row in db.execute(
+            stmt.values(latitude=Spa.latitude, longitude=Spa.longitude)
+            .returning(Job.id, Job.slug)
+            .execution_options(synchronize_session=False)
+        )
+    ]
+    record_changes(db.connection(), "job", rows, ChangeAction.UPDATED)
+    return rows
+
+
+def copy_spa_coordinates_to_jobs(db: Session) -> int:
+    """Give jobs without coordinates their spa's coordinates; returns jobs updated"""
+    rows = _fill_jobs_from_spas(db)
+    db.commit()
+    _invalidate_pages({"job": rows})
+    return len(rows)
+
+
+def _checkpoint(db: Session, entity: str) -> GeocodeCheckpoint:
+    checkpoint = db.get(GeocodeCheckpoint, entity)
+    if checkpoint is None:
+        checkpoint = GeocodeCheckpoint(entity=entity, last_id=0)
+        db.add(checkpoint)
+        db.flush()
+    return checkpoint
+
+
+def _pending_rows(db: Session, entity: str, after_id: int, limit: int):
+    model = ENTITIES[entity]
+    query = db.query(
+        model.id, Spa.address, model.postalCode, model.area_id, model.city_id, model.state_id
+    )
+    if entity == "jobs":
+        query = query.outerjoin(Spa, Spa.id == Job.spa_id)  # Jobs use their spa's street address
+    return query.filter(
+        model.latitude.is_(None), model.id > after_id
+    ).order_by(model.id).limit(limit).all()
+
+
+def _write_back(db: Session, entity: str, placed: List[Dict]) -> Dict[str, List[Tuple[int, Optional[str]]]]:
+    """
+    Store the coordinates found for a batch and record their change events
+    (spas also fill in their jobs). Returns the updated (id, slug) rows per
+    change feed entity, for invalidating cached pages after the commit.
+    """
+    model = ENTITIES[entity]
+    table = model.__table__
+    db.execute(
+        update(table).where(table.c.id == bindparam("row_id")).values(
+            latitude=bindparam("lat"), longitude=bindparam("lng")
+        ),
+        placed,
+    )
+    ids = [row["row_id"] for row in placed]
+    rows = [tuple(row) for row in db.execute(select(model.id, model.slug).where(model.id.in_(ids)))]
+    feed_entity = "spa" if entity == "spas" else "job"
+    record_changes(db.connection(), feed_entity, rows, ChangeAction.UPDATED)
+
+    changed = {feed_entity: rows}
+    if entity == "spas":
+        # Jobs copy their spa's coordinates on create; fill in the ones created before
+        changed["job"] = _fill_jobs_from_spas(db, ids)
+    return changed
+
+
+async def geocode_batch(db: Session, entity: str, batch_size: Optional[int] = None) -> Dict[str, int]:
+    """
+    Geocode the next batch of spas or jobs after the checkpoint and commit
+    the coordinates with the new checkpoint. Returns {"processed", "placed",
+    "done", "busy"} (done: the pass reached the last id; busy: stopped early
+    because Nominatim is saturated).
+    """
+    batch_size = batch_size or settings.GEOCODE_BATCH_SIZE
+    checkpoint = _checkpoint(db, entity)
+    rows = _pending_rows(db, entity, checkpoint.last_id, batch_size)
+
+    placed, last_id, busy = [], checkpoint.last_id, False
+    for row_id, address, postal_code, area_id, city_id, state_id in rows:
+        query = AddressQuery(address, postal_code, area_id, city_id, state_id)
+        try:
+            result = await geocode_address(db, query)
+        except nominatim.NominatimBusy:
+            busy = True  # Keep what we have; this row is retried next run
+            break
+        if result is not None:
+            placed.append({"row_id": row_id, "lat": result.latitude, "lng": result.longitude})
+        last_id = row_id
+
+    done = not busy and len(rows) < batch_size
+    changed = _write_back(db, entity, placed) if placed else {}
+    checkpoint.last_id = 0 if done else last_id  # A finished pass starts over next run
+    db.commit()
+    _invalidate_pages(changed)
+    return {"processed": len(rows), "placed": len(placed), "done": int(done), "busy": int(busy)}
+
+
+async def run_batch_geocoding(db: Session, max_seconds: Optional[int] = None) -> Dict[str, int]:
+    """Copy spa coordinates to jobs, then geocode spas and jobs until done or out of time"""
+    deadline = time.monotonic() + (max_seconds or settings.GEOCODE_BATCH_MAX_SECONDS)
+    totals = {"copied": copy_spa_coordinates_to_jobs(db), "processed": 0, "placed": 0}
+    try:
+        for entity in ENTITIES:
+            while time.monotonic() < deadline:
+                stats = await geocode_batch(db, entity)
+                totals["processed"] += stats["processed"]
+                totals["placed"] += stats["placed"]
+                if stats["busy"]:
+                    return totals  # Resume from the checkpoint next run
+                if stats["done"]:
+                    break
+    finally:
+        await nominatim.close_client()
+    return totals
@@ -1,44 +1,50 @@
 """
 Reverse geocoding service using OpenStreetMap Nominatim API
-Includes caching and rate limiting
+Includes caching and rate limiting (see app.modules.locations.nominatim)
+
+Points inside a well-covered city/area are answered offline from our own
+spa/job centroids (app.modules.locations.local_geocoder). Other resolved
+locations are cached per geohash cell (GEOCODE_GEOHASH_PRECISION
+characters) for GEOCODE_CACHE_HOURS. Lookups go through an in-process LRU,
+then Redis (when enabled), then an indexed equality lookup on
+ResolvedLocation.geohash, and only then Nominatim. Cache hits do not write:
+last_used is queued and flushed in batches by run_last_used_flusher().
 """
 
-import httpx
+import asyncio
+import json
+import threading
 import time
-from typing import Optional, Dict, Any
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+from sqlalchemy import bindparam, update
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
+from app.core.cache import get_redis_client
 from app.core.config import settings
+from app.modules.locations import nominatim
+from app.modules.locations.local_geocoder import local_geocoder
 from app.modules.locations.models import ResolvedLocation
+from app.utils.geo_utils import encode_geohash
 
+CACHE_PREFIX = "geocode"
 
-# Rate limiting: track last request time
-# COMMENTED OUT - Can be uncommented later when needed
-# _last_request_time: float = 0
+ADDRESS_FIELDS = ("city", "area", "state", "country", "postcode", "formatted_address")
 
+# geohash -> (address data, expires at (time.time()))
+_lru: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+# geohash -> last cache hit, waiting for flush_last_used()
+_pending_last_used: Dict[str, datetime] = {}
+_lock = threading.Lock()
 
-# def _rate_limit():
-#     """Ensure we don't exceed Nominatim's rate limit (1 request per second)"""
-#     global _last_request_time
-#     current_time = time.time()
-#     time_since_last = current_time - _last_request_time
-#     
-#     if time_since_last < settings.NOMINATIM_RATE_LIMIT_SECONDS:
-#         sleep_time = settings.NOMINATIM_RATE_LIMIT_SECONDS - time_since_last
-#         time.sleep(sleep_time)
-#     
-#     _last_request_time = time.time()
 
 
 async def reverse_geocode_nominatim(latitude: float, longitude: float) -> Optional[Dict[str, Any]]:
     """
-    Reverse geocode using Nominatim API
+    Reverse geocode using Nominatim API (pooled, rate-limited client)
     Returns address components or None if failed
+    Raises nominatim.NominatimBusy when the request queue is saturated
     """
-    # Rate limiting commented out - can be uncommented later when needed
-    # _rate_limit()
-    
-    url = f"{settings.NOMINATIM_BASE_URL}/reverse"
     params = {
         "lat": latitude,
         "lon": longitude,
@@ -47,79 +53,143 @@ async def reverse_geocode_nominatim(latitude: float, longitude: float) -> Option
         "zoom": 18,  # High detail level
     }
     
-    headers = {
-        "User-Agent": settings.NOMINATIM_USER_AGENT
-    }
-    
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(url, params=params, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-            
-            if not data or "address" not in data:
-                return None
-            
-            address = data.get("address", {})
-            
-            # Extract address components (Nominatim field names vary by region)
-            result = {
-                "city": (
-                    address.get("city") or 
-                    address.get("town") or 
-                    address.get("village") or
-                    address.get("municipality") or
-                    None
-                ),
-                "area": (
-                    address.get("suburb") or 
-                    address.get("neighbourhood") or
-                    address.get("locality") or
-                    None
-                ),
-                "state": (
-                    address.get("state") or 
-                    address.get("region") or
-                    None
-                ),
-                "country": address.get("country", "India"),
-                "postcode": address.get("postcode"),
-                "formatted_address": data.get("display_name"),
-            }
-            
-            return result
-            
+        data = await nominatim.get_json("/reverse", params)
+        if not data or "address" not in data:
+            return None
+        
+        address = data.get("address", {})
+        
+        # Extract address components (Nominatim field names vary by region)
+        result = {
+            "city": (
+                address.get("city") or 
+                address.get("town") or 
+                address.get("village") or
+                address.get("municipality") or
+                None
+            ),
+            "area": (
+                address.get("suburb") or 
+                address.get("neighbourhood") or
+                address.get("locality") or
+                None
+            ),
+            "state": (
+                address.get("state") or 
+                address.get("region") or
+                None
+            ),
+            "country": address.get("country", "India"),
+            "postcode": address.get("postcode"),
+            "formatted_address": data.get("display_name"),
+        }
+        
+        return result
+        
+    except nominatim.NominatimBusy:
+        raise
     except Exception as e:
         print(f"Error reverse geocoding: {e}")
         return None
 
 
+def _ttl() -> timedelta:
+    return timedelta(hours=settings.GEOCODE_CACHE_HOURS)
+
+
+def _lru_get(geohash: str) -> Optional[Dict[str, Any]]:
+    with _lock:
+        entry = _lru.get(geohash)
+        if entry is None:
+            return None
+        if entry[1] <= time.time():
+            del _lru[geohash]
+            return None
+        _lru.move_to_end(geohash)
+        return entry[0]
+
+
+def _lru_put(geohash: str, data: Dict[str, Any], expires_at: float) -> None:
+    with _lock:
+        _lru[geohash] = (data, expires_at)
+        _lru.move_to_end(geohash)
+        while len(_lru) > settings.GEOCODE_LRU_SIZE:
+            _lru.popitem(last=False)
+
+
+def _redis_get(geohash: str) -> Optional[Tuple[Dict[str, Any], float]]:
+    redis_client = get_redis_client()
+    if not redis_client:
+        return None
+    try:
+        key = f"{CACHE_PREFIX}:{geohash}"
+        pipe = redis_client.pipeline()
+        pipe.get(key)
+        pipe.ttl(key)
+        value, ttl = pipe.execute()
+        if value is None or ttl is None or ttl <= 0:
+            return None
+        return json.loads(value), time.time() + ttl
+    except Exception:
+        return None  # Fall back to the database
+
+
+def _redis_put(geohash: str, data: Dict[str, Any], expires_at: float) -> None:
+    redis_client = get_redis_client()
+    ttl = int(expires_at - time.time())
+    if not redis_client or ttl <= 0:
+        return
+    try:
+        redis_client.setex(f"{CACHE_PREFIX}:{geohash}", ttl, json.dumps(data))
+    except Exception:
+        pass  # The database copy is still there
+
+
+def _touch(geohash: str) -> None:
+    """Queue a last_used update instead of writing on every hit"""
+    with _lock:
+        _pending_last_used[geohash] = datetime.utcnow()
+
+
+def _address(row: ResolvedLocation) -> Dict[str, Any]:
+    data = {field: getattr(row, field) for field in ADDRESS_FIELDS}
+    data["latitude"] = row.latitude
+    data["longitude"] = row.longitude
+    return data
+
+
 def get_cached_location(
     db: Session, 
     latitude: float, 
     longitude: float,
-    tolerance: float = 0.001  # ~100 meters
-) -> Optional[ResolvedLocation]:
+) -> Optional[Dict[str, Any]]:
     """
-    Check if we have a cached location within tolerance
+    Cached address data for the geohash cell of (latitude, longitude), or
+    None if the cell was never resolved or its entry expired
     """
-    # Round to reduce cache misses for very similar coordinates
-    lat_rounded = round(latitude, 4)
-    lng_rounded = round(longitude, 4)
-    
-    # Look for cached location within tolerance
-    cached = db.query(ResolvedLocation).filter(
-        ResolvedLocation.latitude.between(lat_rounded - tolerance, lat_rounded + tolerance),
-        ResolvedLocation.longitude.between(lng_rounded - tolerance, lng_rounded + tolerance)
-    ).first()
+    geohash = encode_geohash(latitude, longitude, settings.GEOCODE_GEOHASH_PRECISION)
     
-    if cached:
-        # Update last_used timestamp
-        cached.last_used = datetime.utcnow()
-        db.commit()
-        return cached
+    data = _lru_get(geohash)
+    if data is None:
+        shared = _redis_get(geohash)
+        if shared is not None:
+            data, expires_at = shared
+            _lru_put(geohash, data, expires_at)
+    if data is None:
+        cached = db.query(ResolvedLocation).filter(
+            ResolvedLocation.geohash == geohash,
+            ResolvedLocation.created_at >= datetime.utcnow() - _ttl(),
+        ).order_by(ResolvedLocation.created_at.desc()).first()
+        if cached is None:
+            return None
+        data = _address(cached)
+        expires_at = time.time() + (cached.created_at + _ttl() - datetime.utcnow()).total_seconds()
+        _lru_put(geohash, data, expires_at)
+        _redis_put(geohash, data, expires_at)
     
-    return None
+    _touch(geohash)
+    return data
 
 
 def cache_location(
@@ -129,25 +199,90 @@ def cache_location(
     address_data: Dict[str, Any]
 ) -> ResolvedLocation:
     """
-    Cache a resolved location in the database
+    Cache a resolved location in the database (replacing an expired entry
+    for the same geohash cell)
     """
-    resolved = ResolvedLocation(
-        latitude=latitude,
-        longitude=longitude,
-        city=address_data.get("city"),
-        area=address_data.get("area"),
-        state=address_data.get("state"),
-        country=address_data.get("country"),
-        postcode=address_data.get("postcode"),
-        formatted_address=address_data.get("formatted_address"),
-    )
+    geohash = encode_geohash(latitude, longitude, settings.GEOCODE_GEOHASH_PRECISION)
+    resolved = db.query(ResolvedLocation).filter(
+        ResolvedLocation.geohash == geohash
+    ).order_by(ResolvedLocation.created_at.desc()).first()
+    if resolved is None:
+        resolved = ResolvedLocation(geohash=geohash)
+        db.add(resolved)
+    
+    now = datetime.utcnow()
+    resolved.latitude = latitude
+    resolved.longitude = longitude
+    for field in ADDRESS_FIELDS:
+        setattr(resolved, field, address_data.get(field))
+    resolved.created_at = now
+    resolved.last_used = now
     
-    db.add(resolved)
     db.commit()
     db.refresh(resolved)
+    
+    expires_at = time.time() + _ttl().total_seconds()
+    data = _address(resolved)
+    _lru_put(geohash, data, expires_at)
+    _redis_put(geohash, data, expires_at)
     return resolved
 
 
+def flush_last_used(db: Session) -> int:
+    """Write queued last_used timestamps in one batched UPDATE; returns cells written"""
+    with _lock:
+        pending = dict(_pending_last_used)
+        _pending_last_used.clear()
+    if not pending:
+        return 0
+    
+    table = ResolvedLocation.__table__
+    try:
+        db.execute(
+            update(table).where(table.c.geohash == bindparam("cell")).values(last_used=bindparam("used")),
+            [{"cell": geohash, "used": used} for geohash, used in pending.items()],
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        # Re-queue unless a newer hit arrived meanwhile
+        with _lock:
+            for geohash, used in pending.items():
+                _pending_last_used.setdefault(geohash, used)
+        raise
+    return len(pending)
+
+
+async def run_last_used_flusher(interval_seconds: int = None):
+    """Background loop that flushes queued last_used updates every interval"""
+    from app.core.database import SessionLocal
+
+    interval = interval_seconds or settings.GEOCODE_LAST_USED_FLUSH_SECONDS
+
+    def _flush():
+        db = SessionLocal()
+        try:
+            return flush_last_used(db)
+        finally:
+            db.close()
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(_flush)
+        except Exception as e:
+            print(f"Geocode last_used flush failed: {e}")
+
+
+def evict_expired_locations(db: Session) -> int:
+    """Delete cached locations older than GEOCODE_CACHE_HOURS; returns rows deleted"""
+    deleted = db.query(ResolvedLocation).filter(
+        ResolvedLocation.created_at < datetime.utcnow() - _ttl()
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+
 async def reverse_geocode(
     db: Session,
     latitude: float,
@@ -157,31 +292,36 @@ async def reverse_geocode(
     Main reverse geocoding function with caching
     Returns address data or None
     """
-    # Check cache first
+    # Our own city/area centroids answer most requests without a lookup
+    if settings.GEOCODE_LOCAL_ENABLED:
+        if local_geocoder.needs_rebuild():
+            await asyncio.to_thread(local_geocoder.ensure_built, db)  # Off the event loop
+        local = local_geocoder.reverse(db, latitude, longitude)
+        if local:
+            return {**local, "cached": True, "source": "local"}
+    
+    # Check cache next
     cached = get_cached_location(db, latitude, longitude)
     if cached:
-        return {
-            "city": cached.city,
-            "area": cached.area,
-            "state": cached.state,
-            "country": cached.country,
-            "postcode": cached.postcode,
-            "formatted_address": cached.formatted_address,
-            "latitude": cached.latitude,
-            "longitude": cached.longitude,
-            "cached": True,
-        }
+        return {**cached, "cached": True, "source": "cache"}
+    
+    # Not in cache, call Nominatim (once per geohash cell, however many callers are waiting)
+    cell = encode_geohash(latitude, longitude, settings.GEOCODE_GEOHASH_PRECISION)
     
-    # Not in cache, call Nominatim
-    address_data = await reverse_geocode_nominatim(latitude, longitude)
+    async def fetch():
+        address_data = await reverse_geocode_nominatim(latitude, longitude)
+        if address_data:
+            cache_location(db, latitude, longitude, address_data)
+        return address_data
+    
+    address_data = await nominatim.coalesced(f"reverse:{cell}", fetch)
     
     if address_data:
-        # Cache the result
-        cache_location(db, latitude, longitude, address_data)
+        address_data = dict(address_data)  # Shared with coalesced callers
         address_data["cached"] = False
+        address_data["source"] = "nominatim"
         address_data["latitude"] = latitude
         address_data["longitude"] = longitude
         return address_data
     
     return None
-
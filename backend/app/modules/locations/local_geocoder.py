@@ -0,0 +1,197 @@
+"""
+Offline reverse geocoder from our own data (one per worker process)
+
+Every spa and job with coordinates is tagged with its city and area, so
+the mean position of a city's (or area's) spas/jobs is its centroid and the
+RADIUS_PERCENTILE distance from it is its radius. Centroids are indexed in
+KD-trees; a point is resolved to the nearest city (and the nearest area of
+that city) when it lies within that centroid's radius + GEOCODE_LOCAL_MARGIN_KM,
+the centroid is backed by at least GEOCODE_LOCAL_MIN_POINTS spas/jobs, and no
+other centroid claims the point about as strongly. Anything else is a miss,
+and the caller falls back to Nominatim.
+
+Names come from the location snapshot; centroids are rebuilt every
+REBUILD_INTERVAL_SECONDS, by one thread at a time. Async callers run the
+build in a worker thread (asyncio.to_thread) when needs_rebuild() says so;
+while a rebuild runs, other callers keep using the previous indexes.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.modules.jobs.models import Job
+from app.modules.locations.snapshot import get_snapshot
+from app.modules.spas.models import Spa
+from app.utils.geo_utils import KDTree, distances_from, unit_vectors
+
+REBUILD_INTERVAL_SECONDS = 3600
+RADIUS_PERCENTILE = 90  # Ignores the odd mis-tagged or far-flung spa
+AREA_CANDIDATES = 8  # Nearest areas checked for one that belongs to the matched city
+AMBIGUITY_RATIO = 1.5  # A runner-up that also contains the point must be this much further
+
+
+@dataclass(frozen=True)
+class Centroid:
+    id: int
+    latitude: float
+    longitude: float
+    radius_km: float
+    points: int
+
+
+class _Index:
+    """Centroids of one kind and their KD-tree"""
+
+    def __init__(self, centroids: List[Centroid]):
+        self.centroids = centroids
+        self.by_id: Dict[int, Centroid] = {centroid.id: centroid for centroid in centroids}
+        self.tree = KDTree(
+            [centroid.latitude for centroid in centroids],
+            [centroid.longitude for centroid in centroids],
+        ) if centroids else None
+
+    def nearest(self, latitude: float, longitude: float, k: int) -> List[Tuple[Centroid, float]]:
+        if self.tree is None:
+            return []
+        return [(self.centroids[i], distance) for i, distance in self.tree.query(latitude, longitude, k)]
+
+
+def _centroids(keys: np.ndarray, lats: np.ndarray, lngs: np.ndarray) -> List[Centroid]:
+    """One centroid per distinct key (mean of unit vectors, so it works across the antimeridian too)"""
+    if len(keys) == 0:
+        return []
+    order = np.argsort(keys, kind="stable")
+    keys, lats, lngs = keys[order], lats[order], lngs[order]
+    vectors = unit_vectors(lats, lngs)
+    unique, starts = np.unique(keys, return_index=True)
+    ends = np.append(starts[1:], len(keys))
+
+    centroids = []
+    for key, start, end in zip(unique.tolist(), starts.tolist(), ends.tolist()):
+        x, y, z = vectors[start:end].mean(axis=0)
+        latitude = float(np.degrees(np.arctan2(z, np.hypot(x, y))))
+        longitude = float(np.degrees(np.arctan2(y, x)))
+        distances = distances_from(latitude, longitude, lats[start:end], lngs[start:end])
+        radius = float(np.percentile(distances, RADIUS_PERCENTILE))
+        centroids.append(Centroid(int(key), latitude, longitude, radius, end - start))
+    return centroids
+
+
+def _confident(candidates: List[Tuple[Centroid, float]]) -> Optional[Centroid]:
+    """The nearest candidate, if the point clearly lies within it"""
+    if not candidates:
+        return None
+    margin = settings.GEOCODE_LOCAL_MARGIN_KM
+    best, distance = candidates[0]
+    if best.points < settings.GEOCODE_LOCAL_MIN_POINTS or distance > best.radius_km + margin:
+        return None
+    for other, other_distance in candidates[1:]:
+        if other_distance <= other.radius_km + margin and other_distance < distance * AMBIGUITY_RATIO:
+            return None  # Between two places; let Nominatim decide
+    return best
+
+
+class LocalGeocoder:
+    """City and area centroid indexes, swapped in whole on rebuild"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()  # One rebuild at a time
+        self._indexes: Optional[Tuple[_Index, _Index]] = None
+        self._built_at: Optional[float] = None
+
+    def rebuild(self, db: Session) -> None:
+        """Recompute centroids from all spas and jobs with coordinates (column-only query)"""
+        spas = db.query(Spa.city_id, Spa.area_id, Spa.latitude, Spa.longitude).filter(
+            Spa.latitude.isnot(None), Spa.longitude.isnot(None)
+        )
+        jobs = db.query(Job.city_id, Job.area_id, Job.latitude, Job.longitude).filter(
+            Job.latitude.isnot(None), Job.longitude.isnot(None)
+        )
+        rows = spas.union_all(jobs).all()
+
+        city_ids = np.fromiter((row[0] or 0 for row in rows), dtype=np.int64, count=len(rows))
+        area_ids = np.fromiter((row[1] or 0 for row in rows), dtype=np.int64, count=len(rows))
+        lats = np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows))
+        lngs = np.fromiter((row[3] for row in rows), dtype=np.float64, count=len(rows))
+
+        has_city, has_area = city_ids > 0, area_ids > 0
+        cities = _Index(_centroids(city_ids[has_city], lats[has_city], lngs[has_city]))
+        areas = _Index(_centroids(area_ids[has_area], lats[has_area], lngs[has_area]))
+        with self._lock:
+            self._indexes = (cities, areas)
+            self._built_at = time.monotonic()
+
+    def needs_rebuild(self) -> bool:
+        built_at = self._built_at
+        return built_at is None or time.monotonic() - built_at > REBUILD_INTERVAL_SECONDS
+
+    def ensure_built(self, db: Session) -> None:
+        """
+        Build on first use and periodically afterwards. Blocks only until
+        the first build; later rebuilds already running elsewhere are not
+        waited for (the current indexes stay in use).
+        """
+        if not self.needs_rebuild():
+            return
+        if not self._build_lock.acquire(blocking=self._indexes is None):
+            return
+        try:
+            if self.needs_rebuild():  # Another thread may have just built
+                self.rebuild(db)
+        finally:
+            self._build_lock.release()
+
+    def centroid(self, db: Session, kind: str, location_id: int) -> Optional[Centroid]:
+        """Trusted centroid of a city or area (kind "city"/"area"), for forward geocoding"""
+        self.ensure_built(db)
+        cities, areas = self._indexes
+        centroid = (cities if kind == "city" else areas).by_id.get(location_id)
+        if centroid is None or centroid.points < settings.GEOCODE_LOCAL_MIN_POINTS:
+            return None
+        return centroid
+
+    def reverse(self, db: Session, latitude: float, longitude: float) -> Optional[Dict[str, Any]]:
+        """Address data in the reverse_geocode format, or None when not confident"""
+        self.ensure_built(db)
+        cities, areas = self._indexes
+
+        city_centroid = _confident(cities.nearest(latitude, longitude, 2))
+        if city_centroid is None:
+            return None
+        snapshot = get_snapshot(db)
+        city = snapshot.cities.get(city_centroid.id)
+        if city is None:
+            return None
+
+        area = None
+        area_candidates = [
+            (centroid, distance)
+            for centroid, distance in areas.nearest(latitude, longitude, AREA_CANDIDATES)
+            if snapshot.areas.get(centroid.id) and snapshot.areas[centroid.id].city_id == city.id
+        ]
+        area_centroid = _confident(area_candidates)
+        if area_centroid is not None:
+            area = snapshot.areas[area_centroid.id]
+
+        state = city.state.name if city.state else None
+        country = city.country.name if city.country else None
+        return {
+            "city": city.name,
+            "area": area.name if area else None,
+            "state": state,
+            "country": country,
+            "postcode": None,
+            "formatted_address": ", ".join(part for part in (area.name if area else None, city.name, state, country) if part),
+            "latitude": latitude,
+            "longitude": longitude,
+        }
+
+
+local_geocoder = LocalGeocoder()
@@ -1,10 +1,11 @@
 """
-Location models (Country, State, City, Area, ResolvedLocation)
+Location models (Country, State, City, Area, ResolvedLocation, GeocodeCheckpoint)
 """
 
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Index
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Index, event
 from sqlalchemy.orm import relationship
 from datetime import datetime
+from slugify import slugify
 from app.core.database import Base
 
 
@@ -27,6 +28,7 @@ class State(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True, nullable=False)
+    slug = Column(String, index=True, nullable=True)  # slugify(name), kept in sync below
     country_id = Column(Integer, ForeignKey("countries.id"), nullable=False)
     
     # Relationships
@@ -42,6 +44,7 @@ class City(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True, nullable=False)
+    slug = Column(String, index=True, nullable=True)  # slugify(name), kept in sync below
     state_id = Column(Integer, ForeignKey("states.id"), nullable=False)
     country_id = Column(Integer, ForeignKey("countries.id"), nullable=False)
     
@@ -59,6 +62,7 @@ class Area(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True, nullable=False)
+    slug = Column(String, index=True, nullable=True)  # slugify(name), kept in sync below
     city_id = Column(Integer, ForeignKey("cities.id"), index=True, nullable=False)
     
     # Relationships
@@ -67,6 +71,21 @@ class Area(Base):
     spas = relationship("Spa", back_populates="area")
 
 
+@event.listens_for(State, "before_insert")
+@event.listens_for(State, "before_update")
+@event.listens_for(City, "before_insert")
+@event.listens_for(City, "before_update")
+@event.listens_for(Area, "before_insert")
+@event.listens_for(Area, "before_update")
+def sync_location_slug(mapper, connection, target) -> None:
+    """
+    Location URLs (/cities/{city}, /spa-jobs-in-{area}-{city}-{state}) are
+    built from the name, so the stored slug always follows the name.
+    """
+    if target.name:
+        target.slug = slugify(target.name)
+
+
 class ResolvedLocation(Base):
     """
     Cache for reverse geocoded locations to avoid hitting Nominatim API repeatedly
@@ -76,6 +95,7 @@ class ResolvedLocation(Base):
     id = Column(Integer, primary_key=True, index=True)
     latitude = Column(Float, nullable=False, index=True)
     longitude = Column(Float, nullable=False, index=True)
+    geohash = Column(String(12), nullable=True, index=True)  # Cache key (GEOCODE_GEOHASH_PRECISION chars)
     
     # Resolved address components
     city = Column(String, nullable=True, index=True)
@@ -95,3 +115,29 @@ class ResolvedLocation(Base):
     __table_args__ = (
         Index('idx_lat_lng', 'latitude', 'longitude'),
     )
+
+
+class GeocodeCheckpoint(Base):
+    """
+    Resume point of the batch forward geocoder (last spa/job id processed
+    in the current pass)
+    """
+    __tablename__ = "geocode_checkpoints"
+
+    entity = Column(String(20), primary_key=True)  # spas, jobs
+    last_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class GeocodeSearch(Base):
+    """
+    Nominatim /search results of the batch forward geocoder, keyed by the
+    address text sent; misses (no coordinates) are kept too, so unplaceable
+    addresses are only re-sent after GEOCODE_SEARCH_MISS_RETRY_HOURS
+    """
+    __tablename__ = "geocode_searches"
+
+    query = Column(String, primary_key=True)  # Lower-cased address text
+    latitude = Column(Float, nullable=True)  # NULL: Nominatim found nothing
+    longitude = Column(Float, nullable=True)
+    searched_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,192 @@
+"""
+Shared Nominatim HTTP client
+
+One long-lived, pooled httpx.AsyncClient per event loop instead of a new
+TCP + TLS connection per lookup, with:
+- a rate limit of NOMINATIM_RATE_LIMIT_PER_SECOND for the Nominatim usage
+  policy (https://operations.osmfoundation.org/policies/nominatim/: at most
+  1 req/s). With REDIS_ENABLED it is shared by every process (workers, cron
+  jobs): one request per 1/rate-second slot, claimed with INCR on a per-slot
+  key. Without Redis each process has its own token bucket (bursts of
+  NOMINATIM_BURST) at rate / NOMINATIM_PROCESSES, which keeps the total
+  within the limit only if NOMINATIM_PROCESSES counts every process that
+  geocodes (gunicorn workers plus running cron jobs)
+- a bounded queue: at most NOMINATIM_QUEUE_SIZE requests wait for a token,
+  each for at most NOMINATIM_QUEUE_TIMEOUT_SECONDS; beyond that
+  NominatimBusy is raised instead of piling up requests
+- coalescing: concurrent lookups with the same key (e.g. a geohash cell)
+  share one upstream request
+
+Point NOMINATIM_BASE_URL at benchmarks.nominatim_stub to run against a
+local stub server.
+"""
+
+import asyncio
+import math
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+from app.core.cache import get_redis_client
+from app.core.config import settings
+
+SLOT_KEY_PREFIX = "nominatim:slot"
+
+
+class NominatimBusy(Exception):
+    """The request queue is full or the wait for a rate-limit token timed out"""
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, at most `capacity` saved up"""
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()  # FIFO, so waiters are served in arrival order
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class SharedRateLimiter:
+    """
+    Rate limit shared through Redis by every process: time is cut into
+    1/rate-second slots and a request may only be sent by whoever INCRs a
+    slot's key first. Falls back to `fallback` while Redis is unreachable.
+    """
+
+    def __init__(self, redis_client, rate: float, fallback: TokenBucket):
+        self.redis_client = redis_client
+        self.rate = rate
+        self.fallback = fallback
+        self._expire = math.ceil(2 / rate) + 1
+        self._lock = asyncio.Lock()  # FIFO within this process
+
+    def _claim(self, slot: int) -> bool:
+        key = f"{SLOT_KEY_PREFIX}:{slot}"
+        pipe = self.redis_client.pipeline()
+        pipe.incr(key)
+        pipe.expire(key, self._expire)
+        return pipe.execute()[0] == 1
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                slot = int(time.time() * self.rate)
+                try:
+                    claimed = self._claim(slot)
+                except Exception:
+                    await self.fallback.acquire()
+                    return
+                if claimed:
+                    return
+                # Taken by another process: wait for the next slot
+                await asyncio.sleep(max(0.0, (slot + 1) / self.rate - time.time()))
+
+
+def _make_limiter():
+    bucket = TokenBucket(
+        settings.NOMINATIM_RATE_LIMIT_PER_SECOND / max(1, settings.NOMINATIM_PROCESSES),
+        settings.NOMINATIM_BURST,
+    )
+    redis_client = get_redis_client()
+    if redis_client:
+        return SharedRateLimiter(redis_client, settings.NOMINATIM_RATE_LIMIT_PER_SECOND, bucket)
+    return bucket
+
+
+class _ClientState:
+    """Client, bucket and in-flight requests bound to one event loop"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.loop = loop
+        self.client = httpx.AsyncClient(
+            base_url=settings.NOMINATIM_BASE_URL,
+            headers={"User-Agent": settings.NOMINATIM_USER_AGENT},  # Required by Nominatim
+            timeout=settings.NOMINATIM_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=settings.NOMINATIM_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.NOMINATIM_MAX_CONNECTIONS,
+            ),
+            transport=transport,
+        )
+        self.limiter = _make_limiter()
+        self.queued = 0
+        self.in_flight: Dict[str, asyncio.Future] = {}
+
+
+_state: Optional[_ClientState] = None
+_transport: Optional[httpx.AsyncBaseTransport] = None
+
+
+def use_transport(transport: Optional[httpx.AsyncBaseTransport]) -> None:
+    """Send requests through `transport` (e.g. httpx.ASGITransport(app=stub app)); None restores the network"""
+    global _transport, _state
+    _transport = transport
+    _state = None
+
+
+def _get_state() -> _ClientState:
+    global _state
+    loop = asyncio.get_running_loop()
+    if _state is None or _state.loop is not loop:
+        _state = _ClientState(loop, _transport)
+    return _state
+
+
+async def close_client() -> None:
+    """Close the pooled connections (application shutdown)"""
+    global _state
+    state, _state = _state, None
+    if state is not None:
+        await state.client.aclose()
+
+
+async def get_json(path: str, params: Dict[str, Any]) -> Any:
+    """
+    Rate-limited GET against Nominatim; returns the decoded JSON body
+    Raises NominatimBusy when the queue is full or the wait times out, and
+    httpx errors for failed requests
+    """
+    state = _get_state()
+    if state.queued >= settings.NOMINATIM_QUEUE_SIZE:
+        raise NominatimBusy("Nominatim request queue is full")
+
+    state.queued += 1
+    try:
+        await asyncio.wait_for(state.limiter.acquire(), settings.NOMINATIM_QUEUE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise NominatimBusy("Timed out waiting for a Nominatim rate-limit slot")
+    finally:
+        state.queued -= 1
+
+    response = await state.client.get(path, params=params)
+    response.raise_for_status()
+    return response.json()
+
+
+async def coalesced(key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Await fetch(), unless a request with the same key is already running, in
+    which case share its result (or exception)
+    """
+    state = _get_state()
+    future = state.in_flight.get(key)
+    if future is None:
+        future = asyncio.ensure_future(fetch())
+        state.in_flight[key] = future
+        future.add_done_callback(lambda _: state.in_flight.pop(key, None))
+    # Shielded: a cancelled caller must not cancel the request the others wait on
+    return await asyncio.shield(future)
@@ -0,0 +1,193 @@
+"""
+Location path resolver
+
+Maps frontend location paths to (area_id, city_id, state_id):
+- hyphenated: andheri-west-mumbai-maharashtra (/spa-jobs-in-{area}-{city}-{state})
+- slashed: andheri-west/mumbai/maharashtra (/spa-jobs-in/{area}/{city}/{state})
+
+State, city and area slugs are held in a token trie (one node per hyphen
+separated word), so every slug that starts at a given word is found in one
+walk. A path is parsed into one to three slugs in area > city > state order
+whose parents agree (the area's city is the matched city, and so on).
+Ambiguity is settled deterministically: fewest slugs wins (longest match,
+so "navi-mumbai" is the city rather than area "navi" + city "mumbai"),
+then the lowest ids.
+
+The trie is built from the location snapshot and rebuilt whenever the
+snapshot changes (see app.modules.locations.snapshot).
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.modules.locations.snapshot import LocationSnapshot, get_snapshot
+
+PATH_PREFIX = "spa-jobs-in"
+
+# Order locations appear in a path (most specific first)
+KIND_RANK = {"area": 0, "city": 1, "state": 2}
+
+
+@dataclass(frozen=True)
+class LocationEntry:
+    kind: str
+    id: int
+    name: str
+    slug: str
+    city_id: Optional[int] = None
+    state_id: Optional[int] = None
+
+
+class _Node:
+    __slots__ = ("children", "entries")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.entries: List[LocationEntry] = []
+
+
+class LocationTrie:
+    """Token trie over location slugs"""
+
+    def __init__(self, entries: List[LocationEntry]):
+        self.root = _Node()
+        self.by_id: Dict[Tuple[str, int], LocationEntry] = {}
+        for entry in entries:
+            self.by_id[(entry.kind, entry.id)] = entry
+            node = self.root
+            for token in entry.slug.split("-"):
+                node = node.children.setdefault(token, _Node())
+            node.entries.append(entry)
+
+    def prefixes(self, tokens: List[str], start: int) -> List[Tuple[int, List[LocationEntry]]]:
+        """[(end, entries)] for every slug equal to tokens[start:end]"""
+        matches = []
+        node = self.root
+        for end in range(start, len(tokens)):
+            node = node.children.get(tokens[end])
+            if node is None:
+                break
+            if node.entries:
+                matches.append((end + 1, node.entries))
+        return matches
+
+    def exact(self, tokens: List[str]) -> List[LocationEntry]:
+        matches = self.prefixes(tokens, 0)
+        return matches[-1][1] if matches and matches[-1][0] == len(tokens) else []
+
+
+_trie: Optional[LocationTrie] = None
+_trie_source: Optional[LocationSnapshot] = None
+_lock = threading.Lock()
+
+
+def _entries(snapshot: LocationSnapshot) -> List[LocationEntry]:
+    entries = [
+        LocationEntry("state", state.id, state.name, state.slug)
+        for state in snapshot.states.values()
+        if state.slug
+    ]
+    entries += [
+        LocationEntry("city", city.id, city.name, city.slug, state_id=city.state_id)
+        for city in snapshot.cities.values()
+        if city.slug
+    ]
+    entries += [
+        LocationEntry(
+            "area", area.id, area.name, area.slug,
+            city_id=area.city_id, state_id=area.city.state_id if area.city else None,
+        )
+        for area in snapshot.areas.values()
+        if area.slug
+    ]
+    return entries
+
+
+def get_trie(db: Session) -> LocationTrie:
+    """The trie for the current location snapshot"""
+    global _trie, _trie_source
+    snapshot = get_snapshot(db)
+    if _trie_source is snapshot:
+        return _trie
+    with _lock:
+        if _trie_source is not snapshot:
+            _trie = LocationTrie(_entries(snapshot))
+            _trie_source = snapshot
+        return _trie
+
+
+def _consistent(previous: Optional[LocationEntry], entry: LocationEntry) -> bool:
+    """entry may follow previous in a path (previous is more specific)"""
+    if previous is None:
+        return True
+    if KIND_RANK[entry.kind] <= KIND_RANK[previous.kind]:
+        return False
+    if entry.kind == "city":
+        return previous.city_id == entry.id
+    # entry is a state
+    return previous.state_id == entry.id
+
+
+def _parses(candidates, position: int, end: int, previous: Optional[LocationEntry], chosen: list, found: list) -> None:
+    """Depth-first search over segmentations; candidates(position) -> [(next position, entries)]"""
+    if position == end:
+        if chosen:
+            found.append(list(chosen))
+        return
+    for next_position, entries in candidates(position):
+        for entry in entries:
+            if _consistent(previous, entry):
+                chosen.append(entry)
+                _parses(candidates, next_position, end, entry, chosen, found)
+                chosen.pop()
+
+
+def _normalize(path: str) -> List[List[str]]:
+    """Path -> segments of lowercase tokens, without the spa-jobs-in prefix"""
+    segments = [segment for segment in path.strip().lower().split("/") if segment]
+    if segments and segments[0] == PATH_PREFIX:
+        segments = segments[1:]
+    elif segments and segments[0].startswith(PATH_PREFIX + "-"):
+        segments[0] = segments[0][len(PATH_PREFIX) + 1:]
+    return [[token for token in segment.split("-") if token] for segment in segments]
+
+
+def resolve_path(db: Session, path: str) -> Optional[Dict[str, Optional[LocationEntry]]]:
+    """
+    Resolve a location path to {"area", "city", "state"} entries (parents of
+    the most specific match are filled in), or None if it does not parse.
+    """
+    trie = get_trie(db)
+    segments = [segment for segment in _normalize(path) if segment]
+    if not segments:
+        return None
+
+    found: List[List[LocationEntry]] = []
+    if len(segments) == 1:
+        tokens = segments[0]
+        _parses(lambda position: trie.prefixes(tokens, position), 0, len(tokens), None, [], found)
+    else:
+        # Slashed: every segment must be a whole slug
+        _parses(
+            lambda position: [(position + 1, trie.exact(segments[position]))],
+            0, len(segments), None, [], found,
+        )
+    if not found:
+        return None
+
+    best = min(found, key=lambda parse: (len(parse), [(KIND_RANK[entry.kind], entry.id) for entry in parse]))
+    result: Dict[str, Optional[LocationEntry]] = {"area": None, "city": None, "state": None}
+    for entry in best:
+        result[entry.kind] = entry
+
+    # Fill in the parents implied by the most specific match
+    if result["area"] and not result["city"]:
+        result["city"] = trie.by_id.get(("city", result["area"].city_id))
+    if result["city"] and not result["state"]:
+        result["state"] = trie.by_id.get(("state", result["city"].state_id))
+    if result["area"] and not result["state"]:
+        result["state"] = trie.by_id.get(("state", result["area"].state_id))
+    return result
@@ -2,11 +2,12 @@
 Location API routes
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import Optional, List
 from app.core.database import get_db
-from app.modules.locations import schemas, services, geocoding
+from app.modules.locations import schemas, services, geocoding, resolver, snapshot
+from app.modules.locations.nominatim import NominatimBusy
 from app.modules.users.routes import get_current_user, require_role
 from app.modules.users.models import User, UserRole
 import httpx
@@ -288,6 +289,39 @@ def get_city(slug: str, db: Session = Depends(get_db)):
     return city
 
 
+@router.get("/snapshot")
+def get_location_snapshot(request: Request, db: Session = Depends(get_db)):
+    """
+    The whole location hierarchy in one payload. Each table is a list of
+    rows (arrays) whose fields are named in "columns":
+    {"version": 7, "columns": {"cities": ["id", "name", "slug", "state_id", "country_id"], ...},
+     "countries": [[1, "India"]], "states": [...], "cities": [...], "areas": [...]}
+    Supports If-None-Match.
+    """
+    current = snapshot.get_snapshot(db)
+    headers = {"ETag": current.etag, "Cache-Control": "public, max-age=300"}
+    if request.headers.get("if-none-match") == current.etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=current.payload, media_type="application/json", headers=headers)
+
+
+@router.get("/resolve/{path:path}", response_model=schemas.LocationResolveResponse)
+def resolve_location_path(path: str, db: Session = Depends(get_db)):
+    """
+    Resolve a location path to area/city/state ids, e.g.
+    andheri-west-mumbai-maharashtra, andheri-west/mumbai/maharashtra or
+    spa-jobs-in-navi-mumbai. Served from an in-memory slug trie.
+    """
+    resolved = resolver.resolve_path(db, path)
+    if not resolved:
+        raise HTTPException(status_code=404, detail="Location not found")
+    response = {}
+    for kind, entry in resolved.items():
+        response[f"{kind}_id"] = entry.id if entry else None
+        response[kind] = {"id": entry.id, "name": entry.name, "slug": entry.slug} if entry else None
+    return response
+
+
 @router.post("/reverse-geocode", response_model=schemas.ReverseGeocodeResponse)
 async def reverse_geocode(
     request: schemas.ReverseGeocodeRequest,
@@ -302,9 +336,16 @@ async def reverse_geocode(
     if not (-180 <= request.longitude <= 180):
         raise HTTPException(status_code=400, detail="Invalid longitude")
     
-    result = await geocoding.reverse_geocode(
-        db, request.latitude, request.longitude
-    )
+    try:
+        result = await geocoding.reverse_geocode(
+            db, request.latitude, request.longitude
+        )
+    except NominatimBusy:
+        raise HTTPException(
+            status_code=503,
+            detail="Geocoding service is busy, please retry shortly",
+            headers={"Retry-After": "5"},
+        )
     
     if not result:
         raise HTTPException(
@@ -0,0 +1,42 @@
+"""
+Periodic maintenance tasks for geocoding
+This should be run as a separate process or cron job
+"""
+
+import asyncio
+
+from app.core.database import SessionLocal
+from app.modules.locations.forward_geocoding import run_batch_geocoding
+from app.modules.locations.geocoding import evict_expired_locations
+
+
+def run_geocode_cache_eviction():
+    """Drop resolved locations older than GEOCODE_CACHE_HOURS"""
+    db = SessionLocal()
+    try:
+        rows = evict_expired_locations(db)
+        print(f"Evicted {rows} expired resolved locations")
+    finally:
+        db.close()
+
+
+def run_missing_coordinates_geocoding():
+    """Fill in coordinates of spas and jobs created without them (resumes across runs)"""
+    db = SessionLocal()
+    try:
+        totals = asyncio.run(run_batch_geocoding(db))
+        print(
+            f"Copied spa coordinates to {totals['copied']} jobs; "
+            f"geocoded {totals['placed']} of {totals['processed']} spas/jobs without coordinates"
+        )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    """
+    Run this script as a cron job or scheduled task:
+    - Hourly: python -m app.modules.locations.scheduler
+    """
+    run_geocode_cache_eviction()
+    run_missing_coordinates_geocoding()
@@ -43,6 +43,7 @@ class StateUpdate(BaseModel):
 
 class StateResponse(StateBase):
     id: int
+    slug: Optional[str] = None
     country: Optional[CountryResponse] = None
     
     class Config:
@@ -68,6 +69,7 @@ class CityUpdate(BaseModel):
 
 class CityResponse(CityBase):
     id: int
+    slug: Optional[str] = None
     state: Optional[StateResponse] = None
     country: Optional[CountryResponse] = None
     
@@ -92,12 +94,28 @@ class AreaUpdate(BaseModel):
 
 class AreaResponse(AreaBase):
     id: int
+    slug: Optional[str] = None
     city: Optional[CityResponse] = None
     
     class Config:
         from_attributes = True
 
 
+class ResolvedLocationPart(BaseModel):
+    id: int
+    name: str
+    slug: str
+
+
+class LocationResolveResponse(BaseModel):
+    area_id: Optional[int] = None
+    city_id: Optional[int] = None
+    state_id: Optional[int] = None
+    area: Optional[ResolvedLocationPart] = None
+    city: Optional[ResolvedLocationPart] = None
+    state: Optional[ResolvedLocationPart] = None
+
+
 class ReverseGeocodeRequest(BaseModel):
     latitude: float
     longitude: float
@@ -113,6 +131,7 @@ class ReverseGeocodeResponse(BaseModel):
     latitude: float
     longitude: float
     cached: bool = False
+    source: Optional[str] = None  # local (centroids), cache or nominatim
 
 
 class IPLocationResponse(BaseModel):
@@ -5,9 +5,17 @@ Location business logic
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from app.modules.locations import models, schemas
+from app.utils.slug_allocator import invalidate_location_names
 from typing import List, Optional
 
 
+def _regenerate_job_schemas(db: Session, column: str, location_id: int):
+    """Re-render stored job JSON-LD after a country/state/city rename"""
+    from app.modules.jobs.models import Job
+    from app.modules.jobs.seo import regenerate_job_schemas
+    regenerate_job_schemas(db, getattr(Job, column) == location_id)
+
+
 # Country Services
 def get_country_by_id(db: Session, country_id: int):
     """Get country by ID"""
@@ -45,6 +53,8 @@ def update_country(db: Session, country_id: int, country_update: schemas.Country
     try:
         db.commit()
         db.refresh(db_country)
+        if "name" in update_data:
+            _regenerate_job_schemas(db, "country_id", country_id)
         return db_country
     except IntegrityError:
         db.rollback()
@@ -102,6 +112,9 @@ def update_state(db: Session, state_id: int, state_update: schemas.StateUpdate):
     try:
         db.commit()
         db.refresh(db_state)
+        invalidate_location_names()
+        if "name" in update_data:
+            _regenerate_job_schemas(db, "state_id", state_id)
         return db_state
     except IntegrityError:
         db.rollback()
@@ -116,6 +129,7 @@ def delete_state(db: Session, state_id: int):
     
     db.delete(db_state)
     db.commit()
+    invalidate_location_names()
     return True
 
 
@@ -126,14 +140,8 @@ def get_city_by_id(db: Session, city_id: int):
 
 
 def get_city_by_slug(db: Session, slug: str):
-    """Get city by slug (generates slug from city name for matching)"""
-    from slugify import slugify
-    # Since City model doesn't have a slug field, we need to match by generating slug from name
-    cities = db.query(models.City).all()
-    for city in cities:
-        if slugify(city.name) == slug:
-            return city
-    return None
+    """Get city by its stored slug"""
+    return db.query(models.City).filter(models.City.slug == slug).order_by(models.City.id).first()
 
 
 def get_all_cities(db: Session, state_id: Optional[int] = None, country_id: Optional[int] = None, skip: int = 0, limit: int = 100):
@@ -172,6 +180,9 @@ def update_city(db: Session, city_id: int, city_update: schemas.CityUpdate):
     try:
         db.commit()
         db.refresh(db_city)
+        invalidate_location_names()
+        if "name" in update_data:
+            _regenerate_job_schemas(db, "city_id", city_id)
         return db_city
     except IntegrityError:
         db.rollback()
@@ -186,6 +197,7 @@ def delete_city(db: Session, city_id: int):
     
     db.delete(db_city)
     db.commit()
+    invalidate_location_names()
     return True
 
 
@@ -229,6 +241,7 @@ def update_area(db: Session, area_id: int, area_update: schemas.AreaUpdate):
     try:
         db.commit()
         db.refresh(db_area)
+        invalidate_location_names()
         return db_area
     except IntegrityError:
         db.rollback()
@@ -243,5 +256,6 @@ def delete_area(db: Session, area_id: int):
     
     db.delete(db_area)
     db.commit()
+    invalidate_location_names()
     return True
 
@@ -0,0 +1,217 @@
+"""
+Location hierarchy snapshot
+
+Countries, states, cities and areas change rarely, so each process keeps an
+immutable snapshot of all of them:
+- job services attach city/area/state/country from it (with_locations)
+  instead of joining four tables per row
+- /api/locations/snapshot serves it as one compact, array-encoded JSON
+  payload with an ETag, replacing four paginated list calls
+
+The snapshot carries a version number. Committing a location write bumps
+it (in Redis when enabled, so every worker sees it within
+VERSION_CHECK_SECONDS); without Redis other workers rebuild after
+SNAPSHOT_TTL_SECONDS.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.cache import get_redis_client
+from app.modules.locations.models import Area, City, Country, State
+
+VERSION_KEY = "locations:version"
+VERSION_CHECK_SECONDS = 1
+SNAPSHOT_TTL_SECONDS = 300
+
+COLUMNS = {
+    "countries": ["id", "name"],
+    "states": ["id", "name", "slug", "country_id"],
+    "cities": ["id", "name", "slug", "state_id", "country_id"],
+    "areas": ["id", "name", "slug", "city_id"],
+}
+
+
+@dataclass(frozen=True)
+class CountryRef:
+    id: int
+    name: str
+
+
+@dataclass(frozen=True)
+class StateRef:
+    id: int
+    name: str
+    slug: Optional[str]
+    country_id: int
+    country: Optional[CountryRef]
+
+
+@dataclass(frozen=True)
+class CityRef:
+    id: int
+    name: str
+    slug: Optional[str]
+    state_id: int
+    country_id: int
+    state: Optional[StateRef]
+    country: Optional[CountryRef]
+
+
+@dataclass(frozen=True)
+class AreaRef:
+    id: int
+    name: str
+    slug: Optional[str]
+    city_id: int
+    city: Optional[CityRef]
+
+
+@dataclass(frozen=True)
+class LocationSnapshot:
+    version: int
+    built_at: float
+    countries: Dict[int, CountryRef]
+    states: Dict[int, StateRef]
+    cities: Dict[int, CityRef]
+    areas: Dict[int, AreaRef]
+    payload: bytes
+    etag: str
+
+
+_snapshot: Optional[LocationSnapshot] = None
+_checked_at = 0.0
+_local_version = 0
+_lock = threading.Lock()
+
+
+def _build(db: Session, version: int) -> LocationSnapshot:
+    rows = {
+        "countries": db.query(Country.id, Country.name).order_by(Country.id).all(),
+        "states": db.query(State.id, State.name, State.slug, State.country_id).order_by(State.id).all(),
+        "cities": db.query(City.id, City.name, City.slug, City.state_id, City.country_id).order_by(City.id).all(),
+        "areas": db.query(Area.id, Area.name, Area.slug, Area.city_id).order_by(Area.id).all(),
+    }
+
+    countries = {row.id: CountryRef(row.id, row.name) for row in rows["countries"]}
+    states = {
+        row.id: StateRef(row.id, row.name, row.slug, row.country_id, countries.get(row.country_id))
+        for row in rows["states"]
+    }
+    cities = {
+        row.id: CityRef(
+            row.id, row.name, row.slug, row.state_id, row.country_id,
+            states.get(row.state_id), countries.get(row.country_id),
+        )
+        for row in rows["cities"]
+    }
+    areas = {row.id: AreaRef(row.id, row.name, row.slug, row.city_id, cities.get(row.city_id)) for row in rows["areas"]}
+
+    data = {name: [list(row) for row in table] for name, table in rows.items()}
+    # ETag from content only, so workers with different local versions agree
+    etag = f'"{hashlib.sha1(json.dumps(data, separators=(",", ":")).encode()).hexdigest()[:20]}"'
+    payload = json.dumps({"version": version, "columns": COLUMNS, **data}, separators=(",", ":")).encode()
+    return LocationSnapshot(version, time.monotonic(), countries, states, cities, areas, payload, etag)
+
+
+def _shared_version() -> Optional[int]:
+    redis_client = get_redis_client()
+    if redis_client:
+        try:
+            return int(redis_client.get(VERSION_KEY) or 0)
+        except Exception:
+            pass  # Fall back to the local version
+    return None
+
+
+def get_snapshot(db: Session) -> LocationSnapshot:
+    """The current snapshot, rebuilt when the version moved or it expired"""
+    global _snapshot, _checked_at
+    snapshot = _snapshot
+    if snapshot is not None and time.monotonic() - _checked_at < VERSION_CHECK_SECONDS:
+        return snapshot
+
+    with _lock:
+        now = time.monotonic()
+        if _snapshot is not None and now - _checked_at < VERSION_CHECK_SECONDS:
+            return _snapshot
+        shared = _shared_version()
+        version = shared if shared is not None else _local_version
+        if (
+            _snapshot is None
+            or _snapshot.version != version
+            or (shared is None and now - _snapshot.built_at >= SNAPSHOT_TTL_SECONDS)
+        ):
+            _snapshot = _build(db, version)
+        _checked_at = now
+        return _snapshot
+
+
+def bump_version() -> None:
+    """Invalidate the snapshot in this process and (via Redis) in all others"""
+    global _local_version, _checked_at
+    redis_client = get_redis_client()
+    if redis_client:
+        try:
+            redis_client.incr(VERSION_KEY)
+        except Exception:
+            pass  # Other workers catch up after SNAPSHOT_TTL_SECONDS
+    with _lock:
+        _local_version += 1
+        _checked_at = 0.0
+
+
+def _location_changed(mapper, connection, target) -> None:
+    # Bump only after commit, or other workers could rebuild from pre-commit data
+    from sqlalchemy.orm import object_session
+
+    session = object_session(target)
+    if session is not None:
+        session.info["locations_changed"] = True
+
+
+for _model in (Country, State, City, Area):
+    for _event_name in ("after_insert", "after_update", "after_delete"):
+        event.listen(_model, _event_name, _location_changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_after_commit(session) -> None:
+    if session.info.pop("locations_changed", False):
+        bump_version()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session) -> None:
+    session.info.pop("locations_changed", None)
+
+
+class LocatedView:
+    """
+    Read-only view of a Job/Spa whose city/area/state/country come from the
+    snapshot; every other attribute is read from the wrapped object.
+    """
+    __slots__ = ("_obj", "country", "state", "city", "area")
+
+    def __init__(self, obj, snapshot: LocationSnapshot):
+        self._obj = obj
+        self.country = snapshot.countries.get(obj.country_id)
+        self.state = snapshot.states.get(obj.state_id)
+        self.city = snapshot.cities.get(obj.city_id)
+        self.area = snapshot.areas.get(obj.area_id) if obj.area_id else None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._obj, name)
+
+
+def with_locations(db: Session, objects: Iterable) -> List[LocatedView]:
+    """Wrap query results so location relationships need no joins or lazy loads"""
+    snapshot = get_snapshot(db)
+    return [LocatedView(obj, snapshot) for obj in objects]
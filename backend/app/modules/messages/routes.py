@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 from datetime import datetime
 from app.core.database import get_db
+from app.core import counters
 from app.modules.messages import schemas, models
 from app.modules.users.routes import get_current_user, require_role
 from app.modules.users.models import UserRole
@@ -36,11 +37,10 @@ def create_message(
         message_data["status"] = "new"
     db_message = models.Message(**message_data)
     db.add(db_message)
-    
-    # Update job message count
-    job.message_count = (job.message_count or 0) + 1
-    
     db.commit()
+    
+    # Update job message count (buffered, flushed in batches)
+    counters.increment("jobs", "message_count", job.id)
     db.refresh(db_message)
     
     # Load relationships
@@ -0,0 +1,322 @@
+"""
+Pre-rendered sitemap artifacts
+
+Sitemap shards are rendered ahead of time into SITEMAP_DIR as gzip (and
+brotli, if installed) bytes, each with a small metadata file holding its
+ETag and Last-Modified. Routes serve those bytes with conditional-GET
+support and no database access.
+
+Job/SPA/location writes add the affected shard names to a dirty set
+(Redis, or in memory per worker) once their transaction commits; a
+background loop re-renders only those shards, plus the index. The
+full-scan "locations" and "category-location" shards are only marked by
+writes that can change them (inserts, deletes, activation, location or
+category changes). Full rebuild: python -m app.modules.seo.artifacts
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from app.core.cache import get_redis_client
+from app.core.config import settings
+from app.modules.seo import sitemap
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+INDEX_NAME = "index"
+DIRTY_KEY = "sitemap:dirty"
+
+_dirty: Set[str] = set()
+_dirty_lock = threading.Lock()
+
+
+@dataclass
+class Artifact:
+    etag: str
+    last_modified: datetime
+    gzip_path: str
+    brotli_path: Optional[str]
+
+    @property
+    def last_modified_http(self) -> str:
+        return format_datetime(self.last_modified, usegmt=True)
+
+
+# name -> (metadata file mtime, Artifact)
+_loaded: Dict[str, Tuple[float, Artifact]] = {}
+
+
+def _path(name: str, suffix: str) -> str:
+    return os.path.join(settings.SITEMAP_DIR, f"{name}{suffix}")
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def shard_name(kind: str, row_id: int) -> str:
+    """Sub-sitemap holding a job ("jobs") or SPA ("spas") detail URL"""
+    return f"{kind}-{(row_id - 1) // sitemap.URLS_PER_SHARD + 1}"
+
+
+# ---------------------------------------------------------------------------
+# Dirty set
+# ---------------------------------------------------------------------------
+
+def mark_dirty(*names: str) -> None:
+    """Queue shards for regeneration"""
+    if not names:
+        return
+    redis_client = get_redis_client()
+    if redis_client:
+        try:
+            redis_client.sadd(DIRTY_KEY, *names)
+            return
+        except Exception:
+            pass  # Fall back to memory set
+    with _dirty_lock:
+        _dirty.update(names)
+
+
+def _drain_dirty() -> Set[str]:
+    with _dirty_lock:
+        names = set(_dirty)
+        _dirty.clear()
+
+    redis_client = get_redis_client()
+    if redis_client:
+        # RENAME is atomic, so concurrent SADDs land in a fresh set
+        draining_key = f"{DIRTY_KEY}:draining:{uuid.uuid4().hex}"
+        try:
+            redis_client.rename(DIRTY_KEY, draining_key)
+            names.update(redis_client.smembers(draining_key))
+            redis_client.delete(draining_key)
+        except Exception:
+            pass  # Nothing queued or Redis error
+    return names
+
+
+# Columns whose changes can add or remove URLs in the location/category shards
+JOB_LISTING_FIELDS = ("is_active", "state_id", "city_id", "area_id", "job_category_id")
+SPA_LISTING_FIELDS = ("is_active", "area_id")
+
+
+def _queue_after_commit(target, *names: str) -> None:
+    # Mark after commit: a regeneration between flush and commit would render the old
+    # rows and empty the dirty set, and rolled-back writes must not mark anything
+    session = object_session(target)
+    if session is None:
+        mark_dirty(*names)
+        return
+    session.info.setdefault("sitemap_dirty", set()).update(names)
+
+
+def _listing_changed(target, fields: Tuple[str, ...]) -> bool:
+    state = inspect(target)
+    return any(state.attrs[field].history.has_changes() for field in fields)
+
+
+def _job_changed(mapper, connection, target) -> None:
+    names = [shard_name("jobs", target.id)]
+    if _listing_changed(target, JOB_LISTING_FIELDS):
+        names += ["locations", "category-location"]
+    _queue_after_commit(target, *names)
+
+
+def _job_added_or_removed(mapper, connection, target) -> None:
+    _queue_after_commit(target, shard_name("jobs", target.id), "locations", "category-location")
+
+
+def _spa_changed(mapper, connection, target) -> None:
+    names = [shard_name("spas", target.id)]
+    if _listing_changed(target, SPA_LISTING_FIELDS):
+        names.append("locations")
+    _queue_after_commit(target, *names)
+
+
+def _spa_added_or_removed(mapper, connection, target) -> None:
+    _queue_after_commit(target, shard_name("spas", target.id), "locations")
+
+
+def _location_changed(mapper, connection, target) -> None:
+    _queue_after_commit(target, "locations", "category-location")
+
+
+event.listen(sitemap.Job, "after_update", _job_changed)
+event.listen(sitemap.Spa, "after_update", _spa_changed)
+for _event_name in ("after_insert", "after_delete"):
+    event.listen(sitemap.Job, _event_name, _job_added_or_removed)
+    event.listen(sitemap.Spa, _event_name, _spa_added_or_removed)
+for _model in (sitemap.City, sitemap.Area, sitemap.State, sitemap.JobCategory):
+    for _event_name in ("after_insert", "after_update", "after_delete"):
+        event.listen(_model, _event_name, _location_changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_after_commit(session) -> None:
+    names = session.info.pop("sitemap_dirty", None)
+    if names:
+        mark_dirty(*names)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session) -> None:
+    session.info.pop("sitemap_dirty", None)
+
+
+# ---------------------------------------------------------------------------
+# Rendering
+# ---------------------------------------------------------------------------
+
+def _store(name: str, xml: bytes) -> None:
+    """Write compressed variants and metadata (metadata last, so readers never see a partial set)"""
+    os.makedirs(settings.SITEMAP_DIR, exist_ok=True)
+    _write_atomic(_path(name, ".xml.gz"), gzip.compress(xml, compresslevel=9, mtime=0))
+    if BROTLI_AVAILABLE:
+        _write_atomic(_path(name, ".xml.br"), brotli.compress(xml, quality=11))
+    metadata = {
+        "etag": f'"{hashlib.sha1(xml).hexdigest()}"',
+        "last_modified": datetime.now(timezone.utc).replace(microsecond=0).isoformat(),
+        "brotli": BROTLI_AVAILABLE,
+    }
+    _write_atomic(_path(name, ".json"), json.dumps(metadata).encode())
+
+
+def _remove(name: str) -> None:
+    for suffix in (".json", ".xml.gz", ".xml.br"):
+        try:
+            os.remove(_path(name, suffix))
+        except FileNotFoundError:
+            pass
+
+
+def regenerate(db: Session, names: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    Re-render the given shards (all shards if None) and the index.
+    Shards that no longer exist (e.g. all jobs in an id bucket were
+    deactivated) are removed. Returns the names written.
+    """
+    shards = sitemap.list_shards(db)
+    existing = {name for name, _ in shards}
+    targets = existing if names is None else {name for name in names if sitemap.is_valid_shard(name)}
+
+    written = []
+    for name in sorted(targets):
+        if name in existing:
+            _store(name, "".join(sitemap.generate_sitemap_shard(db, name)).encode())
+            written.append(name)
+        else:
+            _remove(name)
+
+    _store(INDEX_NAME, "".join(sitemap.generate_sitemap_index(db, shards)).encode())
+    written.append(INDEX_NAME)
+    return written
+
+
+def regenerate_dirty(db: Session) -> List[str]:
+    """Re-render shards queued by writes; full build if no artifacts exist yet"""
+    if load_artifact(INDEX_NAME) is None:
+        _drain_dirty()
+        return regenerate(db)
+    names = _drain_dirty()
+    if not names:
+        return []
+    try:
+        return regenerate(db, names)
+    except Exception:
+        mark_dirty(*names)  # Retry on the next run
+        raise
+
+
+async def run_sitemap_regenerator(interval_seconds: int = None):
+    """Background loop that re-renders dirty sitemap shards every interval"""
+    from app.core.database import SessionLocal
+
+    interval = interval_seconds or settings.SITEMAP_REGENERATE_INTERVAL_SECONDS
+
+    def _regenerate():
+        db = SessionLocal()
+        try:
+            return regenerate_dirty(db)
+        finally:
+            db.close()
+
+    while True:
+        try:
+            await asyncio.to_thread(_regenerate)
+        except Exception as e:
+            print(f"Sitemap regeneration failed: {e}")
+        await asyncio.sleep(interval)
+
+
+# ---------------------------------------------------------------------------
+# Serving
+# ---------------------------------------------------------------------------
+
+def load_artifact(name: str) -> Optional[Artifact]:
+    """Metadata for a rendered shard (re-read only when its metadata file changes)"""
+    metadata_path = _path(name, ".json")
+    try:
+        mtime = os.stat(metadata_path).st_mtime
+    except OSError:
+        return None
+
+    cached = _loaded.get(name)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    try:
+        with open(metadata_path) as f:
+            metadata = json.load(f)
+    except (OSError, ValueError):
+        return None
+    artifact = Artifact(
+        etag=metadata["etag"],
+        last_modified=datetime.fromisoformat(metadata["last_modified"]),
+        gzip_path=_path(name, ".xml.gz"),
+        brotli_path=_path(name, ".xml.br") if metadata.get("brotli") else None,
+    )
+    _loaded[name] = (mtime, artifact)
+    return artifact
+
+
+def read_body(artifact: Artifact, accept_encoding: str) -> Tuple[bytes, Optional[str]]:
+    """Return (body, content-encoding) for the best encoding the client accepts"""
+    accept_encoding = accept_encoding.lower()
+    if artifact.brotli_path and "br" in accept_encoding:
+        with open(artifact.brotli_path, "rb") as f:
+            return f.read(), "br"
+    with open(artifact.gzip_path, "rb") as f:
+        body = f.read()
+    if "gzip" in accept_encoding:
+        return body, "gzip"
+    return gzip.decompress(body), None
+
+
+if __name__ == "__main__":
+    from app.core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        print(f"Rendered sitemap artifacts: {', '.join(regenerate(db))}")
+    finally:
+        db.close()
@@ -2,24 +2,97 @@
 SEO API routes
 """
 
-from fastapi import APIRouter, Depends, Response
-from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.modules.seo import sitemap, robots
+from email.utils import parsedate_to_datetime
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from app.core.database import SessionLocal
+from app.modules.seo import artifacts, sitemap, robots
 
 router = APIRouter(prefix="/api/seo", tags=["seo"])
 
+SITEMAP_HEADERS = {
+    "Cache-Control": "public, max-age=3600, s-maxage=3600"
+}
+
+
+def _stream(generate, *args):
+    """
+    Run a sitemap generator with its own session, so the session lives
+    exactly as long as the streamed response body.
+    """
+    db = SessionLocal()
+    try:
+        yield from generate(db, *args)
+    finally:
+        db.close()
+
+
+def _not_modified(request: Request, artifact: artifacts.Artifact) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        return artifact.etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return artifact.last_modified <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _serve_artifact(request: Request, name: str) -> Response:
+    """
+    Serve a pre-rendered sitemap without touching the database, or None if
+    it has not been rendered yet.
+    """
+    artifact = artifacts.load_artifact(name)
+    if artifact is None:
+        return None
+
+    headers = {
+        **SITEMAP_HEADERS,
+        "ETag": artifact.etag,
+        "Last-Modified": artifact.last_modified_http,
+        "Vary": "Accept-Encoding",
+    }
+    if _not_modified(request, artifact):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        body, encoding = artifacts.read_body(artifact, request.headers.get("accept-encoding", ""))
+    except OSError:
+        return None  # Replaced mid-read; fall back to rendering
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/xml", headers=headers)
+
 
 @router.get("/sitemap.xml")
-def get_sitemap(db: Session = Depends(get_db)):
-    """Generate and return XML sitemap"""
-    sitemap_xml = sitemap.generate_sitemap(db)
-    return Response(
-        content=sitemap_xml,
+def get_sitemap(request: Request):
+    """Serve the sitemap index (links to the sharded sub-sitemaps)"""
+    response = _serve_artifact(request, artifacts.INDEX_NAME)
+    if response is not None:
+        return response
+    return StreamingResponse(
+        _stream(sitemap.generate_sitemap_index),
         media_type="application/xml",
-        headers={
-            "Cache-Control": "public, max-age=3600, s-maxage=3600"
-        }
+        headers=SITEMAP_HEADERS,
+    )
+
+
+@router.get("/sitemaps/{name}.xml")
+def get_sitemap_shard(name: str, request: Request):
+    """Serve one sub-sitemap: pages, locations, category-location, jobs-N or spas-N"""
+    if not sitemap.is_valid_shard(name):
+        raise HTTPException(status_code=404, detail="Sitemap not found")
+    response = _serve_artifact(request, name)
+    if response is not None:
+        return response
+    return StreamingResponse(
+        _stream(sitemap.generate_sitemap_shard, name),
+        media_type="application/xml",
+        headers=SITEMAP_HEADERS,
     )
 
 
@@ -34,4 +107,3 @@ def get_robots_txt():
             "Cache-Control": "public, max-age=86400"
         }
     )
-
@@ -1,14 +1,42 @@
 """
 Sitemap generation
+
+/sitemap.xml is a sitemap index pointing at sharded sub-sitemaps:
+- pages: homepage and static pages
+- locations: city, area and spa-jobs-in location pages
+- category-location: popular category + city pages
+- jobs-N / spas-N: detail pages, bucketed by id (URLS_PER_SHARD ids per shard)
+
+Every shard is produced by column-only queries (aggregates over
+job_count_rollup where possible) read with server-side cursors, and is
+streamed out url by url, so memory use does not grow with the catalogue.
 """
 
-from fastapi import Response
+import re
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+from slugify import slugify
+from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
-from app.modules.jobs.models import Job
-from app.modules.spas.models import Spa
-from app.modules.locations.models import City
+
 from app.core.config import settings
-from xml.sax.saxutils import escape
+from app.modules.jobs.models import Job, JobCategory, JobCountRollup
+from app.modules.locations.models import Area, City, State
+from app.modules.spas.models import Spa
+
+# Sitemaps may hold at most 50,000 URLs; id buckets of this size stay below it
+URLS_PER_SHARD = 45000
+YIELD_PER = 1000
+
+STATIC_SHARDS = ("pages", "locations", "category-location")
+_SHARD_NAME_RE = re.compile(r"^(jobs|spas)-(\d+)$")
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+URLSET_OPEN = '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+URLSET_CLOSE = '</urlset>\n'
 
 
 def escape_xml(text: str) -> str:
@@ -16,25 +44,96 @@ def escape_xml(text: str) -> str:
     return escape(text, {'"': '&quot;', "'": '&apos;'})
 
 
-def generate_sitemap(db: Session) -> str:
-    """Generate XML sitemap"""
-    from datetime import datetime
-    from urllib.parse import quote
-    
-    base_url = settings.SITE_URL.rstrip('/')  # Remove trailing slash
-    today = datetime.utcnow().strftime('%Y-%m-%d')
-    
-    sitemap = ['<?xml version="1.0" encoding="UTF-8"?>']
-    sitemap.append('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">')
-    
+def _base_url() -> str:
+    return settings.SITE_URL.rstrip('/')  # Remove trailing slash
+
+
+def _shard_base_url() -> str:
+    return (settings.SITEMAP_SHARD_BASE_URL or f"{_base_url()}/sitemaps").rstrip('/')
+
+
+def _today() -> str:
+    return datetime.utcnow().strftime('%Y-%m-%d')
+
+
+def _slug(slug: Optional[str], name: str) -> str:
+    """Stored location slug (slugify(name) for rows not yet backfilled)"""
+    return slug or slugify(name)
+
+
+def _url(loc: str, lastmod: str, changefreq: str, priority: str) -> str:
+    return (
+        f'  <url>\n'
+        f'    <loc>{escape_xml(loc)}</loc>\n'
+        f'    <lastmod>{lastmod}</lastmod>\n'
+        f'    <changefreq>{changefreq}</changefreq>\n'
+        f'    <priority>{priority}</priority>\n'
+        f'  </url>\n'
+    )
+
+
+def _id_buckets(db: Session, model) -> List[Tuple[int, Optional[datetime]]]:
+    """[(shard number, newest updated_at)] for id buckets that contain active rows"""
+    bucket = ((model.id - 1) // URLS_PER_SHARD + 1).label("bucket")
+    rows = db.query(bucket, func.max(model.updated_at)).filter(
+        model.is_active == True
+    ).group_by(bucket).order_by(bucket).all()
+    return [(int(number), lastmod) for number, lastmod in rows]
+
+
+def list_shards(db: Session) -> List[Tuple[str, Optional[datetime]]]:
+    """[(shard name, lastmod)] for the sitemap index (one aggregate query per table)"""
+    shards: List[Tuple[str, Optional[datetime]]] = [(name, None) for name in STATIC_SHARDS]
+    shards += [(f"spas-{number}", lastmod) for number, lastmod in _id_buckets(db, Spa)]
+    shards += [(f"jobs-{number}", lastmod) for number, lastmod in _id_buckets(db, Job)]
+    return shards
+
+
+def is_valid_shard(name: str) -> bool:
+    return name in STATIC_SHARDS or _SHARD_NAME_RE.match(name) is not None
+
+
+def generate_sitemap_index(
+    db: Session, shards: Optional[List[Tuple[str, Optional[datetime]]]] = None
+) -> Iterator[str]:
+    """Stream the sitemap index (shards defaults to list_shards(db))"""
+    shard_base = _shard_base_url()
+    today = _today()
+    yield XML_HEADER
+    yield '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    for name, lastmod in (shards if shards is not None else list_shards(db)):
+        yield (
+            f'  <sitemap>\n'
+            f'    <loc>{escape_xml(f"{shard_base}/{name}.xml")}</loc>\n'
+            f'    <lastmod>{lastmod.strftime("%Y-%m-%d") if lastmod else today}</lastmod>\n'
+            f'  </sitemap>\n'
+        )
+    yield '</sitemapindex>\n'
+
+
+def generate_sitemap_shard(db: Session, name: str) -> Iterator[str]:
+    """Stream one sub-sitemap (name must pass is_valid_shard)"""
+    yield XML_HEADER
+    yield URLSET_OPEN
+    if name == "pages":
+        yield from _page_urls()
+    elif name == "locations":
+        yield from _location_urls(db)
+    elif name == "category-location":
+        yield from _category_location_urls(db)
+    else:
+        kind, number = _SHARD_NAME_RE.match(name).groups()
+        yield from _detail_urls(db, Job if kind == "jobs" else Spa, int(number))
+    yield URLSET_CLOSE
+
+
+def _page_urls() -> Iterator[str]:
+    base_url = _base_url()
+    today = _today()
+
     # Homepage
-    sitemap.append(f'  <url>')
-    sitemap.append(f'    <loc>{escape_xml(base_url)}</loc>')
-    sitemap.append(f'    <lastmod>{today}</lastmod>')
-    sitemap.append(f'    <changefreq>daily</changefreq>')
-    sitemap.append(f'    <priority>1.0</priority>')
-    sitemap.append(f'  </url>')
-    
+    yield _url(base_url, today, 'daily', '1.0')
+
     # Main pages
     main_pages = [
         ('/jobs', 'daily', '0.9'),
@@ -45,241 +144,123 @@ def generate_sitemap(db: Session) -> str:
         ('/privacy', 'yearly', '0.5'),
     ]
     for path, changefreq, priority in main_pages:
-        url = f'{base_url}{path}'
-        sitemap.append(f'  <url>')
-        sitemap.append(f'    <loc>{escape_xml(url)}</loc>')
-        sitemap.append(f'    <lastmod>{today}</lastmod>')
-        sitemap.append(f'    <changefreq>{changefreq}</changefreq>')
-        sitemap.append(f'    <priority>{priority}</priority>')
-        sitemap.append(f'  </url>')
-    
-    # Cities
-    from slugify import slugify
-    from app.modules.locations.models import Area
-    
-    cities = db.query(City).all()
-    for city in cities:
-        city_slug = slugify(city.name)  # Generate slug from city name
-        url = f'{base_url}/cities/{quote(city_slug, safe="")}'
-        sitemap.append(f'  <url>')
-        sitemap.append(f'    <loc>{escape_xml(url)}</loc>')
-        sitemap.append(f'    <lastmod>{today}</lastmod>')
-        sitemap.append(f'    <changefreq>weekly</changefreq>')
-        sitemap.append(f'    <priority>0.8</priority>')
-        sitemap.append(f'  </url>')
-        
-        # Areas within each city (only include areas with jobs or spas)
-        areas = db.query(Area).filter(Area.city_id == city.id).all()
-        for area in areas:
-            # Only include areas that have active jobs or active spas
-            has_jobs = db.query(Job).filter(
-                Job.area_id == area.id,
-                Job.is_active == True
-            ).count() > 0
-            has_spas = db.query(Spa).filter(
-                Spa.area_id == area.id,
-                Spa.is_active == True
-            ).count() > 0
-            
-            if has_jobs or has_spas:
-                area_slug = slugify(area.name)
-                url = f'{base_url}/cities/{quote(city_slug, safe="")}/{quote(area_slug, safe="")}'
-                sitemap.append(f'  <url>')
-                sitemap.append(f'    <loc>{escape_xml(url)}</loc>')
-                sitemap.append(f'    <lastmod>{today}</lastmod>')
-                sitemap.append(f'    <changefreq>weekly</changefreq>')
-                sitemap.append(f'    <priority>0.75</priority>')
-                sitemap.append(f'  </url>')
-    
+        yield _url(f'{base_url}{path}', today, changefreq, priority)
+
+
+def _detail_urls(db: Session, model, shard: int) -> Iterator[str]:
+    """Job or SPA detail pages whose id falls in the shard's id bucket"""
+    base_url = _base_url()
+    today = _today()
     # SPAs - Fixed route from /spas/ to /besttopspas/
-    spas = db.query(Spa).filter(Spa.is_active == True).all()
-    for spa in spas:
-        lastmod = spa.updated_at.strftime('%Y-%m-%d') if spa.updated_at else today
-        url = f'{base_url}/besttopspas/{quote(spa.slug, safe="")}'
-        sitemap.append(f'  <url>')
-        sitemap.append(f'    <loc>{escape_xml(url)}</loc>')
-        sitemap.append(f'    <lastmod>{lastmod}</lastmod>')
-        sitemap.append(f'    <changefreq>weekly</changefreq>')
-        sitemap.append(f'    <priority>0.7</priority>')
-        sitemap.append(f'  </url>')
-    
-    # Jobs
-    jobs = db.query(Job).filter(Job.is_active == True).all()
-    for job in jobs:
-        lastmod = job.updated_at.strftime('%Y-%m-%d') if job.updated_at else today
-        url = f'{base_url}/jobs/{quote(job.slug, safe="")}'
-        sitemap.append(f'  <url>')
-        sitemap.append(f'    <loc>{escape_xml(url)}</loc>')
-        sitemap.append(f'    <lastmod>{lastmod}</lastmod>')
-        sitemap.append(f'    <changefreq>daily</changefreq>')
-        sitemap.append(f'    <priority>0.9</priority>')
-        sitemap.append(f'  </url>')
-    
-    # Category + Location pages (e.g., /therapist-jobs-in-mumbai)
-    from app.modules.jobs.models import JobCategory
-    from sqlalchemy import func
-    
-    # Get popular category + city combinations
-    category_city_combos = db.query(
-        JobCategory.name,
-        JobCategory.slug,
-        City.name,
-        func.count(Job.id).label('job_count')
-    ).join(
-        Job, JobCategory.id == Job.job_category_id
-    ).join(
-        City, Job.city_id == City.id
-    ).filter(
-        Job.is_active == True
-    ).group_by(
-        JobCategory.name, JobCategory.slug, City.name
-    ).having(
-        func.count(Job.id) >= 5  # Only include if 5+ jobs
-    ).limit(100).all()
-    
-    for category_name, category_slug, city_name, job_count in category_city_combos:
-        # Create slug-friendly versions
-        category_slug_clean = category_slug.replace('_', '-').lower()
-        city_slug_clean = slugify(city_name)  # Generate slug from city name
-        url = f'{base_url}/jobs/category/{quote(category_slug_clean, safe="")}/location/{quote(city_slug_clean, safe="")}'
-        sitemap.append(f'  <url>')
-        sitemap.append(f'    <loc>{escape_xml(url)}</loc>')
-        sitemap.append(f'    <lastmod>{today}</lastmod>')
-        sitemap.append(f'    <changefreq>daily</changefreq>')
-        sitemap.append(f'    <priority>0.85</priority>')
-        sitemap.append(f'  </url>')
-    
-    # Spa Jobs in Location pages - Dynamic location-based spa job pages
-    from app.modules.locations.models import Area, State
-    
-    # Get all unique location combinations that have spa jobs
+    path, changefreq, priority = ('/jobs', 'daily', '0.9') if model is Job else ('/besttopspas', 'weekly', '0.7')
+
+    first_id = (shard - 1) * URLS_PER_SHARD + 1
+    rows = db.query(model.slug, model.updated_at).filter(
+        model.is_active == True,
+        model.id >= first_id,
+        model.id < first_id + URLS_PER_SHARD,
+    ).order_by(model.id).yield_per(YIELD_PER)
+
+    for slug, updated_at in rows:
+        if not slug:
+            continue
+        lastmod = updated_at.strftime('%Y-%m-%d') if updated_at else today
+        yield _url(f'{base_url}{path}/{quote(slug, safe="")}', lastmod, changefreq, priority)
+
+
+def _location_urls(db: Session) -> Iterator[str]:
+    base_url = _base_url()
+    today = _today()
+
+    # Cities
+    for city_slug, city_name in db.query(City.slug, City.name).order_by(City.id).yield_per(YIELD_PER):
+        city_slug = _slug(city_slug, city_name)
+        yield _url(f'{base_url}/cities/{quote(city_slug, safe="")}', today, 'weekly', '0.8')
+
+    # Areas that have active jobs or active spas (one query instead of two counts per area)
+    areas_with_jobs = db.query(Job.area_id).filter(Job.is_active == True, Job.area_id.isnot(None))
+    areas_with_spas = db.query(Spa.area_id).filter(Spa.is_active == True, Spa.area_id.isnot(None))
+    areas = db.query(Area.slug, Area.name, City.slug, City.name).join(City, City.id == Area.city_id).filter(
+        or_(Area.id.in_(areas_with_jobs), Area.id.in_(areas_with_spas))
+    ).order_by(City.id, Area.id).yield_per(YIELD_PER)
+    for area_slug, area_name, city_slug, city_name in areas:
+        area_slug, city_slug = _slug(area_slug, area_name), _slug(city_slug, city_name)
+        url = f'{base_url}/cities/{quote(city_slug, safe="")}/{quote(area_slug, safe="")}'
+        yield _url(url, today, 'weekly', '0.75')
+
+    # Spa Jobs in Location pages, from the job count rollup
     # Format: /spa-jobs-in-{area}-{city}-{state} and /spa-jobs-in/{area}/{city}/{state}
-    
-    # Get area + city + state combinations with spa jobs
+    rollup_job_count = func.sum(JobCountRollup.job_count)
+
+    # area + city + state combinations with spa jobs
     area_city_state_combos = db.query(
-        Area.name.label('area_name'),
-        City.name.label('city_name'),
-        State.name.label('state_name'),
-        func.count(Job.id).label('job_count')
-    ).join(
-        Job, Job.area_id == Area.id
+        Area.slug, Area.name, City.slug, City.name, State.slug, State.name
+    ).select_from(JobCountRollup).join(
+        Area, Area.id == JobCountRollup.area_id
     ).join(
-        City, Job.city_id == City.id
+        City, City.id == JobCountRollup.city_id
     ).join(
-        State, Job.state_id == State.id
-    ).filter(
-        Job.is_active == True,
-        Job.area_id.isnot(None)  # Only include jobs with areas
+        State, State.id == JobCountRollup.state_id
     ).group_by(
-        Area.name, Area.id, City.name, City.id, State.name, State.id
-    ).having(
-        func.count(Job.id) > 0  # Only include if has jobs
-    ).all()
-    
-    for area_name, city_name, state_name, job_count in area_city_state_combos:
-        # Create slug-friendly versions
-        area_slug = slugify(area_name)
-        city_slug = slugify(city_name)
-        state_slug = slugify(state_name)
-        
-        # Format 1: /spa-jobs-in-{area}-{city}-{state}
-        location_slug_hyphen = f'{area_slug}-{city_slug}-{state_slug}'
-        url1 = f'{base_url}/spa-jobs-in-{quote(location_slug_hyphen, safe="")}'
-        sitemap.append(f'  <url>')
-        sitemap.append(f'    <loc>{escape_xml(url1)}</loc>')
-        sitemap.append(f'    <lastmod>{today}</lastmod>')
-        sitemap.append(f'    <changefreq>daily</changefreq>')
-        sitemap.append(f'    <priority>0.8</priority>')
-        sitemap.append(f'  </url>')
-        
-        # Format 2: /spa-jobs-in/{area}/{city}/{state}
-        url2 = f'{base_url}/spa-jobs-in/{quote(area_slug, safe="")}/{quote(city_slug, safe="")}/{quote(state_slug, safe="")}'
-        sitemap.append(f'  <url>')
-        sitemap.append(f'    <loc>{escape_xml(url2)}</loc>')
-        sitemap.append(f'    <lastmod>{today}</lastmod>')
-        sitemap.append(f'    <changefreq>daily</changefreq>')
-        sitemap.append(f'    <priority>0.8</priority>')
-        sitemap.append(f'  </url>')
-    
-    # Get city + state combinations with spa jobs (without area)
-    city_state_combos = db.query(
-        City.name.label('city_name'),
-        State.name.label('state_name'),
-        func.count(Job.id).label('job_count')
-    ).join(
-        Job, Job.city_id == City.id
+        Area.id, Area.slug, Area.name, City.id, City.slug, City.name, State.id, State.slug, State.name
+    ).having(rollup_job_count > 0).yield_per(YIELD_PER)
+    for row in area_city_state_combos:
+        yield from _spa_jobs_in_urls(base_url, today, _row_slugs(row))
+
+    # city + state combinations with spa jobs (jobs without areas)
+    city_state_combos = db.query(City.slug, City.name, State.slug, State.name).select_from(JobCountRollup).join(
+        City, City.id == JobCountRollup.city_id
     ).join(
-        State, Job.state_id == State.id
+        State, State.id == JobCountRollup.state_id
     ).filter(
-        Job.is_active == True,
-        Job.area_id.is_(None)  # Only include jobs without areas
+        JobCountRollup.area_id == 0
     ).group_by(
-        City.name, City.id, State.name, State.id
-    ).having(
-        func.count(Job.id) > 0  # Only include if has jobs
-    ).all()
-    
-    for city_name, state_name, job_count in city_state_combos:
-        # Create slug-friendly versions
-        city_slug = slugify(city_name)
-        state_slug = slugify(state_name)
-        
-        # Format 1: /spa-jobs-in-{city}-{state}
-        location_slug_hyphen = f'{city_slug}-{state_slug}'
-        url1 = f'{base_url}/spa-jobs-in-{quote(location_slug_hyphen, safe="")}'
-        sitemap.append(f'  <url>')
-        sitemap.append(f'    <loc>{escape_xml(url1)}</loc>')
-        sitemap.append(f'    <lastmod>{today}</lastmod>')
-        sitemap.append(f'    <changefreq>daily</changefreq>')
-        sitemap.append(f'    <priority>0.8</priority>')
-        sitemap.append(f'  </url>')
-        
-        # Format 2: /spa-jobs-in/{city}/{state}
-        url2 = f'{base_url}/spa-jobs-in/{quote(city_slug, safe="")}/{quote(state_slug, safe="")}'
-        sitemap.append(f'  <url>')
-        sitemap.append(f'    <loc>{escape_xml(url2)}</loc>')
-        sitemap.append(f'    <lastmod>{today}</lastmod>')
-        sitemap.append(f'    <changefreq>daily</changefreq>')
-        sitemap.append(f'    <priority>0.8</priority>')
-        sitemap.append(f'  </url>')
-    
-    # Get city-only combinations with spa jobs
-    city_only_combos = db.query(
-        City.name.label('city_name'),
-        func.count(Job.id).label('job_count')
+        City.id, City.slug, City.name, State.id, State.slug, State.name
+    ).having(rollup_job_count > 0).yield_per(YIELD_PER)
+    for row in city_state_combos:
+        yield from _spa_jobs_in_urls(base_url, today, _row_slugs(row))
+
+    # city-only combinations with spa jobs
+    city_only_combos = db.query(City.slug, City.name).select_from(JobCountRollup).join(
+        City, City.id == JobCountRollup.city_id
+    ).group_by(City.id, City.slug, City.name).having(rollup_job_count > 0).yield_per(YIELD_PER)
+    for row in city_only_combos:
+        yield from _spa_jobs_in_urls(base_url, today, _row_slugs(row))
+
+
+def _row_slugs(row) -> List[str]:
+    """(slug, name, slug, name, ...) row -> [slug, slug, ...]"""
+    return [_slug(row[i], row[i + 1]) for i in range(0, len(row), 2)]
+
+
+def _spa_jobs_in_urls(base_url: str, today: str, slugs: List[str]) -> Iterator[str]:
+    # Format 1: /spa-jobs-in-{area}-{city}-{state}
+    yield _url(f'{base_url}/spa-jobs-in-{quote("-".join(slugs), safe="")}', today, 'daily', '0.8')
+    # Format 2: /spa-jobs-in/{area}/{city}/{state}
+    path = "/".join(quote(slug, safe="") for slug in slugs)
+    yield _url(f'{base_url}/spa-jobs-in/{path}', today, 'daily', '0.8')
+
+
+def _category_location_urls(db: Session) -> Iterator[str]:
+    """Category + Location pages (e.g., /therapist-jobs-in-mumbai)"""
+    base_url = _base_url()
+    today = _today()
+
+    # Popular category + city combinations (from the job count rollup)
+    rollup_job_count = func.sum(JobCountRollup.job_count)
+    category_city_combos = db.query(JobCategory.slug, City.slug, City.name).select_from(JobCountRollup).join(
+        JobCategory, JobCategory.id == JobCountRollup.job_category_id
     ).join(
-        Job, Job.city_id == City.id
-    ).filter(
-        Job.is_active == True
+        City, City.id == JobCountRollup.city_id
     ).group_by(
-        City.name, City.id
+        JobCategory.name, JobCategory.slug, City.slug, City.name
     ).having(
-        func.count(Job.id) > 0  # Only include if has jobs
-    ).all()
-    
-    for city_name, job_count in city_only_combos:
-        # Create slug-friendly version
-        city_slug = slugify(city_name)
-        
-        # Format 1: /spa-jobs-in-{city}
-        url1 = f'{base_url}/spa-jobs-in-{quote(city_slug, safe="")}'
-        sitemap.append(f'  <url>')
-        sitemap.append(f'    <loc>{escape_xml(url1)}</loc>')
-        sitemap.append(f'    <lastmod>{today}</lastmod>')
-        sitemap.append(f'    <changefreq>daily</changefreq>')
-        sitemap.append(f'    <priority>0.8</priority>')
-        sitemap.append(f'  </url>')
-        
-        # Format 2: /spa-jobs-in/{city}
-        url2 = f'{base_url}/spa-jobs-in/{quote(city_slug, safe="")}'
-        sitemap.append(f'  <url>')
-        sitemap.append(f'    <loc>{escape_xml(url2)}</loc>')
-        sitemap.append(f'    <lastmod>{today}</lastmod>')
-        sitemap.append(f'    <changefreq>daily</changefreq>')
-        sitemap.append(f'    <priority>0.8</priority>')
-        sitemap.append(f'  </url>')
-    
-    sitemap.append('</urlset>')
-    
-    return '\n'.join(sitemap)
+        rollup_job_count >= 5  # Only include if 5+ jobs
+    ).limit(100).all()
 
+    for category_slug, city_slug, city_name in category_city_combos:
+        # Create slug-friendly versions
+        category_slug_clean = category_slug.replace('_', '-').lower()
+        city_slug_clean = _slug(city_slug, city_name)
+        url = f'{base_url}/jobs/category/{quote(category_slug_clean, safe="")}/location/{quote(city_slug_clean, safe="")}'
+        yield _url(url, today, 'daily', '0.85')
@@ -2,11 +2,11 @@
 SPA models
 """
 
-from sqlalchemy import Column, Integer, String, Text, Float, Boolean, ForeignKey, JSON, DateTime, event, select
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, ForeignKey, JSON, DateTime, event
 from sqlalchemy.orm import relationship
-from slugify import slugify
 from datetime import datetime
 from app.core.database import Base
+from app.utils.slug_allocator import allocate_slug, allocate_slugs, slug_bases_for
 
 
 class Spa(Base):
@@ -52,6 +52,16 @@ class Spa(Base):
     area = relationship("Area", back_populates="spas")
 
 
+def assign_spa_slugs(connection, targets) -> None:
+    """Allocate slugs for many new Spa objects at once (used by bulk imports)"""
+    targets = [target for target in targets if not target.slug and target.name]
+    if not targets:
+        return
+    bases = slug_bases_for(connection, targets, "name", [target.address for target in targets])
+    for target, slug in zip(targets, allocate_slugs(connection, Spa, bases)):
+        target.slug = slug
+
+
 @event.listens_for(Spa, "before_insert")
 def spa_generate_slug_before_insert(mapper, connection, target: Spa) -> None:
     """
@@ -60,63 +70,8 @@ def spa_generate_slug_before_insert(mapper, connection, target: Spa) -> None:
     Format: name.state-city-area-address
     """
     if not target.slug and target.name:
-        from app.modules.locations.models import State, City, Area
-        
-        parts = [target.name]
-        
-        # Add location parts if available
-        location_parts = []
-        
-        # Get state name
-        if target.state_id:
-            try:
-                result = connection.execute(select(State.name).where(State.id == target.state_id)).scalar_one_or_none()
-                if result:
-                    location_parts.append(result)
-            except Exception:
-                pass  # Skip if state not found
-        
-        # Get city name
-        if target.city_id:
-            try:
-                result = connection.execute(select(City.name).where(City.id == target.city_id)).scalar_one_or_none()
-                if result:
-                    location_parts.append(result)
-            except Exception:
-                pass  # Skip if city not found
-        
-        # Get area name
-        if target.area_id:
-            try:
-                result = connection.execute(select(Area.name).where(Area.id == target.area_id)).scalar_one_or_none()
-                if result:
-                    location_parts.append(result)
-            except Exception:
-                pass  # Skip if area not found
-        
-        # Add address parts
-        if target.address:
-            # Take first few words from address for slug
-            address_words = target.address.split()[:3]  # First 3 words
-            location_parts.append(' '.join(address_words))
-        
-        # Join location parts with hyphens
-        if location_parts:
-            location_str = '-'.join(location_parts)
-            parts.append(location_str)
-        
-        base_slug = slugify('.'.join(parts))
-        slug = base_slug
-        index = 2
-
-        # Ensure uniqueness by appending "-2", "-3", ... if needed
-        while connection.execute(
-            select(Spa.id).where(Spa.slug == slug)
-        ).scalar() is not None:
-            slug = f"{base_slug}-{index}"
-            index += 1
-
-        target.slug = slug
+        base = slug_bases_for(connection, [target], "name", [target.address])[0]
+        target.slug = allocate_slug(connection, Spa, base)
 
 
 @event.listens_for(Spa, "before_update")
@@ -127,60 +82,5 @@ def spa_generate_slug_before_update(mapper, connection, target: Spa) -> None:
     Format: name.state-city-area-address
     """
     if not target.slug and target.name:
-        from app.modules.locations.models import State, City, Area
-        
-        parts = [target.name]
-        
-        # Add location parts if available
-        location_parts = []
-        
-        # Get state name
-        if target.state_id:
-            try:
-                result = connection.execute(select(State.name).where(State.id == target.state_id)).scalar_one_or_none()
-                if result:
-                    location_parts.append(result)
-            except Exception:
-                pass  # Skip if state not found
-        
-        # Get city name
-        if target.city_id:
-            try:
-                result = connection.execute(select(City.name).where(City.id == target.city_id)).scalar_one_or_none()
-                if result:
-                    location_parts.append(result)
-            except Exception:
-                pass  # Skip if city not found
-        
-        # Get area name
-        if target.area_id:
-            try:
-                result = connection.execute(select(Area.name).where(Area.id == target.area_id)).scalar_one_or_none()
-                if result:
-                    location_parts.append(result)
-            except Exception:
-                pass  # Skip if area not found
-        
-        # Add address parts
-        if target.address:
-            # Take first few words from address for slug
-            address_words = target.address.split()[:3]  # First 3 words
-            location_parts.append(' '.join(address_words))
-        
-        # Join location parts with hyphens
-        if location_parts:
-            location_str = '-'.join(location_parts)
-            parts.append(location_str)
-        
-        base_slug = slugify('.'.join(parts))
-        slug = base_slug
-        index = 2
-
-        # Ensure uniqueness on update as well
-        while connection.execute(
-            select(Spa.id).where(Spa.slug == slug, Spa.id != target.id)
-        ).scalar() is not None:
-            slug = f"{base_slug}-{index}"
-            index += 1
-
-        target.slug = slug
+        base = slug_bases_for(connection, [target], "name", [target.address])[0]
+        target.slug = allocate_slug(connection, Spa, base, exclude_id=target.id)
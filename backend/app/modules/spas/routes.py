@@ -107,7 +107,7 @@ def track_spa_booking_click(
     if not spa:
         raise HTTPException(status_code=404, detail="SPA not found")
 
-    updated_spa = services.increment_spa_booking_click(db, spa_id)
+    booking_click_count = services.increment_spa_booking_click(db, spa_id)
 
     # Log analytics event (best-effort)
     try:
@@ -127,7 +127,7 @@ def track_spa_booking_click(
         # Analytics should not affect main behaviour
         pass
 
-    return {"status": "tracked", "booking_click_count": updated_spa.booking_click_count if updated_spa else 0}
+    return {"status": "tracked", "booking_click_count": booking_click_count or 0}
 
 
 @router.post("/", response_model=schemas.SpaResponse, status_code=201)
@@ -4,9 +4,10 @@ SPA business logic
 
 from sqlalchemy.orm import Session
 from app.modules.spas import models, schemas
+from app.modules.spas.spatial_index import spa_index
+from app.utils.slug_allocator import add_with_slug_retry
 from app.core.config import settings
-from app.utils.geo_utils import calculate_distance
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 
 def get_spa_by_slug(db: Session, slug: str):
@@ -61,8 +62,7 @@ def create_spa(db: Session, spa_data: schemas.SpaCreate, user_id: int, is_recrui
         updated_by=user_id
     )
     
-    db.add(db_spa)
-    db.flush()  # Flush to get the spa.id
+    add_with_slug_retry(db, db_spa)  # Flush to get the spa.id
     
     # If recruiter, set this as their managed_spa
     if is_recruiter:
@@ -75,6 +75,7 @@ def create_spa(db: Session, spa_data: schemas.SpaCreate, user_id: int, is_recrui
     
     db.commit()
     db.refresh(db_spa)
+    spa_index.sync_spa(db_spa)
     return db_spa
 
 
@@ -94,7 +95,16 @@ def update_spa(db: Session, spa_id: int, spa_data: schemas.SpaUpdate, user_id: i
     
     spa.updated_by = user_id
     db.commit()
+    # Jobs embed the spa name, logo and address in their JSON-LD
+    if update_data.keys() & {"name", "logo_image", "address"}:
+        from app.modules.jobs.models import Job
+        from app.modules.jobs.seo import regenerate_job_schemas
+        regenerate_job_schemas(db, Job.spa_id == spa_id)
     db.refresh(spa)
+    spa_index.sync_spa(spa)
+
+    from app.modules.jobs.page import invalidate_spa_part
+    invalidate_spa_part(spa_id)
     return spa
 
 
@@ -135,27 +145,41 @@ def delete_spa(db: Session, spa_id: int, permanent: bool = False):
         spa.is_active = False
     
     db.commit()
+    spa_index.remove(spa_id)
     return True
 
 
-def get_spas_near_location(db: Session, latitude: float, longitude: float, radius_km: float = 10):
-    """Get SPAs near a location"""
-    # Get all active SPAs with coordinates
+def _hydrate_spas(db: Session, hits: List[Tuple[int, float]]) -> List[models.Spa]:
+    """Load SPAs for index hits, keeping the index's distance order"""
+    if not hits:
+        return []
     spas = db.query(models.Spa).filter(
+        models.Spa.id.in_([spa_id for spa_id, _ in hits]),
         models.Spa.is_active == True,
-        models.Spa.latitude.isnot(None),
-        models.Spa.longitude.isnot(None)
     ).all()
-    
-    # Filter by distance using Python calculation
-    nearby_spas = []
-    for spa in spas:
-        if spa.latitude and spa.longitude:
-            distance = calculate_distance(latitude, longitude, spa.latitude, spa.longitude)
-            if distance <= radius_km:
-                nearby_spas.append(spa)
-    
-    return nearby_spas
+    spas_by_id = {spa.id: spa for spa in spas}
+    return [spas_by_id[spa_id] for spa_id, _ in hits if spa_id in spas_by_id]
+
+
+def get_spas_near_location(
+    db: Session,
+    latitude: float,
+    longitude: float,
+    radius_km: float = 10,
+    limit: Optional[int] = None,
+):
+    """Get SPAs within radius_km of a location, nearest first"""
+    spa_index.ensure_built(db)
+    hits = spa_index.query_radius(latitude, longitude, radius_km)
+    if limit is not None:
+        hits = hits[:limit]
+    return _hydrate_spas(db, hits)
+
+
+def get_nearest_spas(db: Session, latitude: float, longitude: float, k: int = 5):
+    """Get the k SPAs nearest to a location, regardless of distance"""
+    spa_index.ensure_built(db)
+    return _hydrate_spas(db, spa_index.query_nearest(latitude, longitude, k))
 
 
 def get_recruiter_spa(db: Session, user_id: int):
@@ -167,12 +191,15 @@ def get_recruiter_spa(db: Session, user_id: int):
     return get_spa_by_id(db, user.managed_spa_id)
 
 
-def increment_spa_booking_click(db: Session, spa_id: int) -> models.Spa | None:
-    """Increase booking_click_count when a booking URL is clicked."""
-    spa = get_spa_by_id(db, spa_id)
-    if not spa:
+def increment_spa_booking_click(db: Session, spa_id: int) -> int | None:
+    """
+    Increase booking_click_count when a booking URL is clicked.
+    The increment is buffered; returns the near-real-time count (None if SPA not found).
+    """
+    from app.core import counters
+
+    stored = db.query(models.Spa.booking_click_count).filter(models.Spa.id == spa_id).first()
+    if stored is None:
         return None
-    spa.booking_click_count = (spa.booking_click_count or 0) + 1
-    db.commit()
-    db.refresh(spa)
-    return spa
+    counters.increment("spas", "booking_click_count", spa_id)
+    return counters.get_counter_value("spas", "booking_click_count", spa_id, stored[0])
@@ -0,0 +1,112 @@
+"""
+In-memory spatial index of active SPA coordinates (one per worker process)
+
+SPA ids and coordinates are kept in NumPy arrays sorted by latitude, so a
+radius query is a binary search for the latitude band followed by a
+vectorized haversine over that band. Only matching ids are loaded from the DB.
+"""
+
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.modules.spas import models
+from app.utils.geo_utils import distances_from, k_nearest
+
+KM_PER_DEGREE_LAT = 111.045
+
+# Full rebuild interval; picks up writes made by other worker processes
+REBUILD_INTERVAL_SECONDS = 300
+
+
+class SpaSpatialIndex:
+    """Latitude-sorted arrays of (id, lat, lng) with copy-on-write updates"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = np.empty(0, dtype=np.int64)
+        self._lats = np.empty(0, dtype=np.float64)
+        self._lngs = np.empty(0, dtype=np.float64)
+        self._built_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _snapshot(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # Arrays are replaced, never mutated, so a tuple read is a consistent snapshot
+        return self._ids, self._lats, self._lngs
+
+    def _swap(self, ids: np.ndarray, lats: np.ndarray, lngs: np.ndarray) -> None:
+        order = np.argsort(lats, kind="stable")
+        self._ids, self._lats, self._lngs = ids[order], lats[order], lngs[order]
+
+    def rebuild(self, db: Session) -> None:
+        """Load all active SPAs with coordinates (column-only query)"""
+        rows = db.query(models.Spa.id, models.Spa.latitude, models.Spa.longitude).filter(
+            models.Spa.is_active == True,
+            models.Spa.latitude.isnot(None),
+            models.Spa.longitude.isnot(None),
+        ).all()
+        ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        lats = np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows))
+        lngs = np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows))
+        with self._lock:
+            self._swap(ids, lats, lngs)
+            self._built_at = time.monotonic()
+
+    def ensure_built(self, db: Session) -> None:
+        """Build on first use and periodically afterwards"""
+        if self._built_at is None or time.monotonic() - self._built_at > REBUILD_INTERVAL_SECONDS:
+            self.rebuild(db)
+
+    def remove(self, spa_id: int) -> None:
+        with self._lock:
+            ids, lats, lngs = self._snapshot()
+            keep = ids != spa_id
+            if not keep.all():
+                self._ids, self._lats, self._lngs = ids[keep], lats[keep], lngs[keep]
+
+    def upsert(self, spa_id: int, latitude: float, longitude: float) -> None:
+        with self._lock:
+            ids, lats, lngs = self._snapshot()
+            keep = ids != spa_id
+            self._swap(
+                np.append(ids[keep], spa_id),
+                np.append(lats[keep], latitude),
+                np.append(lngs[keep], longitude),
+            )
+
+    def sync_spa(self, spa: models.Spa) -> None:
+        """Apply a created/updated SPA: index it if active with coordinates, else drop it"""
+        if self._built_at is None:
+            return  # Not built yet; the first query loads current data
+        if spa.is_active and spa.latitude is not None and spa.longitude is not None:
+            self.upsert(spa.id, spa.latitude, spa.longitude)
+        else:
+            self.remove(spa.id)
+
+    def query_radius(self, latitude: float, longitude: float, radius_km: float) -> List[Tuple[int, float]]:
+        """Return [(spa_id, distance_km)] within radius, nearest first"""
+        ids, lats, lngs = self._snapshot()
+        lat_delta = radius_km / KM_PER_DEGREE_LAT
+        start = np.searchsorted(lats, latitude - lat_delta, side="left")
+        end = np.searchsorted(lats, latitude + lat_delta, side="right")
+        if start >= end:
+            return []
+
+        distances = distances_from(latitude, longitude, lats[start:end], lngs[start:end])
+        hits = np.nonzero(distances <= radius_km)[0]
+        hits = hits[np.argsort(distances[hits], kind="stable")]
+        return [(int(ids[start + i]), float(distances[i])) for i in hits]
+
+    def query_nearest(self, latitude: float, longitude: float, k: int) -> List[Tuple[int, float]]:
+        """Return the k nearest [(spa_id, distance_km)], nearest first"""
+        ids, lats, lngs = self._snapshot()
+        nearest, distances = k_nearest(latitude, longitude, lats, lngs, k)
+        return [(int(ids[i]), float(d)) for i, d in zip(nearest, distances)]
+
+
+spa_index = SpaSpatialIndex()
@@ -2,7 +2,13 @@
 Geographic utility functions
 """
 
+import heapq
 import math
+from typing import List, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371  # Earth's radius in kilometers
 
 
 def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
@@ -10,7 +16,7 @@ def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     Calculate distance between two points using Haversine formula
     Returns distance in kilometers
     """
-    R = 6371  # Earth's radius in kilometers
+    R = EARTH_RADIUS_KM
     
     dlat = math.radians(lat2 - lat1)
     dlon = math.radians(lon2 - lon1)
@@ -36,3 +42,155 @@ def is_within_radius(
     distance = calculate_distance(lat1, lon1, lat2, lon2)
     return distance <= radius_km
 
+
+
+# -------------------------------------------------
+# Vectorized (NumPy) variants for many points at once
+# -------------------------------------------------
+
+def distances_from(lat: float, lng: float, lats, lngs) -> np.ndarray:
+    """
+    Haversine distances (km) from one point to arrays of points.
+    Same formula as calculate_distance, evaluated element-wise.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lngs = np.asarray(lngs, dtype=np.float64)
+    
+    dlat = np.radians(lats - lat)
+    dlon = np.radians(lngs - lng)
+    
+    a = (
+        np.sin(dlat / 2) ** 2 +
+        math.cos(math.radians(lat)) * np.cos(np.radians(lats)) *
+        np.sin(dlon / 2) ** 2
+    )
+    
+    # Clamp guards against a > 1 from floating point error
+    c = 2 * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+    return EARTH_RADIUS_KM * c
+
+
+def within_radius_mask(lat: float, lng: float, lats, lngs, radius_km: float) -> np.ndarray:
+    """Boolean mask of points within radius_km of (lat, lng)"""
+    return distances_from(lat, lng, lats, lngs) <= radius_km
+
+
+def k_nearest(lat: float, lng: float, lats, lngs, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Indices and distances (km) of the k points nearest to (lat, lng),
+    nearest first.
+    """
+    distances = distances_from(lat, lng, lats, lngs)
+    k = min(k, len(distances))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    
+    nearest = np.argpartition(distances, k - 1)[:k]
+    nearest = nearest[np.argsort(distances[nearest], kind="stable")]
+    return nearest, distances[nearest]
+
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def encode_geohash(lat: float, lng: float, precision: int = 7) -> str:
+    """
+    Geohash of (lat, lng) with `precision` characters.
+    Cell size: 6 -> ~1.2 x 0.6 km, 7 -> ~150 x 150 m, 8 -> ~40 x 20 m
+    """
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits, bit_count, even = 0, 0, True
+    while len(chars) < precision:
+        value, interval = (lng, lng_range) if even else (lat, lat_range)
+        mid = (interval[0] + interval[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            interval[0] = mid
+        else:
+            bits <<= 1
+            interval[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+# -------------------------------------------------
+# Nearest-neighbour index
+# -------------------------------------------------
+
+def unit_vectors(lats, lngs) -> np.ndarray:
+    """(n, 3) points on the unit sphere; straight-line nearest there is great-circle nearest"""
+    lat = np.radians(np.asarray(lats, dtype=np.float64))
+    lng = np.radians(np.asarray(lngs, dtype=np.float64))
+    return np.column_stack((np.cos(lat) * np.cos(lng), np.cos(lat) * np.sin(lng), np.sin(lat)))
+
+
+def chord_to_km(chord: float) -> float:
+    """Great-circle distance (km) for a straight-line distance between unit vectors"""
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+class KDTree:
+    """
+    Static 3-d tree over (lat, lng) points, stored implicitly: the node of a
+    range [lo, hi) is its median position, splitting on the axis of widest
+    spread. Built once with NumPy; queries are a few dozen float comparisons.
+    """
+
+    def __init__(self, lats, lngs):
+        points = unit_vectors(lats, lngs)
+        order = np.arange(len(points))
+        axes = np.zeros(len(points), dtype=np.int64)
+        stack = [(0, len(points))]
+        while stack:
+            lo, hi = stack.pop()
+            if hi - lo <= 0:
+                continue
+            segment = order[lo:hi]
+            spread = points[segment].max(axis=0) - points[segment].min(axis=0)
+            axis = int(np.argmax(spread))
+            mid = (hi - lo) // 2
+            order[lo:hi] = segment[np.argpartition(points[segment, axis], mid)]
+            axes[lo + mid] = axis
+            stack.append((lo, lo + mid))
+            stack.append((lo + mid + 1, hi))
+        # Plain Python values: element access on NumPy arrays is slow per call
+        self._index: List[int] = order.tolist()
+        self._points: List[Tuple[float, float, float]] = [tuple(point) for point in points[order].tolist()]
+        self._axes: List[int] = axes.tolist()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def query(self, lat: float, lng: float, k: int = 1) -> List[Tuple[int, float]]:
+        """[(position in the input arrays, distance_km)] of the k nearest points, nearest first"""
+        qlat, qlng = math.radians(lat), math.radians(lng)
+        target = (math.cos(qlat) * math.cos(qlng), math.cos(qlat) * math.sin(qlng), math.sin(qlat))
+        best: List[Tuple[float, int]] = []  # max-heap of (-squared chord, position)
+
+        def search(lo: int, hi: int) -> None:
+            if lo >= hi:
+                return
+            mid = (lo + hi) // 2
+            point = self._points[mid]
+            squared = (
+                (point[0] - target[0]) ** 2 + (point[1] - target[1]) ** 2 + (point[2] - target[2]) ** 2
+            )
+            if len(best) < k:
+                heapq.heappush(best, (-squared, self._index[mid]))
+            elif squared < -best[0][0]:
+                heapq.heapreplace(best, (-squared, self._index[mid]))
+
+            axis = self._axes[mid]
+            diff = target[axis] - point[axis]
+            near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+            search(*near)
+            if len(best) < k or diff * diff < -best[0][0]:
+                search(*far)
+
+        search(0, len(self._points))
+        return [(index, chord_to_km(math.sqrt(-squared))) for squared, index in sorted(best, reverse=True)]
@@ -1,48 +1,176 @@
 """
-IP-based location detection (optional - uses geoip2 if available)
+IP-based location detection (optional - uses maxminddb if available)
+
+Lookups read a GeoLite2-City format database (GEOIP_DATABASE_PATH) that is
+memory-mapped once per worker, so the OS page cache is shared between
+workers and nothing is parsed up front. Two caches sit in front of it:
+- a CIDR-range cache: local development addresses, plus every network a lookup
+  has matched (the database returns the prefix length of the matching
+  network, so one lookup answers the whole range)
+- an LRU of recent addresses (GEOIP_CACHE_SIZE)
 """
-from typing import Optional, Dict
+import ipaddress
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
 
-# Try to import geoip2 (optional dependency)
+# Try to import maxminddb (optional dependency)
 try:
-    import geoip2.database
-    import geoip2.errors
-    GEOIP2_AVAILABLE = True
+    import maxminddb
+    MAXMINDDB_AVAILABLE = True
 except ImportError:
-    GEOIP2_AVAILABLE = False
+    MAXMINDDB_AVAILABLE = False
+
+# Default India location for local development (localhost and LAN addresses)
+DEV_LOCATION = {
+    'city': 'Mumbai',
+    'state': 'Maharashtra',
+    'country': 'India',
+    'latitude': 19.0760,
+    'longitude': 72.8777,
+}
+
+# Addresses answered with DEV_LOCATION (other private ranges get no location)
+PRIVATE_RANGES = ("127.0.0.1/32", "::1/128", "192.168.0.0/16", "10.0.0.0/8")
+
+# Networks learned from the database hold at most this many entries
+MAX_CACHED_RANGES = 50000
+
+_reader = None
+_reader_loaded = False
+_lock = threading.Lock()
+
+# ip version -> prefix length -> network address (int) -> location (None: known to have no data)
+_ranges: Dict[int, Dict[int, Dict[int, Optional[Dict[str, Any]]]]] = {4: {}, 6: {}}
+_range_count = 0
+_lru: "OrderedDict[str, Optional[Dict[str, Any]]]" = OrderedDict()
+
+
+def _add_range(network: ipaddress._BaseNetwork, location: Optional[Dict[str, Any]]) -> None:
+    global _range_count
+    by_prefix = _ranges[network.version].setdefault(network.prefixlen, {})
+    if int(network.network_address) not in by_prefix:
+        _range_count += 1
+    by_prefix[int(network.network_address)] = location
+
+
+def _reset_ranges() -> None:
+    global _range_count
+    _ranges[4].clear()
+    _ranges[6].clear()
+    _range_count = 0
+    for cidr in PRIVATE_RANGES:
+        _add_range(ipaddress.ip_network(cidr), DEV_LOCATION)
+
+
+_reset_ranges()
+
+
+def _find_range(ip: ipaddress._BaseAddress) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """(found, location) from the CIDR-range cache"""
+    bits = ip.max_prefixlen
+    value = int(ip)
+    # Longest prefix first; copied because other threads may add prefix lengths
+    for prefixlen, networks in sorted(_ranges[ip.version].items(), reverse=True):
+        key = value >> (bits - prefixlen) << (bits - prefixlen)
+        if key in networks:
+            return True, networks[key]
+    return False, None
+
+
+def _get_reader():
+    """Open the database once per worker (memory-mapped); None if not configured"""
+    global _reader, _reader_loaded
+    if _reader_loaded:
+        return _reader
+    with _lock:
+        if not _reader_loaded:
+            if MAXMINDDB_AVAILABLE and settings.GEOIP_DATABASE_PATH:
+                try:
+                    _reader = maxminddb.open_database(settings.GEOIP_DATABASE_PATH, maxminddb.MODE_MMAP)
+                except Exception as e:
+                    print(f"Could not open GeoIP database {settings.GEOIP_DATABASE_PATH}: {e}")
+            _reader_loaded = True
+    return _reader
+
+
+def _name(record: Optional[Dict[str, Any]]) -> Optional[str]:
+    return (record or {}).get('names', {}).get('en')
+
+
+def _location(record: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """GeoLite2-City record -> our location dict (None without coordinates)"""
+    if not record:
+        return None
+    location = record.get('location') or {}
+    if location.get('latitude') is None or location.get('longitude') is None:
+        return None
+    subdivisions = record.get('subdivisions') or [None]
+    return {
+        'city': _name(record.get('city')),
+        'state': _name(subdivisions[0]),
+        'country': _name(record.get('country')),
+        'latitude': location['latitude'],
+        'longitude': location['longitude'],
+    }
+
+
+def _lookup(ip: ipaddress._BaseAddress) -> Optional[Dict[str, Any]]:
+    found, location = _find_range(ip)
+    if found:
+        return location
+
+    reader = _get_reader()
+    if reader is None:
+        return None
+    try:
+        record, prefixlen = reader.get_with_prefix_len(str(ip))
+    except ValueError:
+        return None  # e.g. an IPv6 address against an IPv4-only database
+    location = _location(record)
+
+    # IPv4 addresses in an IPv6 database sit under ::/96; readers report the prefix either way
+    if ip.version == 4 and prefixlen > 32:
+        prefixlen -= 96
+    if 0 < prefixlen <= ip.max_prefixlen:
+        with _lock:
+            if _range_count >= MAX_CACHED_RANGES:
+                _reset_ranges()
+            _add_range(ipaddress.ip_network(f"{ip}/{prefixlen}", strict=False), location)
+    return location
+
 
 def get_location_from_ip(ip_address: str) -> Optional[Dict[str, str]]:
     """
     Get location information from IP address
-    
+
     Args:
         ip_address: Client IP address
-        
+
     Returns:
         Dict with city, state, country, latitude, longitude or None
     """
+    if ip_address == 'localhost':
+        return dict(DEV_LOCATION)
+
+    with _lock:
+        if ip_address in _lru:
+            _lru.move_to_end(ip_address)
+            location = _lru[ip_address]
+            return dict(location) if location else None
+
     try:
-        # Handle localhost and private IPs
-        if ip_address in ['127.0.0.1', 'localhost', '::1'] or ip_address.startswith('192.168.') or ip_address.startswith('10.'):
-            # Return default India location for local development
-            return {
-                'city': 'Mumbai',
-                'state': 'Maharashtra',
-                'country': 'India',
-                'latitude': 19.0760,
-                'longitude': 72.8777,
-            }
-        
-        # If geoip2 is not available, return None
-        if not GEOIP2_AVAILABLE:
-            return None
-        
-        # Note: geoip2 requires a database file (GeoLite2-City.mmdb)
-        # For now, return None if not configured
-        # To enable: pip install geoip2 and download GeoLite2 database
-        return None
-        
+        location = _lookup(ipaddress.ip_address(ip_address))
+    except ValueError:
+        return None  # Not an IP address (e.g. "unknown")
     except Exception as e:
         print(f"Error getting location from IP {ip_address}: {e}")
-    
-    return None
+        return None
+
+    with _lock:
+        _lru[ip_address] = location
+        while len(_lru) > settings.GEOIP_CACHE_SIZE:
+            _lru.popitem(last=False)
+    return dict(location) if location else None
@@ -0,0 +1,174 @@
+"""
+Slug allocation for Job and Spa inserts
+
+- Location names (state/city/area) come from a per-process cache instead of
+  one SELECT per name per insert
+- The next free "-N" suffix is found with one indexed prefix query
+  (slug LIKE 'base%', backed by a text_pattern_ops index)
+- Many slugs can be allocated at once for bulk imports
+"""
+
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from slugify import slugify
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
+
+# Location names rarely change; entries are refreshed after this many seconds
+LOCATION_NAME_TTL_SECONDS = 600
+
+# (table, id) -> (name, fetched_at)
+_location_names: Dict[Tuple[str, int], Tuple[Optional[str], float]] = {}
+
+
+def invalidate_location_names() -> None:
+    """Drop cached location names (call after a state/city/area write)"""
+    _location_names.clear()
+
+
+def _location_models():
+    from app.modules.locations.models import State, City, Area
+    return {"states": State, "cities": City, "areas": Area}
+
+
+def get_location_names(connection, ids_by_table: Dict[str, Iterable[int]]) -> Dict[Tuple[str, int], Optional[str]]:
+    """
+    Resolve names for {"states": ids, "cities": ids, "areas": ids},
+    querying only ids that are missing or stale in the cache (one query per table).
+    """
+    now = time.monotonic()
+    result = {}
+    for table_name, ids in ids_by_table.items():
+        missing = set()
+        for location_id in ids:
+            if not location_id:
+                continue
+            cached = _location_names.get((table_name, location_id))
+            if cached and now - cached[1] < LOCATION_NAME_TTL_SECONDS:
+                result[(table_name, location_id)] = cached[0]
+            else:
+                missing.add(location_id)
+
+        if missing:
+            model = _location_models()[table_name]
+            rows = connection.execute(select(model.id, model.name).where(model.id.in_(missing))).all()
+            found = {row_id: name for row_id, name in rows}
+            for location_id in missing:
+                name = found.get(location_id)
+                _location_names[(table_name, location_id)] = (name, now)
+                result[(table_name, location_id)] = name
+    return result
+
+
+def build_slug_base(
+    name: str,
+    state_name: Optional[str] = None,
+    city_name: Optional[str] = None,
+    area_name: Optional[str] = None,
+    address: Optional[str] = None,
+) -> str:
+    """Slug base in the format name.state-city-area-address"""
+    parts = [name]
+
+    location_parts = [part for part in (state_name, city_name, area_name) if part]
+    if address:
+        address_words = address.split()[:3]  # First 3 words
+        location_parts.append(' '.join(address_words))
+
+    if location_parts:
+        parts.append('-'.join(location_parts))
+
+    return slugify('.'.join(parts))
+
+
+def slug_bases_for(connection, targets: Sequence, name_attr: str, addresses: Sequence[Optional[str]]) -> List[str]:
+    """Build slug bases for many Job/Spa targets with one cached location lookup"""
+    names = get_location_names(connection, {
+        "states": [t.state_id for t in targets],
+        "cities": [t.city_id for t in targets],
+        "areas": [t.area_id for t in targets],
+    })
+    return [
+        build_slug_base(
+            getattr(target, name_attr),
+            names.get(("states", target.state_id)),
+            names.get(("cities", target.city_id)),
+            names.get(("areas", target.area_id)),
+            address,
+        )
+        for target, address in zip(targets, addresses)
+    ]
+
+
+def _escape_like(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def allocate_slugs(connection, model, bases: Sequence[str], exclude_id: Optional[int] = None) -> List[str]:
+    """
+    Allocate unique slugs for the given bases, in order.
+
+    One prefix query fetches every existing slug that could collide with
+    any base; suffixes are then assigned in memory ("base", "base-2", ...),
+    also avoiding collisions within the batch itself.
+    """
+    if not bases:
+        return []
+
+    distinct_bases = sorted(set(bases))
+    query = select(model.slug).where(
+        or_(*[model.slug.like(f"{_escape_like(base)}%", escape='\\') for base in distinct_bases])
+    )
+    if exclude_id is not None:
+        query = query.where(model.id != exclude_id)
+    existing = {row[0] for row in connection.execute(query)}
+
+    # Highest numeric suffix in use per base
+    next_suffix: Dict[str, int] = {}
+    for base in distinct_bases:
+        pattern = re.compile(rf"^{re.escape(base)}-(\d+)$")
+        suffixes = [int(match.group(1)) for slug in existing if (match := pattern.match(slug))]
+        next_suffix[base] = max(suffixes, default=1) + 1
+
+    slugs = []
+    for base in bases:
+        if base not in existing:
+            slug = base
+        else:
+            slug = f"{base}-{next_suffix[base]}"
+            while slug in existing:
+                next_suffix[base] += 1
+                slug = f"{base}-{next_suffix[base]}"
+            next_suffix[base] += 1
+        existing.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def allocate_slug(connection, model, base: str, exclude_id: Optional[int] = None) -> str:
+    """Allocate a single unique slug for base"""
+    return allocate_slugs(connection, model, [base], exclude_id=exclude_id)[0]
+
+
+def is_slug_conflict(error: IntegrityError) -> bool:
+    """Whether an IntegrityError is a unique violation on a slug column"""
+    return "slug" in str(getattr(error, "orig", error)).lower()
+
+
+def add_with_slug_retry(db, obj, attempts: int = 3) -> None:
+    """
+    Add and flush a new Job/Spa inside a savepoint, re-allocating its slug
+    if a concurrent insert took the same slug first.
+    """
+    for attempt in range(attempts):
+        try:
+            with db.begin_nested():
+                db.add(obj)
+                db.flush()
+            return
+        except IntegrityError as e:
+            if attempt == attempts - 1 or not is_slug_conflict(e):
+                raise
+            obj.slug = None  # Let the before_insert listener allocate again
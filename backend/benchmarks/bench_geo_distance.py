@@ -0,0 +1,62 @@
+"""
+Benchmark: scalar calculate_distance loop vs vectorized distances_from
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_geo_distance
+"""
+
+import time
+
+import numpy as np
+
+from app.utils.geo_utils import calculate_distance, distances_from, k_nearest, within_radius_mask
+
+ORIGIN = (19.0760, 72.8777)  # Mumbai
+SIZES = [10_000, 100_000, 1_000_000]
+RADIUS_KM = 10
+
+
+def _timed(func, repeat: int = 3) -> float:
+    """Best wall time (seconds) over `repeat` runs"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run():
+    rng = np.random.default_rng(42)
+    lat, lng = ORIGIN
+    print(f"{'points':>10} {'loop (ms)':>12} {'numpy (ms)':>12} {'speedup':>9} {'max |diff| km':>14}")
+
+    for size in SIZES:
+        # Points spread over India's bounding box
+        lats = rng.uniform(8.0, 35.0, size)
+        lngs = rng.uniform(68.0, 97.0, size)
+        lat_list, lng_list = lats.tolist(), lngs.tolist()
+
+        def loop():
+            return [calculate_distance(lat, lng, a, b) for a, b in zip(lat_list, lng_list)]
+
+        def vectorized():
+            return distances_from(lat, lng, lats, lngs)
+
+        loop_time = _timed(loop, repeat=1 if size >= 1_000_000 else 3)
+        numpy_time = _timed(vectorized)
+        max_diff = float(np.max(np.abs(np.asarray(loop()) - vectorized())))
+
+        print(
+            f"{size:>10,} {loop_time * 1000:>12.1f} {numpy_time * 1000:>12.1f} "
+            f"{loop_time / numpy_time:>8.1f}x {max_diff:>14.2e}"
+        )
+
+    # Sanity check of helpers on the last data set
+    mask = within_radius_mask(lat, lng, lats, lngs, RADIUS_KM)
+    indices, distances = k_nearest(lat, lng, lats, lngs, 5)
+    print(f"\n{int(mask.sum())} points within {RADIUS_KM} km; 5 nearest at {np.round(distances, 2).tolist()} km")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,148 @@
+"""
+Benchmark: GET /api/jobs/?limit=100, default response_model path vs FAST_JSON_RESPONSES
+
+Both apps serve the same query (services.get_jobs against an in-memory SQLite
+database seeded with 200 jobs), so the difference is serialization only:
+- default: FastAPI validates the ORM list against response_model, dumps it
+  to Python primitives and encodes it with the stdlib json module
+- fast: one TypeAdapter validation pass, pydantic-core JSON encoding,
+  ORJSONResponse as the default response class
+
+Usage (from the backend directory, with the usual .env / POSTGRES_* settings):
+    python -m benchmarks.bench_job_list_serialization
+"""
+
+import asyncio
+import json
+import time
+
+from fastapi import Depends, FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.testclient import TestClient
+from fastapi.utils import create_response_field
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core import responses
+from app.core.config import settings
+from app.core.database import Base
+from app.modules.jobs import models as job_models, schemas, services
+from app.modules.locations import models as location_models
+from app.modules.spas import models as spa_models
+import app.modules.users.models  # noqa: F401  (register all mappers)
+import app.modules.analytics.models  # noqa: F401
+import app.modules.applications.models  # noqa: F401
+import app.modules.messages.models  # noqa: F401
+import app.modules.subscribe.models  # noqa: F401
+
+JOBS = 200
+REQUESTS = 200
+PATH = "/api/jobs/?limit=100"
+
+
+def _seed_session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    # job_count_rollup upserts use PostgreSQL syntax; not needed for this benchmark
+    event.remove(job_models.Job, "after_insert", job_models.rollup_job_insert)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+
+    db = factory()
+    country = location_models.Country(name="India")
+    db.add(country)
+    db.flush()
+    state = location_models.State(name="Maharashtra", country_id=country.id)
+    db.add(state)
+    db.flush()
+    city = location_models.City(name="Mumbai", state_id=state.id, country_id=country.id)
+    db.add(city)
+    db.flush()
+    spa = spa_models.Spa(
+        name="Benchmark Spa", address="1 Marine Drive", phone="9999999999", email="spa@example.com",
+        country_id=country.id, state_id=state.id, city_id=city.id, latitude=19.07, longitude=72.87,
+    )
+    db.add(spa)
+    db.flush()
+    for i in range(JOBS):
+        db.add(job_models.Job(
+            title=f"Spa Therapist {i}", description="Full body massage, aromatherapy. " * 10,
+            key_skills="massage, aromatherapy, customer service", salary_min=15000, salary_max=25000,
+            spa_id=spa.id, country_id=country.id, state_id=state.id, city_id=city.id,
+            latitude=19.07, longitude=72.87, slug=f"spa-therapist-{i}",
+        ))
+    db.commit()
+    db.close()
+    return factory
+
+
+def _build_app(factory, fast: bool) -> FastAPI:
+    def get_db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI(default_response_class=responses.default_response_class() if fast else JSONResponse)
+
+    @app.get("/api/jobs/", response_model=list[schemas.JobResponse])
+    def get_jobs(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+        jobs = services.get_jobs(db=db, skip=skip, limit=limit)
+        return responses.fast_json(list[schemas.JobResponse], jobs) if fast else jobs
+
+    return app
+
+
+def _timed(client: TestClient) -> float:
+    """Mean milliseconds per request"""
+    client.get(PATH)  # Warm up (adapter build, first query)
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        client.get(PATH)
+    return (time.perf_counter() - start) * 1000 / REQUESTS
+
+
+def run():
+    factory = _seed_session_factory()
+
+    settings.FAST_JSON_RESPONSES = False
+    default_client = TestClient(_build_app(factory, fast=False))
+    default_body = default_client.get(PATH).content
+    default_ms = _timed(default_client)
+
+    settings.FAST_JSON_RESPONSES = True
+    fast_client = TestClient(_build_app(factory, fast=True))
+    fast_body = fast_client.get(PATH).content
+    fast_ms = _timed(fast_client)
+
+    # Serialization alone (no query, no HTTP) on the same 100 ORM rows
+    db = factory()
+    jobs = services.get_jobs(db=db, limit=100)
+    field = create_response_field(name="response", type_=list[schemas.JobResponse])
+
+    async def default_serialization():
+        for _ in range(REQUESTS):
+            content = await serialize_response(field=field, response_content=jobs, is_coroutine=False)
+            JSONResponse(content)
+
+    start = time.perf_counter()
+    asyncio.run(default_serialization())
+    double_ms = (time.perf_counter() - start) * 1000 / REQUESTS
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        responses.serialize(list[schemas.JobResponse], jobs)
+    single_ms = (time.perf_counter() - start) * 1000 / REQUESTS
+    db.close()
+
+    same = json.loads(default_body) == json.loads(fast_body)
+    print(f"GET {PATH} ({len(json.loads(fast_body))} jobs, {len(fast_body):,} bytes), mean of {REQUESTS} requests")
+    print(f"{'':>28} {'default (ms)':>13} {'fast (ms)':>10} {'speedup':>8}")
+    print(f"{'end to end (SQLite + HTTP)':>28} {default_ms:>13.2f} {fast_ms:>10.2f} {default_ms / fast_ms:>7.2f}x")
+    print(f"{'serialization only':>28} {double_ms:>13.2f} {single_ms:>10.2f} {double_ms / single_ms:>7.2f}x")
+    print(f"identical JSON: {same}")
+
+
+if __name__ == "__main__":
+    run()
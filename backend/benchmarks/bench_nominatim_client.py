@@ -0,0 +1,95 @@
+"""
+Benchmark: per-call httpx.AsyncClient vs the pooled, coalescing Nominatim client
+
+A burst of REQUESTS concurrent reverse lookups falling into CELLS geohash
+cells is sent to the local stub (benchmarks.nominatim_stub, served over
+TCP on 127.0.0.1 with LATENCY_MS of upstream latency):
+- per-call: a new AsyncClient (and connection) per lookup, no coalescing
+- pooled: app.modules.locations.nominatim with coalescing by cell
+The token bucket is opened up (RATE tokens/s) so the numbers show
+connection and fan-out costs; with the production 1 req/s the pooled
+client sends CELLS requests spread over CELLS seconds.
+
+Usage (from the backend directory, with the usual .env / POSTGRES_* settings):
+    python -m benchmarks.bench_nominatim_client
+"""
+
+import asyncio
+import random
+import threading
+import time
+
+import httpx
+import uvicorn
+
+from app.core.config import settings
+from app.modules.locations import nominatim
+from app.utils.geo_utils import encode_geohash
+from benchmarks.nominatim_stub import create_app
+
+PORT = 8089
+LATENCY_MS = 20
+REQUESTS = 500
+CELLS = 50
+RATE = 10_000
+
+
+def _start_stub():
+    stub = create_app(latency_ms=LATENCY_MS)
+    server = uvicorn.Server(uvicorn.Config(stub, host="127.0.0.1", port=PORT, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return stub, server
+
+
+def _points():
+    rng = random.Random(42)
+    centres = [(rng.uniform(18.9, 19.3), rng.uniform(72.8, 73.0)) for _ in range(CELLS)]
+    # ~10 m of jitter, so lookups around a centre mostly share its cell
+    return [(lat + rng.uniform(-0.0001, 0.0001), lng + rng.uniform(-0.0001, 0.0001))
+            for lat, lng in (rng.choice(centres) for _ in range(REQUESTS))]
+
+
+async def _per_call(points):
+    async def lookup(lat, lng):
+        async with httpx.AsyncClient(base_url=settings.NOMINATIM_BASE_URL, timeout=10.0) as client:
+            response = await client.get("/reverse", params={"lat": lat, "lon": lng, "format": "json"})
+            return response.json()
+    await asyncio.gather(*(lookup(lat, lng) for lat, lng in points))
+
+
+async def _pooled(points):
+    async def lookup(lat, lng):
+        cell = encode_geohash(lat, lng, settings.GEOCODE_GEOHASH_PRECISION)
+        return await nominatim.coalesced(
+            f"reverse:{cell}",
+            lambda: nominatim.get_json("/reverse", {"lat": lat, "lon": lng, "format": "json"}),
+        )
+    await asyncio.gather(*(lookup(lat, lng) for lat, lng in points))
+    await nominatim.close_client()
+
+
+def run():
+    stub, server = _start_stub()
+    settings.NOMINATIM_BASE_URL = f"http://127.0.0.1:{PORT}"
+    settings.NOMINATIM_RATE_LIMIT_PER_SECOND = RATE
+    settings.NOMINATIM_BURST = RATE
+    settings.NOMINATIM_QUEUE_SIZE = REQUESTS
+    points = _points()
+    cells = len({encode_geohash(lat, lng, settings.GEOCODE_GEOHASH_PRECISION) for lat, lng in points})
+
+    print(f"{REQUESTS} concurrent lookups over {cells} cells, stub latency {LATENCY_MS} ms")
+    print(f"{'client':>10} {'wall (ms)':>10} {'upstream requests':>18}")
+    for name, func in (("per-call", _per_call), ("pooled", _pooled)):
+        stub.state.requests = 0
+        start = time.perf_counter()
+        asyncio.run(func(points))
+        elapsed = time.perf_counter() - start
+        print(f"{name:>10} {elapsed * 1000:>10.1f} {stub.state.requests:>18}")
+
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,115 @@
+"""
+Check get_location_from_ip against the GeoLite2-City test database
+
+Exercises the lookups and both caches against
+benchmarks/data/GeoLite2-City-Test.mmdb (see make_geoip_test_db): range
+hits, a learned prefix answering a neighbouring address without a database
+read, the LRU bound, IPv6, the local development addresses and non-IP input.
+Exits non-zero on the first failed check.
+
+Usage (from the backend directory):
+    python -m benchmarks.check_ip_location
+"""
+
+from pathlib import Path
+
+from app.core.config import settings
+from app.utils import ip_location
+from app.utils.ip_location import DEV_LOCATION, get_location_from_ip
+
+DATABASE_PATH = Path(__file__).parent / "data" / "GeoLite2-City-Test.mmdb"
+
+
+class _CountingReader:
+    """Wraps the maxminddb reader to count database reads"""
+
+    def __init__(self, reader):
+        self.reader = reader
+        self.reads = 0
+
+    def get_with_prefix_len(self, ip: str):
+        self.reads += 1
+        return self.reader.get_with_prefix_len(ip)
+
+
+def _city(ip: str):
+    location = get_location_from_ip(ip)
+    return location["city"] if location else None
+
+
+def check_range_hits():
+    assert _city("203.0.113.5") == "Bengaluru"
+    assert _city("198.51.100.10") == "Delhi"
+    assert _city("198.51.100.200") is None, "outside 198.51.100.0/25"
+    assert _city("192.0.2.1") is None, "record without coordinates"
+    location = get_location_from_ip("203.0.113.9")
+    assert location["state"] == "Karnataka" and location["country"] == "India"
+    assert (location["latitude"], location["longitude"]) == (12.9716, 77.5946)
+
+
+def check_learned_prefix(reader: _CountingReader):
+    assert _city("203.0.113.20") == "Bengaluru"
+    reads = reader.reads
+    assert _city("203.0.113.250") == "Bengaluru"
+    assert reader.reads == reads, "neighbour in the learned /24 read the database"
+    assert _city("198.51.100.150") is None
+    reads = reader.reads
+    assert _city("198.51.100.151") is None
+    assert reader.reads == reads, "known empty range read the database"
+
+
+def check_lru():
+    size = settings.GEOIP_CACHE_SIZE
+    settings.GEOIP_CACHE_SIZE = 2
+    try:
+        for ip in ("203.0.113.31", "203.0.113.32", "203.0.113.33"):
+            get_location_from_ip(ip)
+        assert list(ip_location._lru) == ["203.0.113.32", "203.0.113.33"]
+        get_location_from_ip("203.0.113.32")  # Most recently used again
+        get_location_from_ip("203.0.113.34")
+        assert list(ip_location._lru) == ["203.0.113.32", "203.0.113.34"]
+    finally:
+        settings.GEOIP_CACHE_SIZE = size
+
+
+def check_ipv6():
+    assert _city("2001:db8::1") == "Pune"
+    assert _city("2001:db8:ffff::1") == "Pune"
+    assert _city("2001:db9::1") is None
+
+
+def check_local_addresses():
+    for ip in ("127.0.0.1", "::1", "localhost", "192.168.1.20", "10.4.5.6"):
+        assert get_location_from_ip(ip) == DEV_LOCATION, ip
+    # Only the development addresses above get the default location
+    for ip in ("172.16.0.1", "127.0.0.2", "fd00::1", "fe80::1"):
+        assert get_location_from_ip(ip) is None, ip
+
+
+def check_not_an_ip():
+    assert get_location_from_ip("unknown") is None
+    assert get_location_from_ip("") is None
+
+
+def run():
+    if not ip_location.MAXMINDDB_AVAILABLE:
+        raise SystemExit("maxminddb is not installed")
+    settings.GEOIP_DATABASE_PATH = str(DATABASE_PATH)
+    reader = _CountingReader(ip_location._get_reader())
+    assert reader.reader is not None, f"could not open {DATABASE_PATH}"
+    ip_location._reader = reader
+
+    for check in (
+        check_range_hits,
+        lambda: check_learned_prefix(reader),
+        check_lru,
+        check_ipv6,
+        check_local_addresses,
+        check_not_an_ip,
+    ):
+        check()
+    print("ip_location: all checks passed")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,169 @@
+"""
+Generate a tiny GeoLite2-City format database for trying out IP geolocation
+
+Writes an IPv6 MMDB (IPv4 networks under ::/96, like GeoLite2) with a few
+documentation-range networks, so get_location_from_ip can be exercised
+without a MaxMind account:
+    203.0.113.0/24  -> Bengaluru, Karnataka
+    198.51.100.0/25 -> Delhi
+    2001:db8::/32   -> Pune, Maharashtra
+    192.0.2.0/24    -> India (no coordinates; treated as unknown)
+
+Usage (from the backend directory):
+    python -m benchmarks.make_geoip_test_db [output path]
+    GEOIP_DATABASE_PATH=benchmarks/data/GeoLite2-City-Test.mmdb uvicorn app.main:app
+"""
+
+import ipaddress
+import struct
+import sys
+import time
+from pathlib import Path
+
+DEFAULT_PATH = Path(__file__).parent / "data" / "GeoLite2-City-Test.mmdb"
+METADATA_MARKER = b"\xab\xcd\xefMaxMind.com"
+RECORD_SIZE = 24  # bits per record; two records per 6-byte node
+
+
+def _city(city, state, country, latitude, longitude):
+    record = {
+        "country": {"iso_code": "IN", "names": {"en": country}},
+        "location": {"latitude": latitude, "longitude": longitude},
+    }
+    if city:
+        record["city"] = {"names": {"en": city}}
+    if state:
+        record["subdivisions"] = [{"names": {"en": state}}]
+    return record
+
+
+NETWORKS = [
+    ("203.0.113.0/24", _city("Bengaluru", "Karnataka", "India", 12.9716, 77.5946)),
+    ("198.51.100.0/25", _city("Delhi", "Delhi", "India", 28.6139, 77.2090)),
+    ("2001:db8::/32", _city("Pune", "Maharashtra", "India", 18.5204, 73.8567)),
+    ("192.0.2.0/24", {"country": {"iso_code": "IN", "names": {"en": "India"}}}),
+]
+
+
+# -------------------------------------------------
+# MMDB data section encoding (https://maxmind.github.io/MaxMind-DB/)
+# -------------------------------------------------
+
+class _UInt:
+    """Unsigned integer with an explicit MMDB type (the metadata requires exact types)"""
+
+    def __init__(self, type_number: int, value: int):
+        self.type_number = type_number
+        self.value = value
+
+
+def uint16(value: int) -> _UInt:
+    return _UInt(5, value)
+
+
+def uint32(value: int) -> _UInt:
+    return _UInt(6, value)
+
+
+def uint64(value: int) -> _UInt:
+    return _UInt(9, value)
+
+
+def _control(type_number: int, size: int) -> bytes:
+    if size < 29:
+        size_bits, extra = size, b""
+    elif size < 285:
+        size_bits, extra = 29, bytes([size - 29])
+    elif size < 65821:
+        size_bits, extra = 30, (size - 285).to_bytes(2, "big")
+    else:
+        size_bits, extra = 31, (size - 65821).to_bytes(3, "big")
+    if type_number <= 7:
+        return bytes([(type_number << 5) | size_bits]) + extra
+    # Extended types: type bits 0, then (type - 7) in the next byte
+    return bytes([size_bits, type_number - 7]) + extra
+
+
+def _encode(value) -> bytes:
+    if isinstance(value, bool):
+        return _control(14, int(value))
+    if isinstance(value, str):
+        data = value.encode("utf-8")
+        return _control(2, len(data)) + data
+    if isinstance(value, float):
+        return _control(3, 8) + struct.pack(">d", value)
+    if isinstance(value, int):
+        return _encode(uint32(value) if 0 <= value < 2 ** 32 else uint64(value))
+    if isinstance(value, _UInt):
+        data = value.value.to_bytes((value.value.bit_length() + 7) // 8, "big")
+        return _control(value.type_number, len(data)) + data
+    if isinstance(value, dict):
+        return _control(7, len(value)) + b"".join(_encode(key) + _encode(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return _control(11, len(value)) + b"".join(_encode(item) for item in value)
+    raise TypeError(f"cannot encode {type(value).__name__}")
+
+
+# -------------------------------------------------
+# Search tree
+# -------------------------------------------------
+
+def _insert(nodes: list, bits: int, prefixlen: int, leaf) -> None:
+    """Walk/create nodes for the first prefixlen bits of a 128-bit address and store leaf"""
+    node = 0
+    for depth in range(prefixlen):
+        bit = (bits >> (127 - depth)) & 1
+        if depth == prefixlen - 1:
+            nodes[node][bit] = leaf
+            return
+        child = nodes[node][bit]
+        if not isinstance(child, int):
+            nodes.append([None, None])
+            child = len(nodes) - 1
+            nodes[node][bit] = child
+        node = child
+
+
+def write_database(path: Path, networks=NETWORKS) -> None:
+    data = b""
+    nodes = [[None, None]]
+    for cidr, record in networks:
+        network = ipaddress.ip_network(cidr)
+        bits, prefixlen = int(network.network_address), network.prefixlen
+        if network.version == 4:
+            prefixlen += 96  # ::a.b.c.d
+        _insert(nodes, bits, prefixlen, ("data", len(data)))
+        data += _encode(record)
+
+    node_count = len(nodes)
+
+    def record_value(record) -> int:
+        if record is None:
+            return node_count  # No data
+        if isinstance(record, tuple):
+            return node_count + 16 + record[1]  # Data section offset (after the 16-byte separator)
+        return record
+
+    tree = b"".join(
+        record_value(left).to_bytes(3, "big") + record_value(right).to_bytes(3, "big")
+        for left, right in nodes
+    )
+    metadata = {
+        "node_count": uint32(node_count),
+        "record_size": uint16(RECORD_SIZE),
+        "ip_version": uint16(6),
+        "database_type": "GeoLite2-City",
+        "languages": ["en"],
+        "binary_format_major_version": uint16(2),
+        "binary_format_minor_version": uint16(0),
+        "build_epoch": uint64(int(time.time())),
+        "description": {"en": "WorkSpa GeoIP test database"},
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(tree + b"\x00" * 16 + data + METADATA_MARKER + _encode(metadata))
+
+
+if __name__ == "__main__":
+    output = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PATH
+    write_database(output)
+    print(f"Wrote {output} ({output.stat().st_size} bytes, {len(NETWORKS)} networks)")
@@ -0,0 +1,73 @@
+"""
+Local Nominatim stub for tests and benchmarks
+
+Answers /reverse and /search with deterministic, Nominatim-shaped JSON
+after an optional delay, and counts the requests it received, so the
+pooled client (app.modules.locations.nominatim) can be exercised without
+touching the public service.
+
+Run as a server and point the backend at it:
+    python -m benchmarks.nominatim_stub --port 8089 --latency-ms 100
+    NOMINATIM_BASE_URL=http://127.0.0.1:8089 uvicorn app.main:app
+
+Or in-process:
+    nominatim.use_transport(httpx.ASGITransport(app=create_app(latency_ms=50)))
+"""
+
+import argparse
+import asyncio
+
+from fastapi import FastAPI, Query
+
+
+def _address(lat: float, lon: float) -> dict:
+    cell = f"{round(lat, 2):.2f},{round(lon, 2):.2f}"
+    return {
+        "suburb": f"Area {cell}",
+        "city": "Mumbai" if lat >= 15 else "Bengaluru",
+        "state": "Maharashtra" if lat >= 15 else "Karnataka",
+        "postcode": "400001",
+        "country": "India",
+    }
+
+
+def create_app(latency_ms: float = 0) -> FastAPI:
+    app = FastAPI(title="Nominatim stub")
+    app.state.requests = 0
+
+    async def _respond():
+        app.state.requests += 1
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+
+    @app.get("/reverse")
+    async def reverse(lat: float, lon: float):
+        await _respond()
+        address = _address(lat, lon)
+        return {
+            "lat": str(lat),
+            "lon": str(lon),
+            "display_name": f"{address['suburb']}, {address['city']}, {address['state']}, {address['country']}",
+            "address": address,
+        }
+
+    @app.get("/search")
+    async def search(q: str = Query(...), limit: int = 1):
+        await _respond()
+        # Stable pseudo-coordinates inside India derived from the query text
+        seed = sum(ord(char) * (index + 1) for index, char in enumerate(q.lower()))
+        lat, lon = 8 + (seed % 2700) / 100, 68 + (seed % 2900) / 100
+        return [{"lat": f"{lat:.6f}", "lon": f"{lon:.6f}", "display_name": q, "address": _address(lat, lon)}][:limit]
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.latency_ms), host=args.host, port=args.port)
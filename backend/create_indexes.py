@@ -26,8 +26,10 @@ def create_indexes():
         ("idx_jobs_created_at", "jobs", "created_at"),
         ("idx_jobs_view_count", "jobs", "view_count"),
         ("idx_jobs_slug", "jobs", "slug"),
+        ("idx_jobs_slug_pattern", "jobs", "slug text_pattern_ops"),  # Prefix lookups for slug allocation
         ("idx_jobs_job_type_id", "jobs", "job_type_id"),
         ("idx_jobs_job_category_id", "jobs", "job_category_id"),
+        ("idx_jobs_lat_lng", "jobs", "latitude, longitude"),
         
         # SPAs table indexes
         ("idx_spas_city_id", "spas", "city_id"),
@@ -38,6 +40,7 @@ def create_indexes():
         ("idx_spas_is_verified", "spas", "is_verified"),
         ("idx_spas_rating", "spas", "rating"),
         ("idx_spas_slug", "spas", "slug"),
+        ("idx_spas_slug_pattern", "spas", "slug text_pattern_ops"),  # Prefix lookups for slug allocation
         ("idx_spas_created_by", "spas", "created_by"),
         
         # Users table indexes
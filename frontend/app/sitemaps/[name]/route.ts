@@ -0,0 +1,34 @@
+/**
+ * Sub-sitemap route (sharded sitemaps listed in /sitemap.xml)
+ */
+
+import { NextResponse } from 'next/server'
+
+export const dynamic = 'force-dynamic'
+export const revalidate = 3600
+
+const apiUrl = process.env.NEXT_PUBLIC_API_URL ;
+
+export async function GET(_request: Request, { params }: { params: { name: string } }) {
+  if (apiUrl && /^[a-z0-9-]+\.xml$/.test(params.name)) {
+    try {
+      const response = await fetch(`${apiUrl}/api/seo/sitemaps/${params.name}`, {
+        next: { revalidate: 3600 } // Revalidate every hour
+      });
+
+      if (response.ok) {
+        const sitemap = await response.text();
+        return new NextResponse(sitemap, {
+          headers: {
+            'Content-Type': 'application/xml',
+            'Cache-Control': 'public, s-maxage=3600, stale-while-revalidate=86400',
+          },
+        });
+      }
+    } catch (error) {
+      console.error('Error fetching sitemap from backend:', error);
+    }
+  }
+
+  return new NextResponse('Not found', { status: 404 })
+}
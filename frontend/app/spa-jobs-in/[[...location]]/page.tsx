@@ -54,8 +54,10 @@ export default function LocationJobsPage() {
 
   const fetchLocationData = async () => {
     try {
-      // Use smart parsing to match against actual location data
-      const parsed = await parseLocationSlugSmart(locationSlug);
+      // Use smart parsing to match against actual location data (segments are whole slugs)
+      const parsed = await parseLocationSlugSmart(
+        Array.isArray(locationArray) ? locationArray.join('/') : locationSlug
+      );
       
       // Set location IDs if found
       if (parsed.areaId || parsed.cityId || parsed.stateId) {
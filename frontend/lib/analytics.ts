@@ -41,6 +41,92 @@ export interface DeviceBreakdown {
   tablet: number;
 }
 
+// -------------------------------------------------
+// Batched tracking
+// -------------------------------------------------
+// trackEvent/trackButtonClick queue events and send them together to
+// /api/analytics/track-batch: after FLUSH_DELAY_MS, once MAX_BATCH_SIZE are
+// waiting, and when the page is hidden (tab switch, app backgrounded, page
+// closed) - the last one through navigator.sendBeacon so it survives unload.
+
+type TrackedItem =
+  | {
+      kind: 'event';
+      event_type: string;
+      job_id?: number;
+      spa_id?: number;
+      city?: string;
+      latitude?: number;
+      longitude?: number;
+      search_query?: string;
+    }
+  | {
+      kind: 'button_click';
+      button_type: 'whatsapp' | 'call' | 'share' | 'apply';
+      job_id: number;
+      user_id?: number;
+      city?: string;
+      latitude?: number;
+      longitude?: number;
+      share_platform?: string;
+    };
+
+const FLUSH_DELAY_MS = 5000;
+const MAX_BATCH_SIZE = 20;  // Backend accepts up to ANALYTICS_BATCH_MAX_EVENTS (100)
+
+let pending: TrackedItem[] = [];
+let flushTimer: ReturnType<typeof setTimeout> | null = null;
+let listening = false;
+
+const trackBatchUrl = () => `${apiClient.defaults.baseURL || ''}/api/analytics/track-batch`;
+
+function flushTracking(): void {
+  if (flushTimer) {
+    clearTimeout(flushTimer);
+    flushTimer = null;
+  }
+  if (pending.length === 0 || typeof window === 'undefined') return;
+
+  const batch = pending;
+  pending = [];
+  // Sent as text/plain: no CORS preflight, and sendBeacon can deliver it while the page unloads
+  const body = JSON.stringify(batch);
+  try {
+    if (navigator.sendBeacon && navigator.sendBeacon(trackBatchUrl(), body)) return;
+    fetch(trackBatchUrl(), {
+      method: 'POST',
+      body,
+      headers: { 'Content-Type': 'text/plain' },
+      keepalive: true,
+    }).catch((error) => {
+      // Silently fail - analytics should not break the app
+      console.error('Analytics tracking failed:', error);
+    });
+  } catch (error) {
+    console.error('Analytics tracking failed:', error);
+  }
+}
+
+function enqueue(item: TrackedItem): void {
+  if (typeof window === 'undefined') return;
+
+  if (!listening) {
+    listening = true;
+    // visibilitychange is the last event mobile browsers reliably fire; pagehide covers older Safari
+    document.addEventListener('visibilitychange', () => {
+      if (document.visibilityState === 'hidden') flushTracking();
+    });
+    window.addEventListener('pagehide', flushTracking);
+  }
+
+  pending.push(item);
+  if (pending.length >= MAX_BATCH_SIZE) {
+    flushTracking();
+  } else if (!flushTimer) {
+    flushTimer = setTimeout(flushTracking, FLUSH_DELAY_MS);
+  }
+}
+
 export const analyticsAPI = {
   getPopularLocations: async (limit: number = 10, days?: number): Promise<PopularLocation[]> => {
     const response = await apiClient.get(`/api/analytics/popular-locations`, { 
@@ -103,15 +189,7 @@ export const analyticsAPI = {
       search_query?: string;
     }
   ): Promise<void> => {
-    try {
-      await apiClient.post(`/api/analytics/track`, {
-        event_type: eventType,
-        ...data,
-      });
-    } catch (error) {
-      // Silently fail - analytics should not break the app
-      console.error('Analytics tracking failed:', error);
-    }
+    enqueue({ kind: 'event', event_type: eventType, ...data });
   },
 
   trackButtonClick: async (
@@ -125,24 +203,12 @@ export const analyticsAPI = {
       share_platform?: string;  // For share button: 'facebook', 'twitter', 'linkedin', 'whatsapp', 'email', 'native'
     }
   ): Promise<void> => {
-    try {
-      const params: any = {
-        button_type: buttonType,
-        job_id: jobId,
-      };
-      if (data?.user_id) params.user_id = data.user_id;
-      if (data?.city) params.city = data.city;
-      if (data?.latitude !== undefined) params.latitude = data.latitude;
-      if (data?.longitude !== undefined) params.longitude = data.longitude;
-      if (data?.share_platform) params.share_platform = data.share_platform;
-      
-      await apiClient.post(`/api/analytics/track-button-click`, null, { params });
-    } catch (error) {
-      // Silently fail - analytics should not break the app
-      console.error('Button click tracking failed:', error);
-    }
+    enqueue({ kind: 'button_click', button_type: buttonType, job_id: jobId, ...data });
   },
 
+  // Send queued tracking events now (also done automatically)
+  flush: (): void => flushTracking(),
+
   getButtonClicks: async (
     jobId?: number,
     buttonType?: 'whatsapp' | 'call' | 'share' | 'apply',
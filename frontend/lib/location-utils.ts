@@ -142,8 +142,8 @@ export async function findLocationIds(
 }
 
 /**
- * Smart slug parsing - tries to match against actual location data
- * Example: "vashi-navi-mumbai" -> tries to match "Vashi" as area and "Navi Mumbai" as city
+ * Smart slug parsing - resolved by the backend against stored location slugs
+ * Example: "vashi-navi-mumbai" or "vashi/navi-mumbai" -> area "Vashi" in city "Navi Mumbai"
  */
 export async function parseLocationSlugSmart(slug: string): Promise<{
   area?: string;
@@ -154,102 +154,22 @@ export async function parseLocationSlugSmart(slug: string): Promise<{
   stateId?: number;
 }> {
   const { locationAPI } = await import('@/lib/location');
-  const parts = slug.split('-');
   
   try {
-    // Get all locations for matching
-    const [cities, areas] = await Promise.all([
-      locationAPI.getCities(undefined, undefined, 0, 1000),
-      locationAPI.getAreas(undefined, 0, 1000),
-    ]);
-    
-    // Try different combinations
-    // Format 1: area-city (e.g., "vashi-navi-mumbai")
-    if (parts.length >= 2) {
-      // Try first part as area, rest as city
-      const potentialArea = parts[0];
-      const potentialCity = parts.slice(1).join(' ');
-      
-      // Find matching area
-      const matchingArea = areas.find((a: any) => {
-        const areaSlug = a.name.toLowerCase().replace(/\s+/g, '-');
-        return areaSlug === potentialArea || a.name.toLowerCase() === potentialArea.replace(/-/g, ' ');
-      });
-      
-      if (matchingArea) {
-        // Find city for this area
-        const city = cities.find((c: any) => c.id === matchingArea.city_id);
-        if (city) {
-          const citySlug = city.name.toLowerCase().replace(/\s+/g, '-');
-          const cityNameLower = city.name.toLowerCase();
-          const potentialCityLower = potentialCity.toLowerCase();
-          
-          // Check if city matches
-          if (citySlug === potentialCity.replace(/-/g, '-') || 
-              cityNameLower === potentialCityLower.replace(/-/g, ' ')) {
-            return {
-              area: matchingArea.name,
-              city: city.name,
-              areaId: matchingArea.id,
-              cityId: city.id,
-            };
-          }
-        }
-      }
-      
-      // Try as city only (e.g., "navi-mumbai")
-      const cityName = parts.join(' ');
-      const matchingCity = cities.find((c: any) => {
-        const citySlug = c.name.toLowerCase().replace(/\s+/g, '-');
-        return citySlug === slug || c.name.toLowerCase() === cityName.toLowerCase();
-      });
-      
-      if (matchingCity) {
-        return {
-          city: matchingCity.name,
-          cityId: matchingCity.id,
-        };
-      }
-    }
-    
-    // Single part - try as city or area
-    if (parts.length === 1) {
-      const name = parts[0];
-      
-      // Try as city
-      const city = cities.find((c: any) => {
-        const citySlug = c.name.toLowerCase().replace(/\s+/g, '-');
-        return citySlug === name || c.name.toLowerCase() === name.replace(/-/g, ' ');
-      });
-      
-      if (city) {
-        return {
-          city: city.name,
-          cityId: city.id,
-        };
-      }
-      
-      // Try as area
-      const area = areas.find((a: any) => {
-        const areaSlug = a.name.toLowerCase().replace(/\s+/g, '-');
-        return areaSlug === name || a.name.toLowerCase() === name.replace(/-/g, ' ');
-      });
-      
-      if (area) {
-        const city = cities.find((c: any) => c.id === area.city_id);
-        return {
-          area: area.name,
-          city: city?.name,
-          areaId: area.id,
-          cityId: city?.id,
-        };
-      }
-    }
+    const resolved = await locationAPI.resolvePath(slug);
+    return {
+      area: resolved.area?.name,
+      city: resolved.city?.name,
+      state: resolved.state?.name,
+      areaId: resolved.area_id ?? undefined,
+      cityId: resolved.city_id ?? undefined,
+      stateId: resolved.state_id ?? undefined,
+    };
   } catch (error) {
+    // 404: not a known location
     console.error('Error in smart slug parsing:', error);
   }
   
   // Fallback to simple parsing
-  return parseLocationSlug(slug);
+  return parseLocationSlug(slug.replace(/\//g, '-'));
 }
-
@@ -16,6 +16,7 @@ export interface Country {
 export interface State {
   id: number;
   name: string;
+  slug?: string;
   country_id: number;
   country?: Country;
 }
@@ -33,10 +34,36 @@ export interface City {
 export interface Area {
   id: number;
   name: string;
+  slug?: string;
   city_id: number;
   city?: City;
 }
 
+export interface ResolvedLocationPart {
+  id: number;
+  name: string;
+  slug: string;
+}
+
+export interface ResolvedLocation {
+  area_id: number | null;
+  city_id: number | null;
+  state_id: number | null;
+  area: ResolvedLocationPart | null;
+  city: ResolvedLocationPart | null;
+  state: ResolvedLocationPart | null;
+}
+
+// Whole hierarchy in one payload; each table is a list of rows named by `columns`
+export interface LocationSnapshot {
+  version: number;
+  columns: Record<'countries' | 'states' | 'cities' | 'areas', string[]>;
+  countries: [number, string][];
+  states: [number, string, string | null, number][];
+  cities: [number, string, string | null, number, number][];
+  areas: [number, string, string | null, number][];
+}
+
 export const locationAPI = {
   // Countries
   getCountries: async (skip: number = 0, limit: number = 100): Promise<Country[]> => {
@@ -145,6 +172,17 @@ export const locationAPI = {
   deleteArea: async (id: number): Promise<void> => {
     await apiClient.delete(`/api/locations/areas/${id}`);
   },
+
+  getSnapshot: async (): Promise<LocationSnapshot> => {
+    const response = await apiClient.get(`/api/locations/snapshot`);
+    return response.data;
+  },
+
+  // Map a location path ("vashi-navi-mumbai" or "vashi/navi-mumbai") to ids
+  resolvePath: async (path: string): Promise<ResolvedLocation> => {
+    const response = await apiClient.get(`/api/locations/resolve/${path}`);
+    return response.data;
+  },
 };
 
 /**